@@ -4,9 +4,13 @@ import os
 from flask import Flask
 from flask_cors import CORS
 from dotenv import load_dotenv
-from backend.config import Config
+from backend.config import Config, engine_options
 # extensions
-from backend.extensions import db, bcrypt, jwt
+from backend.extensions import db, jwt, configure_engines
+from backend.db_routing import init_read_routing
+from backend.json_provider import json_provider_class
+from backend.compression import init_compression
+from backend.assets import init_assets
 # JWT identity for templates
 from flask_jwt_extended import get_jwt_identity
 # blueprints
@@ -16,9 +20,13 @@ from backend.routes.shared_routes    import shared_bp
 from backend.routes.calendar_routes  import calendar_bp
 from backend.routes.frontend_routes  import frontend_bp
 from backend.routes.gemini_routes import gemini_bp
+# CLI commands
+from backend.commands import register_commands
+# current_user loader backed by the identity cache
+from backend.utils.user_cache import register_user_loader
 
 
-def create_app():
+def create_app(config_overrides=None):
     # Base directory of this file
     BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 
@@ -32,15 +40,28 @@ def create_app():
         static_folder=STATIC_DIR,
         static_url_path='/static'
     )
+    # orjson-backed JSON (ISO datetimes) when available
+    app.json = json_provider_class()(app)
     app.config.from_object(Config)
+    # Per-instance settings (benchmarks, isolated databases), applied before extensions bind
+    if config_overrides:
+        app.config.update(config_overrides)
+    # Engine profile for the final database URL; explicit engine options win
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        **engine_options(app.config),
+        **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}),
+    }
 
     # Expose JWT identity function in Jinja templates
     app.jinja_env.globals['get_jwt_identity'] = get_jwt_identity
 
     # Initialize extensions
     db.init_app(app)
-    bcrypt.init_app(app)
+    configure_engines(app)
+    if app.config['SQLALCHEMY_REPLICA_URIS']:
+        init_read_routing(app)
     jwt.init_app(app)
+    register_user_loader(jwt)
     # Enable CORS with credentials support for cookies
     CORS(
         app,
@@ -48,6 +69,11 @@ def create_app():
         supports_credentials=True
     )
 
+    # gzip/brotli for large JSON and HTML responses
+    init_compression(app)
+    # Hashed, precompressed static files with immutable caching
+    init_assets(app)
+
     # Register blueprints
     app.register_blueprint(auth_bp,      url_prefix='/api/auth')
     app.register_blueprint(personal_bp,  url_prefix='/api/personal')
@@ -56,16 +82,21 @@ def create_app():
     app.register_blueprint(gemini_bp)
     app.register_blueprint(frontend_bp,  url_prefix='')
 
+    # Maintenance commands (flask backfill-rollups, ...)
+    register_commands(app)
+
     return app
 
 
 if __name__ == '__main__':
     load_dotenv()
-    app = create_app()
+    debug = os.getenv('FLASK_DEBUG', 'True').lower() == 'true'
+    # Known before create_app so debug-only behaviour (unhashed static files) applies
+    app = create_app({'DEBUG': debug})
     with app.app_context():
         db.create_all()
     app.run(
-        debug=os.getenv('FLASK_DEBUG', 'True').lower() == 'true',
+        debug=debug,
         host=os.getenv('FLASK_HOST', '0.0.0.0'),
         port=int(os.getenv('FLASK_PORT', 5000))
     )
@@ -0,0 +1,98 @@
+# backend/assets.py
+
+import hashlib
+import mimetypes
+import os
+from dataclasses import dataclass, field
+from typing import Dict
+
+from flask import Response, request
+
+from backend.compression import COMPRESSIBLE_TYPES, brotli, choose_encoding, compress
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+@dataclass
+class Asset:
+    mimetype: str
+    etag: str
+    # encoding ('identity', 'gzip', 'br') → bytes
+    bodies: Dict[str, bytes] = field(default_factory=dict)
+
+
+def fingerprint(filename: str, data: bytes) -> str:
+    """'js/groups.js' → 'js/groups.3f2a9c1b0d4e.js'"""
+    stem, ext = os.path.splitext(filename)
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+
+
+def build_manifest(static_folder: str, level: int = 9):
+    """
+    Read every static file once: content-hashed name, plus gzip/brotli
+    variants for text assets when they are actually smaller.
+
+    Returns:
+      ({logical name: hashed name}, {hashed name: Asset})
+    """
+    names, assets = {}, {}
+    for root, _, files in os.walk(static_folder):
+        for fname in files:
+            path = os.path.join(root, fname)
+            logical = os.path.relpath(path, static_folder).replace(os.sep, '/')
+            with open(path, 'rb') as fh:
+                data = fh.read()
+
+            hashed = fingerprint(logical, data)
+            mimetype = mimetypes.guess_type(fname)[0] or 'application/octet-stream'
+            asset = Asset(mimetype=mimetype, etag=hashed.rsplit('.', 2)[-2], bodies={'identity': data})
+            if mimetype in COMPRESSIBLE_TYPES:
+                for encoding in ('gzip', 'br') if brotli else ('gzip',):
+                    packed = compress(data, encoding, 11 if encoding == 'br' else level)
+                    if len(packed) < len(data):
+                        asset.bodies[encoding] = packed
+
+            names[logical] = hashed
+            assets[hashed] = asset
+    return names, assets
+
+
+def init_assets(app):
+    """
+    Serve static files under content-hashed URLs with far-future immutable
+    caching and precompressed bodies.
+
+    `url_for('static', filename=...)` is rewritten to the hashed name, so
+    templates need no changes. Unhashed URLs keep working through Flask's
+    regular static handler. Files are read at startup; in debug mode the
+    pipeline is off so edits show up on reload.
+    """
+    if app.debug or not app.config['STATIC_FINGERPRINTS'] or not app.static_folder:
+        return
+
+    names, assets = build_manifest(app.static_folder)
+    app.extensions['asset_manifest'] = names
+
+    @app.url_defaults
+    def _hashed_static_url(endpoint, values):
+        if endpoint == 'static' and values.get('filename') in names:
+            values['filename'] = names[values['filename']]
+
+    def static(filename):
+        asset = assets.get(filename)
+        if asset is None:
+            return app.send_static_file(filename)
+
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding not in asset.bodies:
+            encoding = 'identity'
+        response = Response(asset.bodies[encoding], mimetype=asset.mimetype)
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Cache-Control'] = IMMUTABLE
+        # Each encoding is a different representation: its own strong validator
+        response.set_etag(asset.etag if encoding == 'identity' else f"{asset.etag}-{encoding}")
+        response.vary.add('Accept-Encoding')
+        return response.make_conditional(request)
+
+    app.view_functions['static'] = static
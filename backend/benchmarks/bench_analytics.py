@@ -0,0 +1,79 @@
+# backend/benchmarks/bench_analytics.py
+"""
+Time /api/personal/analytics' work on a synthetic history.
+
+    python -m backend.benchmarks.bench_analytics --rows 100000
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from backend.app import create_app
+from backend.extensions import db
+from backend.models.personal import PersonalExpense
+from backend.models.user import User
+from backend.utils.analytics import load_expense_columns, compute_spending_analytics
+
+MERCHANTS = [
+    ("Starbucks Coffee", "Food"), ("Uber Ride", "Transport"), ("Netflix Subscription", "Entertainment"),
+    ("Walmart Groceries", "Groceries"), ("Shell Gas Station", "Transport"), ("Amazon Order", "Shopping"),
+    ("CVS Pharmacy", "Health"), ("Spotify Premium", "Entertainment"), ("McDonald's Lunch", "Food"),
+]
+
+
+def seed(user_id: int, rows: int) -> None:
+    rng = np.random.default_rng(42)
+    start = datetime(2020, 1, 1)
+    picks = rng.integers(0, len(MERCHANTS), rows)
+    offsets = rng.integers(0, 5 * 365, rows)
+    amounts = np.round(rng.gamma(2.0, 15.0, rows), 2)
+    db.session.execute(
+        db.insert(PersonalExpense),
+        [
+            {
+                "user_id": user_id,
+                "amount": float(amounts[i]),
+                "description": f"{MERCHANTS[picks[i]][0]} #{i % 97}",
+                "category": MERCHANTS[picks[i]][1],
+                "transaction_date": start + timedelta(days=int(offsets[i])),
+            }
+            for i in range(rows)
+        ],
+    )
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:"})
+    with app.app_context():
+        db.create_all()
+        user = User(username="bench", email="bench@example.com", password_hash="x")
+        db.session.add(user)
+        db.session.commit()
+        seed(user.id, args.rows)
+
+        load_times, compute_times = [], []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            columns = load_expense_columns(user.id)
+            t1 = time.perf_counter()
+            compute_spending_analytics(columns)
+            t2 = time.perf_counter()
+            load_times.append(t1 - t0)
+            compute_times.append(t2 - t1)
+
+        print(f"rows={args.rows}")
+        print(f"load    median {np.median(load_times) * 1000:.1f} ms")
+        print(f"compute median {np.median(compute_times) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
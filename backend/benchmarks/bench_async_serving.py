@@ -0,0 +1,116 @@
+# backend/benchmarks/bench_async_serving.py
+"""
+Load test of the gevent serving mode against a slow upstream.
+
+    python -m backend.benchmarks.bench_async_serving --concurrency 300 --latency 1.0
+
+A local stub answers every call after `--latency` seconds. The app's Gemini
+model is replaced by one that calls the stub over HTTP, and `--concurrency`
+distinct prompts hit /api/gemini/payments at once. In one process they
+should all finish in about one latency, not concurrency / threads latencies.
+"""
+
+from backend.serve import make_server  # first: patches the standard library
+
+import argparse  # noqa: E402
+import json  # noqa: E402
+import statistics  # noqa: E402
+import time  # noqa: E402
+import urllib.request  # noqa: E402
+from types import SimpleNamespace  # noqa: E402
+
+import gevent  # noqa: E402
+from gevent.pywsgi import WSGIServer  # noqa: E402
+
+from backend.app import create_app  # noqa: E402
+from backend.extensions import db  # noqa: E402
+from backend.utils import gemini_utils  # noqa: E402
+from backend.utils.gemini_client import GeminiClient  # noqa: E402
+
+
+def latency_stub(latency: float) -> WSGIServer:
+    """Upstream stand-in: every request is answered after `latency` seconds."""
+    body = json.dumps({"text": "Ana pays Ben $10.00"}).encode()
+
+    def app(environ, start_response):
+        gevent.sleep(latency)
+        start_response("200 OK", [("Content-Type", "application/json"), ("Content-Length", str(len(body)))])
+        return [body]
+
+    server = WSGIServer(("127.0.0.1", 0), app, log=None)
+    server.start()
+    return server
+
+
+class StubModel:
+    """GenerativeModel stand-in that makes a real HTTP call to the latency stub."""
+
+    def __init__(self, url: str):
+        self.url = url
+
+    def generate_content(self, prompt, **kwargs):
+        with urllib.request.urlopen(self.url, timeout=60) as resp:
+            return SimpleNamespace(text=json.load(resp)["text"])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=1.0)
+    parser.add_argument("--json", action="store_true", help="Print one JSON line (used by the tests)")
+    args = parser.parse_args()
+
+    stub = latency_stub(args.latency)
+    gemini_utils._MODEL = StubModel(f"http://127.0.0.1:{stub.server_port}/")
+
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": "sqlite://",
+        "GEMINI_RATE_LIMIT_PER_MINUTE": 10 ** 9,
+        "GEMINI_RATE_LIMIT_BURST": 10 ** 9,
+    })
+    app.extensions['gemini_client'] = GeminiClient(
+        lambda: gemini_utils._MODEL, timeout=60, max_concurrency=args.concurrency
+    )
+    with app.app_context():
+        db.create_all()
+    server = make_server(app, "127.0.0.1", 0, max_connections=args.concurrency * 2)
+    server.start()
+    url = f"http://127.0.0.1:{server.server_port}/api/gemini/payments"
+
+    def call(i):
+        req = urllib.request.Request(
+            url, data=json.dumps({"prompt": f"who owes whom? #{i}"}).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        t0 = time.perf_counter()
+        with urllib.request.urlopen(req, timeout=120) as resp:
+            resp.read()
+            return resp.status, time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    jobs = [gevent.spawn(call, i) for i in range(args.concurrency)]
+    gevent.joinall(jobs)
+    elapsed = time.perf_counter() - t0
+    server.stop()
+    stub.stop()
+
+    done = [job.value for job in jobs if job.successful() and job.value[0] == 200]
+    latencies = sorted(t for _, t in done)
+    result = {
+        "concurrency": args.concurrency,
+        "latency": args.latency,
+        "ok": len(done),
+        "elapsed": round(elapsed, 3),
+        "p50": round(statistics.median(latencies), 3) if latencies else None,
+        "p99": round(latencies[int(len(latencies) * 0.99) - 1], 3) if latencies else None,
+    }
+    if args.json:
+        print(json.dumps(result))
+    else:
+        print(f"{result['ok']}/{args.concurrency} requests OK in {elapsed:.2f}s with a {args.latency}s upstream "
+              f"(p50 {result['p50']}s, p99 {result['p99']}s); "
+              f"{result['ok'] / elapsed:.0f} req/s from one process")
+
+
+if __name__ == "__main__":
+    main()
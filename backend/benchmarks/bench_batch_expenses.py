@@ -0,0 +1,63 @@
+# backend/benchmarks/bench_batch_expenses.py
+"""
+Throughput of creating shared expenses one request at a time versus a
+single call to the batch endpoint.
+
+    python -m backend.benchmarks.bench_batch_expenses --expenses 2000 --members 6
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from backend.app import create_app
+from backend.extensions import db
+from backend.models.shared import Group
+from backend.models.user import User
+
+
+def setup(app, members):
+    with app.app_context():
+        db.create_all()
+        users = [User(username=f"m{i}", email=f"m{i}@example.com", password_hash="x") for i in range(members)]
+        db.session.add_all(users)
+        db.session.flush()
+        group = Group(name="Bench", created_by=users[0].id)
+        db.session.add(group)
+        db.session.flush()
+        group.members.extend(users)
+        db.session.commit()
+        return group.id, users[0].id
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--expenses", type=int, default=2000)
+    parser.add_argument("--members", type=int, default=6)
+    args = parser.parse_args()
+
+    expenses = [{"description": f"Item {i}", "amount": 5 + i % 40} for i in range(args.expenses)]
+    print(f"expenses={args.expenses} members={args.members}")
+
+    for name in ("single", "batch"):
+        path = os.path.join(tempfile.mkdtemp(), "batch.db")
+        app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}"})
+        group_id, payer = setup(app, args.members)
+        client = app.test_client()
+
+        t0 = time.perf_counter()
+        with app.app_context():
+            if name == "single":
+                for e in expenses:
+                    client.post('/api/shared/expense', json={**e, "group_id": group_id, "paid_by": payer})
+            else:
+                client.post('/api/shared/expenses/batch', json={
+                    "group_id": group_id, "paid_by": payer, "expenses": expenses
+                })
+        elapsed = time.perf_counter() - t0
+        print(f"{name:>7}: {elapsed:6.2f} s  {args.expenses / elapsed:9.0f} expenses/s")
+
+
+if __name__ == "__main__":
+    main()
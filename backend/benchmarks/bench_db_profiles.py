@@ -0,0 +1,115 @@
+# backend/benchmarks/bench_db_profiles.py
+"""
+Concurrent read/write throughput with and without the engine profile.
+
+    python -m backend.benchmarks.bench_db_profiles --seconds 5 --readers 8 --writers 2
+    python -m backend.benchmarks.bench_db_profiles --url postgresql+psycopg://user:pw@localhost/divy_bench
+
+Readers run the budget rollup query and a recent-expenses page; writers insert
+personal expenses one transaction at a time, like the add-expense route.
+Without --url each profile gets a fresh SQLite file.
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import OperationalError
+
+from backend.app import create_app
+from backend.extensions import db
+from backend.models.personal import PersonalExpense
+from backend.models.user import User
+
+
+def run(profile: str, url: str, args) -> None:
+    app = create_app({"SQLALCHEMY_DATABASE_URI": url, "DB_ENGINE_PROFILE": profile})
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.add(User(username="bench", email="bench@example.com", password_hash="x"))
+        db.session.commit()
+        db.session.execute(insert(PersonalExpense), [
+            {"user_id": 1, "amount": 10.0, "description": f"seed {i}", "category": "Food",
+             "transaction_date": datetime(2024, 1 + i % 12, 1 + i % 28)}
+            for i in range(args.seed_rows)
+        ])
+        db.session.commit()
+        engine = db.engine
+
+    stop = time.perf_counter() + args.seconds
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+
+    totals = (
+        select(PersonalExpense.category, func.sum(PersonalExpense.amount))
+        .where(PersonalExpense.user_id == 1)
+        .group_by(PersonalExpense.category)
+    )
+    recent = (
+        select(PersonalExpense.id, PersonalExpense.amount)
+        .where(PersonalExpense.user_id == 1)
+        .order_by(PersonalExpense.transaction_date.desc())
+        .limit(20)
+    )
+
+    def bump(key):
+        with lock:
+            counts[key] += 1
+
+    def reader():
+        while time.perf_counter() < stop:
+            try:
+                with engine.connect() as conn:
+                    conn.execute(totals).all()
+                    conn.execute(recent).all()
+                bump("reads")
+            except OperationalError:
+                bump("errors")
+
+    def writer(n):
+        i = 0
+        while time.perf_counter() < stop:
+            i += 1
+            try:
+                with engine.begin() as conn:
+                    conn.execute(insert(PersonalExpense), {
+                        "user_id": 1, "amount": 5.0, "description": f"w{n}-{i}",
+                        "category": "Food", "transaction_date": datetime.utcnow(),
+                    })
+                bump("writes")
+            except OperationalError:
+                bump("errors")
+
+    threads = [threading.Thread(target=reader) for _ in range(args.readers)]
+    threads += [threading.Thread(target=writer, args=(n,)) for n in range(args.writers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    engine.dispose()
+
+    print(f"{profile:>5}: {counts['reads'] / args.seconds:8.0f} reads/s {counts['writes'] / args.seconds:8.0f} writes/s "
+          f"{counts['errors']:5d} errors")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=None, help="Database to test (default: a temporary SQLite file per profile)")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seed-rows", type=int, default=20_000)
+    args = parser.parse_args()
+
+    for profile in ("none", "auto"):
+        url = args.url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+        run(profile, url, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# backend/benchmarks/bench_export.py
+"""
+Peak Python memory of a full-ledger download: the JSON list endpoint versus
+the streamed CSV (and Parquet, when pyarrow is installed) export.
+
+    python -m backend.benchmarks.bench_export --rows 200000
+
+Each response body is consumed piece by piece and discarded, as a client
+writing to disk would, so the peak reflects what the server holds.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import insert
+
+from backend.app import create_app
+from backend.extensions import db
+from backend.models.personal import PersonalExpense
+from backend.models.user import User
+from backend.utils import ledger_export
+
+
+def measure(client, path):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    resp = client.get(path, buffered=False)
+    size = sum(len(piece) for piece in resp.response)
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    resp.close()
+    return elapsed, size, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "export.db")
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}", "COMPRESS_MIN_BYTES": 1 << 62})
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(username="bench", email="bench@example.com", password_hash="x"))
+        db.session.commit()
+        start = datetime(2020, 1, 1)
+        for offset in range(0, args.rows, 50_000):
+            db.session.execute(insert(PersonalExpense), [
+                {"user_id": 1, "amount": 3.0 + i % 97, "description": f"Coffee shop #{i % 400}",
+                 "category": "Food", "transaction_date": start + timedelta(minutes=i)}
+                for i in range(offset, min(offset + 50_000, args.rows))
+            ])
+        db.session.commit()
+        token = create_access_token(identity="1")
+
+    client = app.test_client()
+    client.set_cookie(app.config['JWT_ACCESS_COOKIE_NAME'], token)
+    paths = {"json list": "/api/personal/expenses", "csv export": "/api/personal/expenses/export"}
+    if ledger_export.pq is not None:
+        paths["parquet export"] = "/api/personal/expenses/export?format=parquet"
+
+    print(f"rows={args.rows}")
+    for name, url in paths.items():
+        with app.app_context():
+            elapsed, size, peak = measure(client, url)
+        print(f"{name:>15}: {elapsed:6.2f} s  {size / 1e6:7.1f} MB body  peak {peak / 1e6:7.1f} MB")
+    if ledger_export.pq is None:
+        print("(pyarrow not installed: parquet skipped)")
+
+
+if __name__ == "__main__":
+    main()
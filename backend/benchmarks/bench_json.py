@@ -0,0 +1,81 @@
+# backend/benchmarks/bench_json.py
+"""
+Encode time and bytes on the wire for a large list payload.
+
+    python -m backend.benchmarks.bench_json --rows 10000
+
+Compares Flask's default provider fed pre-formatted rows (what the routes did
+with per-row `.isoformat()`) against the orjson provider fed raw datetimes,
+then the gzip/brotli sizes of the result.
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from backend.compression import brotli, compress
+from backend.json_provider import json_provider_class
+
+
+def history_rows(n: int):
+    start = datetime(2024, 1, 1, 9, 30)
+    return [{
+        "id": i,
+        "description": f"Groceries run #{i % 211}",
+        "amount": round(5 + (i * 7.31) % 180, 2),
+        "paid_by": i % 6 + 1,
+        "paid_by_username": f"member{i % 6 + 1}",
+        "notes": None if i % 3 else "split evenly",
+        "date": start + timedelta(minutes=37 * i),
+    } for i in range(n)]
+
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--level", type=int, default=5)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    rows = history_rows(args.rows)
+    default = DefaultJSONProvider(app)
+    fast = json_provider_class()(app)
+
+    def old_way():
+        formatted = [dict(r, date=r["date"].isoformat()) for r in rows]
+        return default.dumps({"expenses": formatted}).encode()
+
+    def new_way():
+        # What FastJSONProvider.response() sends; the stdlib fallback has no bytes path
+        if hasattr(fast, "_dumps_bytes"):
+            return fast._dumps_bytes({"expenses": rows})
+        return fast.dumps({"expenses": rows}).encode()
+
+    old_t, new_t = best_of(old_way, args.repeat), best_of(new_way, args.repeat)
+    body = new_way()
+    print(f"rows={args.rows}")
+    print(f"default provider + isoformat: {old_t * 1000:7.1f} ms  {len(old_way()):>9} bytes")
+    print(f"{type(fast).__name__:>28}: {new_t * 1000:7.1f} ms  {len(body):>9} bytes  ({old_t / new_t:.1f}x faster)")
+
+    for encoding in (["gzip", "br"] if brotli else ["gzip"]):
+        t = best_of(lambda: compress(body, encoding, args.level), args.repeat)
+        print(f"{encoding:>28}: {t * 1000:7.1f} ms  {len(compress(body, encoding, args.level)):>9} bytes on the wire")
+    if not brotli:
+        print("(brotli not installed: br skipped)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# backend/benchmarks/bench_login.py
+"""
+Login throughput and latency of a cheap route while a login storm runs.
+
+    python -m backend.benchmarks.bench_login --seconds 10 --login-threads 16 --rounds 12
+
+Runs the same load twice: hashing inline in the request thread
+(PASSWORD_HASH_WORKERS=0) and on the bounded process pool. Logins that the
+pool sheds with 503 are counted separately.
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from backend.app import create_app
+from backend.extensions import db
+from backend.models.user import User
+
+
+def run(workers: int, args) -> None:
+    db_path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}",
+        "BCRYPT_LOG_ROUNDS": args.rounds,
+        "PASSWORD_HASH_WORKERS": workers,
+        "PASSWORD_HASH_QUEUE": args.queue,
+    })
+    with app.app_context():
+        db.create_all()
+        for i in range(args.login_threads):
+            user = User(username=f"user{i}", email=f"user{i}@example.com")
+            user.set_password("secret")
+            db.session.add(user)
+        db.session.commit()
+
+    stop = time.perf_counter() + args.seconds
+    logins, shed, cheap = [], [], []
+
+    def login_storm(i):
+        client = app.test_client()
+        while time.perf_counter() < stop:
+            status = client.post('/api/auth/login', json={"username": f"user{i}", "password": "secret"}).status_code
+            (logins if status == 200 else shed).append(status)
+
+    def cheap_calls():
+        client = app.test_client()
+        while time.perf_counter() < stop:
+            t0 = time.perf_counter()
+            client.get('/api/gemini/status')
+            cheap.append(time.perf_counter() - t0)
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=login_storm, args=(i,)) for i in range(args.login_threads)]
+    threads.append(threading.Thread(target=cheap_calls))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    label = "inline" if workers == 0 else f"pool({workers})"
+    lat = np.array(cheap) * 1000
+    print(f"{label:>10}: {len(logins) / args.seconds:6.1f} logins/s, {len(shed)} shed, "
+          f"cheap route p50 {np.percentile(lat, 50):6.1f} ms  p99 {np.percentile(lat, 99):7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--login-threads", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--queue", type=int, default=16)
+    args = parser.parse_args()
+
+    run(0, args)
+    run(args.workers, args)
+
+
+if __name__ == "__main__":
+    main()
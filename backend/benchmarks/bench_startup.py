@@ -0,0 +1,81 @@
+# backend/benchmarks/bench_startup.py
+"""
+Cold-start cost of the app, measured with `python -X importtime`.
+
+    python -m backend.benchmarks.bench_startup --runs 5 --top 15
+
+Each run is a fresh interpreter importing `backend.app` and calling
+`create_app()`. Reports the median total, the slowest modules by cumulative
+import time, and whether any of the lazily loaded heavy clients got pulled in.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# Third-party clients that must only be imported on first use
+HEAVY_MODULES = ("google.generativeai", "googleapiclient", "google_auth_oauthlib", "google.oauth2", "PIL")
+
+_SNIPPET = (
+    "import sys, time; t = time.perf_counter(); "
+    "from backend.app import create_app; create_app(); "
+    "print('__startup__', round((time.perf_counter() - t) * 1000, 1)); "
+    f"print('__heavy__', ','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+)
+
+
+def measure_startup() -> dict:
+    """
+    Start one interpreter, import the app and build it.
+
+    Returns:
+      {"ms": wall time of import + create_app, "heavy": heavy modules loaded,
+       "modules": [(cumulative_us, module), ...] from -X importtime}
+    """
+    env = dict(os.environ, PYTHONWARNINGS="ignore")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _SNIPPET],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    modules = []
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            if cumulative.strip().isdigit():
+                modules.append((int(cumulative), name.rstrip()))
+
+    result = {"ms": 0.0, "heavy": [], "modules": modules}
+    for line in proc.stdout.splitlines():
+        tag, _, value = line.partition(" ")
+        if tag == "__startup__":
+            result["ms"] = float(value)
+        elif tag == "__heavy__":
+            result["heavy"] = [m for m in value.split(",") if m]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    runs = [measure_startup() for _ in range(args.runs)]
+    timings = [r["ms"] for r in runs]
+    print(f"import + create_app over {args.runs} runs: median {statistics.median(timings):.0f} ms, "
+          f"min {min(timings):.0f} ms, max {max(timings):.0f} ms ({time.perf_counter() - t0:.1f}s total)")
+    print(f"heavy clients loaded at startup: {', '.join(runs[0]['heavy']) or 'none'}")
+
+    print(f"\n{'cumulative ms':>14}  module")
+    for cumulative, name in sorted(runs[0]["modules"], reverse=True)[:args.top]:
+        print(f"{cumulative / 1000:>14.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# backend/commands.py
+
+import time
+from datetime import timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from backend.utils.budget_rollups import backfill_rollups
+from backend.utils.fx import load_rates
+from backend.utils.ledger_archive import archive_settled, checkpoint_groups
+from backend.utils.recurring_detection import detect_recurring, rebuild_merchant_keys
+from backend.utils.recurring_scheduler import tick
+
+
+@click.command('backfill-rollups')
+@click.option('--user-id', type=int, default=None, help='Only rebuild this user.')
+@with_appcontext
+def backfill_rollups_command(user_id):
+    """Rebuild monthly budget rollups from existing personal expenses."""
+    written = backfill_rollups(user_id=user_id)
+    click.echo(f"Wrote {written} rollup rows")
+
+
+@click.command('detect-recurring')
+@click.option('--user-id', type=int, default=None, help='Only scan this user.')
+@with_appcontext
+def detect_recurring_command(user_id):
+    """Flag recurring expenses among rows added since the last run."""
+    flagged = detect_recurring(user_id=user_id)
+    for uid, merchants in flagged.items():
+        for merchant, cadence in merchants.items():
+            click.echo(f"user {uid}: {merchant} ({cadence})")
+    click.echo(f"Flagged merchants for {len(flagged)} users")
+
+
+@click.command('rebuild-merchant-keys')
+@click.option('--user-id', type=int, default=None, help='Only rebuild this user.')
+@with_appcontext
+def rebuild_merchant_keys_command(user_id):
+    """Recompute stored merchant keys after a change to merchant normalization."""
+    changed = rebuild_merchant_keys(user_id=user_id)
+    click.echo(f"Updated {changed} merchant keys")
+
+
+@click.command('run-scheduler')
+@click.option('--interval', type=int, default=60, help='Seconds between ticks.')
+@click.option('--once', is_flag=True, help='Run a single tick and exit.')
+@with_appcontext
+def run_scheduler_command(interval, once):
+    """Materialize due recurring expenses; safe to run from several processes."""
+    while True:
+        created = tick()
+        click.echo(f"Materialized {created} recurring expenses")
+        if once:
+            break
+        time.sleep(interval)
+
+
+@click.command('checkpoint-balances')
+@click.option('--group-id', type=int, default=None, help='Only checkpoint this group.')
+@with_appcontext
+def checkpoint_balances_command(group_id):
+    """Fold new shared expenses into each group's balance checkpoint."""
+    safety = timedelta(seconds=current_app.config['CHECKPOINT_SAFETY_SECONDS'])
+    visited = checkpoint_groups(group_id=group_id, safety=safety)
+    click.echo(f"Checkpointed {visited} groups")
+
+
+@click.command('archive-settled')
+@click.option('--group-id', type=int, default=None, help='Only archive this group.')
+@click.option('--older-than-days', type=int, default=None, help='Defaults to ARCHIVE_AFTER_DAYS.')
+@with_appcontext
+def archive_settled_command(group_id, older_than_days):
+    """Checkpoint balances, then move settled old shared expenses to the archive tables."""
+    cfg = current_app.config
+    days = cfg['ARCHIVE_AFTER_DAYS'] if older_than_days is None else older_than_days
+    checkpoint_groups(group_id=group_id, safety=timedelta(seconds=cfg['CHECKPOINT_SAFETY_SECONDS']))
+    moved = archive_settled(timedelta(days=days), group_id=group_id, batch_size=cfg['ARCHIVE_BATCH_SIZE'])
+    click.echo(f"Archived {moved} expenses")
+
+
+@click.command('load-fx-rates')
+@click.argument('path', required=False)
+@with_appcontext
+def load_fx_rates_command(path):
+    """Upsert daily exchange rates from a date,currency,rate CSV (defaults to FX_RATES_FILE)."""
+    path = path or current_app.config['FX_RATES_FILE']
+    if not path:
+        raise click.UsageError("Pass a CSV path or set FX_RATES_FILE")
+    loaded = load_rates(path)
+    click.echo(f"Loaded {loaded} exchange rates")
+
+
+def register_commands(app):
+    """Attach the maintenance CLI commands to the app (`flask <command>`)."""
+    app.cli.add_command(backfill_rollups_command)
+    app.cli.add_command(detect_recurring_command)
+    app.cli.add_command(rebuild_merchant_keys_command)
+    app.cli.add_command(run_scheduler_command)
+    app.cli.add_command(checkpoint_balances_command)
+    app.cli.add_command(archive_settled_command)
+    app.cli.add_command(load_fx_rates_command)
@@ -0,0 +1,61 @@
+# backend/compression.py
+
+import gzip
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = {
+    'application/json', 'application/x-ndjson', 'text/html', 'text/css',
+    'text/plain', 'text/javascript', 'application/javascript', 'image/svg+xml',
+}
+
+
+def choose_encoding(accept_encoding) -> str | None:
+    """Best encoding we can produce that the client accepts: br, then gzip."""
+    if brotli is not None and accept_encoding['br']:
+        return 'br'
+    if accept_encoding['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress(data: bytes, encoding: str, level: int) -> bytes:
+    if encoding == 'br':
+        # The gzip-style level doubles as brotli quality (0-11); 4-6 suits dynamic responses
+        return brotli.compress(data, quality=min(level, 11))
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def init_compression(app):
+    """
+    Compress buffered responses of a compressible type once they pass
+    COMPRESS_MIN_BYTES, negotiating brotli or gzip via Accept-Encoding.
+    Streamed responses and files (static, send_file) are left alone.
+    """
+    min_bytes = app.config['COMPRESS_MIN_BYTES']
+    level = app.config['COMPRESS_LEVEL']
+
+    @app.after_request
+    def _compress_response(response):
+        if (
+            response.status_code < 200 or response.status_code >= 300
+            or response.direct_passthrough
+            or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_TYPES
+        ):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding is None or (response.content_length or 0) < min_bytes:
+            return response
+
+        response.set_data(compress(response.get_data(), encoding, level))
+        response.headers['Content-Encoding'] = encoding
+        return response
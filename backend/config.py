@@ -19,6 +19,29 @@ class Config:
         'sqlite:///divy.db'
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Read replicas (comma-separated URLs): GET requests read from them
+    SQLALCHEMY_REPLICA_URIS = [u for u in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if u]
+    # After a write, that client reads from the primary for this long (read-your-writes)
+    REPLICA_STICKY_SECONDS = float(os.getenv('REPLICA_STICKY_SECONDS', '5'))
+
+    # Engine profile for the database in use: 'auto' (by URL scheme) or 'none'
+    DB_ENGINE_PROFILE = os.getenv('DB_ENGINE_PROFILE', 'auto')
+
+    # SQLite: applied to every new connection (WAL lets readers run alongside the writer)
+    SQLITE_PRAGMAS = {
+        'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000')),
+        'cache_size': -int(os.getenv('SQLITE_CACHE_KB', str(64 * 1024))),  # negative = KiB
+        'mmap_size': int(os.getenv('SQLITE_MMAP_BYTES', str(256 * 1024 * 1024))),
+        'temp_store': 'MEMORY',
+    }
+
+    # Postgres connection pool
+    PG_POOL_SIZE = int(os.getenv('PG_POOL_SIZE', '10'))
+    PG_MAX_OVERFLOW = int(os.getenv('PG_MAX_OVERFLOW', '20'))
+    PG_POOL_RECYCLE_SECONDS = int(os.getenv('PG_POOL_RECYCLE_SECONDS', '1800'))
+    PG_PREPARE_THRESHOLD = int(os.getenv('PG_PREPARE_THRESHOLD', '5'))
 
     # JWT in cookies
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'change-jwt-secret')
@@ -28,6 +51,21 @@ class Config:
     JWT_COOKIE_SAMESITE = 'Lax'
     JWT_COOKIE_CSRF_PROTECT = False  # Enable if you add CSRF tokens
 
+    # current_user identity cache (entries are also dropped when a User row changes)
+    USER_CACHE_TTL_SECONDS = float(os.getenv('USER_CACHE_TTL_SECONDS', '60'))
+    USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', '4096'))
+
+    # Member picker typeahead: results per query (default / max) and the hot-prefix cache
+    USER_SEARCH_LIMIT = int(os.getenv('USER_SEARCH_LIMIT', '10'))
+    USER_SEARCH_MAX_LIMIT = int(os.getenv('USER_SEARCH_MAX_LIMIT', '50'))
+    USER_SEARCH_CACHE_TTL_SECONDS = float(os.getenv('USER_SEARCH_CACHE_TTL_SECONDS', '30'))
+    USER_SEARCH_CACHE_SIZE = int(os.getenv('USER_SEARCH_CACHE_SIZE', '2048'))
+
+    # Password hashing: bcrypt cost, worker processes, and hashes allowed to wait
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', '12'))
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', str(os.cpu_count() or 1)))
+    PASSWORD_HASH_QUEUE = int(os.getenv('PASSWORD_HASH_QUEUE', '16'))
+
     # Token expiration
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(
         hours=int(os.getenv('JWT_ACCESS_TOKEN_EXPIRES_HOURS', '24'))
@@ -35,11 +73,72 @@ class Config:
 
     # Gemini AI
     GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
+    # Seconds a shared-expense request waits for Gemini to interpret split notes
+    GEMINI_SPLIT_TIMEOUT_SECONDS = float(os.getenv('GEMINI_SPLIT_TIMEOUT_SECONDS', '3'))
+    # Every model call: deadline, calls in flight, retries, and the circuit breaker
+    GEMINI_TIMEOUT_SECONDS = float(os.getenv('GEMINI_TIMEOUT_SECONDS', '10'))
+    GEMINI_MAX_CONCURRENCY = int(os.getenv('GEMINI_MAX_CONCURRENCY', '8'))
+    GEMINI_RETRIES = int(os.getenv('GEMINI_RETRIES', '2'))
+    GEMINI_BREAKER_THRESHOLD = int(os.getenv('GEMINI_BREAKER_THRESHOLD', '5'))
+    GEMINI_BREAKER_RESET_SECONDS = float(os.getenv('GEMINI_BREAKER_RESET_SECONDS', '30'))
+    # /api/gemini/payments: answer cache per normalized prompt and per-user token bucket
+    GEMINI_PROMPT_CACHE_TTL_SECONDS = float(os.getenv('GEMINI_PROMPT_CACHE_TTL_SECONDS', '300'))
+    GEMINI_PROMPT_CACHE_SIZE = int(os.getenv('GEMINI_PROMPT_CACHE_SIZE', '1024'))
+    GEMINI_RATE_LIMIT_PER_MINUTE = float(os.getenv('GEMINI_RATE_LIMIT_PER_MINUTE', '30'))
+    GEMINI_RATE_LIMIT_BURST = int(os.getenv('GEMINI_RATE_LIMIT_BURST', '10'))
+
+    # Receipt uploads: size cap and the preprocessing applied before Gemini sees them
+    RECEIPT_MAX_UPLOAD_BYTES = int(os.getenv('RECEIPT_MAX_UPLOAD_BYTES', str(10 * 1024 * 1024)))
+    RECEIPT_MAX_PIXELS = int(os.getenv('RECEIPT_MAX_PIXELS', '40000000'))
+    RECEIPT_MAX_SIDE = int(os.getenv('RECEIPT_MAX_SIDE', '1600'))
+    RECEIPT_JPEG_QUALITY = int(os.getenv('RECEIPT_JPEG_QUALITY', '70'))
+    RECEIPT_PREPROCESS_WORKERS = int(os.getenv('RECEIPT_PREPROCESS_WORKERS', '4'))
+
+    # Request body cap (Flask answers 413); bounds what Werkzeug spools before any route runs
+    MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', str(64 * 1024 * 1024)))
+
+    # Batch receipt uploads: shared worker pool, per-user concurrency and files per request
+    RECEIPT_BATCH_WORKERS = int(os.getenv('RECEIPT_BATCH_WORKERS', '8'))
+    RECEIPT_BATCH_PER_USER = int(os.getenv('RECEIPT_BATCH_PER_USER', '3'))
+    RECEIPT_BATCH_MAX_FILES = int(os.getenv('RECEIPT_BATCH_MAX_FILES', '50'))
+
+    # Receipt results cache (total stored bytes before least-recently-used eviction)
+    RECEIPT_CACHE_MAX_BYTES = int(os.getenv('RECEIPT_CACHE_MAX_BYTES', str(20 * 1024 * 1024)))
+
+    # Group overview: history rows per page (default and upper bound for ?limit=)
+    GROUP_HISTORY_PAGE_SIZE = int(os.getenv('GROUP_HISTORY_PAGE_SIZE', '20'))
+    GROUP_HISTORY_MAX_PAGE_SIZE = int(os.getenv('GROUP_HISTORY_MAX_PAGE_SIZE', '200'))
+
+    # Batch shared-expense creation: expenses accepted per request
+    SHARED_EXPENSE_BATCH_MAX = int(os.getenv('SHARED_EXPENSE_BATCH_MAX', '5000'))
+
+    # Cold storage for shared expenses: settled rows older than this move to the archive tables
+    ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', '90'))
+    ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', '1000'))
+    # Balance checkpoints leave out expenses younger than this (their transactions may still be open)
+    CHECKPOINT_SAFETY_SECONDS = int(os.getenv('CHECKPOINT_SAFETY_SECONDS', '300'))
+
+    # CSV/Parquet exports: rows fetched per cursor round trip (and per Parquet row group)
+    EXPORT_CHUNK_ROWS = int(os.getenv('EXPORT_CHUNK_ROWS', '5000'))
+
+    # Multi-currency: amounts are converted with daily rates (units per 1 BASE_CURRENCY)
+    BASE_CURRENCY = os.getenv('BASE_CURRENCY', 'USD').upper()
+    FX_RATES_FILE = os.getenv('FX_RATES_FILE', '')
+    FX_CACHE_TTL_SECONDS = int(os.getenv('FX_CACHE_TTL_SECONDS', '3600'))
+    # How long a process trusts its view of the newest rate load before asking the database again
+    FX_REVISION_TTL_SECONDS = int(os.getenv('FX_REVISION_TTL_SECONDS', '30'))
 
     # Google Calendar OAuth
     GOOGLE_CALENDAR_CLIENT_ID = os.getenv('GOOGLE_CALENDAR_CLIENT_ID')
     GOOGLE_CALENDAR_CLIENT_SECRET = os.getenv('GOOGLE_CALENDAR_CLIENT_SECRET')
 
+    # Response compression: smallest body worth compressing, and gzip level / brotli quality
+    COMPRESS_MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', '1024'))
+    COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', '5'))
+
+    # Static assets: content-hashed URLs, precompressed bodies, immutable caching (off in debug)
+    STATIC_FINGERPRINTS = os.getenv('STATIC_FINGERPRINTS', 'True') == 'True'
+
     # CORS
     CORS_ORIGINS = os.getenv(
         'CORS_ORIGINS',
@@ -51,6 +150,37 @@ class Config:
     MOCK_VENMO_ENABLED = os.getenv('MOCK_VENMO_ENABLED', 'True') == 'True'
 
 
+def engine_options(config) -> dict:
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for the configured database.
+
+    SQLite gets its PRAGMAs on connect (see extensions.configure_engines);
+    here it only needs the connection-level busy timeout. Postgres gets a
+    sized, pre-pinged, recycled pool, and with psycopg 3 server-side
+    prepared statements for queries run `PG_PREPARE_THRESHOLD` times.
+    """
+    uri = config['SQLALCHEMY_DATABASE_URI']
+    if config.get('DB_ENGINE_PROFILE', 'auto') == 'none':
+        return {}
+
+    if uri.startswith('sqlite'):
+        return {'connect_args': {'timeout': config['SQLITE_PRAGMAS']['busy_timeout'] / 1000}}
+
+    if uri.startswith('postgres'):
+        options = {
+            'pool_size': config['PG_POOL_SIZE'],
+            'max_overflow': config['PG_MAX_OVERFLOW'],
+            'pool_pre_ping': True,
+            'pool_recycle': config['PG_POOL_RECYCLE_SECONDS'],
+            'pool_use_lifo': True,  # idle extras age out instead of staying warm
+        }
+        if uri.startswith('postgresql+psycopg:'):
+            options['connect_args'] = {'prepare_threshold': config['PG_PREPARE_THRESHOLD']}
+        return options
+
+    return {}
+
+
 class DevelopmentConfig(Config):
     DEBUG = True
 
@@ -59,6 +189,7 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=5)
+    BCRYPT_LOG_ROUNDS = 4
 
 
 class ProductionConfig(Config):
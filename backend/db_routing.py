@@ -0,0 +1,90 @@
+# backend/db_routing.py
+
+import itertools
+import time
+
+import sqlalchemy as sa
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from flask_sqlalchemy.session import Session
+
+STICKY_COOKIE = 'db_primary_until'
+READ_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+
+_next_replica = itertools.count()
+
+
+class RoutingSession(Session):
+    """
+    `db.session` that sends the reads of a routed request (see
+    `init_read_routing`) to the replica picked for that request.
+
+    Anything that writes stays on the primary: ORM flushes and
+    INSERT/UPDATE/DELETE statements. Explicit binds are respected.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and not self._flushing
+            and not isinstance(clause, sa.UpdateBase)
+            and has_request_context()
+            and g.get('db_read_replica') is not None
+        ):
+            return g.db_read_replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _note_flush(_session, _flush_context):
+    if has_request_context():
+        g.db_wrote = True
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _note_bulk_write(state):
+    if (state.is_insert or state.is_update or state.is_delete) and has_request_context():
+        g.db_wrote = True
+
+
+def init_read_routing(app):
+    """
+    Route reads of GET/HEAD requests to replicas when any are configured.
+
+    A successful request that wrote anything (any method: the OAuth callback
+    is a GET) sets a short-lived cookie; while it is valid that client's
+    reads stay on the primary, so it always sees its own writes despite
+    replication lag.
+
+    Replica engines are kept in `app.extensions['db_replicas']` rather than
+    SQLALCHEMY_BINDS: they mirror the primary's tables and own no models.
+    """
+    from backend.extensions import configure_engines
+
+    options = app.config['SQLALCHEMY_ENGINE_OPTIONS']
+    replicas = [sa.create_engine(uri, **options) for uri in app.config['SQLALCHEMY_REPLICA_URIS']]
+    configure_engines(app, replicas)
+    app.extensions['db_replicas'] = replicas
+    sticky_seconds = app.config['REPLICA_STICKY_SECONDS']
+
+    @app.before_request
+    def _choose_session_target():
+        if request.method not in READ_METHODS:
+            return
+        try:
+            primary_until = float(request.cookies.get(STICKY_COOKIE, 0))
+        except ValueError:
+            primary_until = 0
+        if primary_until < time.time():
+            # One replica per request (round-robin) so its reads see one consistent snapshot
+            g.db_read_replica = replicas[next(_next_replica) % len(replicas)]
+
+    @app.after_request
+    def _stick_after_write(response):
+        wrote = request.method not in READ_METHODS or g.get('db_wrote')
+        if wrote and response.status_code < 400:
+            response.set_cookie(
+                STICKY_COOKIE, f"{time.time() + sticky_seconds:.3f}",
+                max_age=int(sticky_seconds) + 1, httponly=True, samesite='Lax',
+            )
+        return response
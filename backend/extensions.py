@@ -1,10 +1,35 @@
 # backend/extensions.py
 
 from flask_sqlalchemy import SQLAlchemy
-from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager
+from sqlalchemy import event
+from backend.db_routing import RoutingSession
 
 # instantiate extensions
-db     = SQLAlchemy()
-bcrypt = Bcrypt()
+db     = SQLAlchemy(session_options={'class_': RoutingSession})
 jwt    = JWTManager()
+
+
+def _sqlite_pragmas(pragmas):
+    def apply(dbapi_connection, _record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+    return apply
+
+
+def configure_engines(app, engines=None):
+    """
+    Apply the SQLite PRAGMA profile to each new connection of the app's
+    SQLite engines (or of `engines`, e.g. read replicas).
+    """
+    pragmas = app.config.get('SQLITE_PRAGMAS')
+    if not pragmas or app.config.get('DB_ENGINE_PROFILE') == 'none':
+        return
+    if engines is None:
+        with app.app_context():
+            engines = list(db.engines.values())
+    for engine in engines:
+        if engine.dialect.name == 'sqlite':
+            event.listen(engine, 'connect', _sqlite_pragmas(pragmas))
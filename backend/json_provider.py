@@ -0,0 +1,61 @@
+# backend/json_provider.py
+
+from datetime import date, datetime
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+
+class IsoJSONProvider(DefaultJSONProvider):
+    """
+    Flask's stdlib provider, but dates and datetimes are written as ISO 8601
+    (`datetime.isoformat()`), so routes can return model values directly.
+    """
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, (datetime, date)):
+            return o.isoformat()
+        return DefaultJSONProvider.default(o)
+
+
+class FastJSONProvider(IsoJSONProvider):
+    """
+    orjson-backed provider. Output matches `IsoJSONProvider` except that
+    keys keep insertion order instead of being sorted.
+
+    Datetimes, dates, numpy arrays/scalars and non-string dict keys (e.g.
+    user ids in balance maps) are encoded natively in Rust.
+    """
+
+    _OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY if orjson else 0
+
+    def _dumps_bytes(self, obj) -> bytes:
+        options = self._OPTIONS
+        if self._app.debug:
+            options |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=options)
+
+    def dumps(self, obj, **kwargs) -> str:
+        if kwargs:
+            # Callers asking for stdlib options (indent, separators, ...) get the stdlib encoder
+            return super().dumps(obj, **kwargs)
+        return self._dumps_bytes(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._dumps_bytes(obj), mimetype=self.mimetype)
+
+
+def json_provider_class():
+    """The fastest available provider: orjson when installed, the stdlib otherwise."""
+    return FastJSONProvider if orjson is not None else IsoJSONProvider
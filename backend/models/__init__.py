@@ -1,6 +1,14 @@
 from .user import User
-from .shared import Group, SharedExpense, Split, Payment, group_members
-from .personal import PersonalExpense, BudgetCategory
+from .shared import (
+    Group, SharedExpense, Split, Payment, group_members,
+    BalanceCheckpoint, ArchivedSharedExpense, ArchivedSplit,
+)
+from .personal import (
+    PersonalExpense, BudgetCategory, MonthlyCategorySpend, RecurringScanState,
+    RecurringRule, SchedulerLease,
+)
+from .cache import ReceiptCache
+from .fx import FxRate
 
 __all__ = [
     "User",
@@ -9,6 +17,15 @@ __all__ = [
     "Split",
     "Payment",
     "group_members",
+    "BalanceCheckpoint",
+    "ArchivedSharedExpense",
+    "ArchivedSplit",
     "PersonalExpense",
     "BudgetCategory",
+    "MonthlyCategorySpend",
+    "RecurringScanState",
+    "RecurringRule",
+    "SchedulerLease",
+    "ReceiptCache",
+    "FxRate",
 ]
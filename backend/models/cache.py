@@ -0,0 +1,18 @@
+# backend/models/cache.py
+
+from datetime import datetime
+from backend.extensions import db
+
+class ReceiptCache(db.Model):
+    """Parsed receipt results keyed by a hash of the image bytes and the context."""
+    __tablename__ = 'receipt_cache'
+
+    key = db.Column(db.String(64), primary_key=True)            # sha256 hex
+    result = db.Column(db.Text, nullable=False)                 # JSON-encoded Gemini output
+    size_bytes = db.Column(db.Integer, nullable=False)
+    hits = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_used_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f"<ReceiptCache {self.key[:12]} ({self.hits} hits)>"
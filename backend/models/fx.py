@@ -0,0 +1,18 @@
+# backend/models/fx.py
+
+from datetime import datetime
+
+from backend.extensions import db
+
+class FxRate(db.Model):
+    """Daily exchange rate: units of `currency` that one unit of BASE_CURRENCY buys on `day`."""
+    __tablename__ = 'fx_rates'
+
+    currency = db.Column(db.String(3), primary_key=True)   # ISO 4217
+    day = db.Column(db.Date, primary_key=True)
+    rate = db.Column(db.Float, nullable=False)
+    # When this rate was last written; the newest one is the FX table's revision
+    loaded_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f"<FxRate {self.day} {self.currency} {self.rate}>"
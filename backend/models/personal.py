@@ -5,15 +5,21 @@ from backend.extensions import db
 
 class PersonalExpense(db.Model):
     __tablename__ = 'personal_expenses'
+    __table_args__ = (
+        db.Index('ix_personal_expenses_user_merchant', 'user_id', 'merchant_key'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     amount = db.Column(db.Float, nullable=False)
+    currency = db.Column(db.String(3), nullable=True)          # ISO 4217; NULL = BASE_CURRENCY
     description = db.Column(db.String(255), nullable=False)
     category = db.Column(db.String(100), nullable=False)       # from Gemini
     gemini_confidence = db.Column(db.Float, nullable=True)     # AI confidence
     receipt_image_url = db.Column(db.String(255), nullable=True)
     is_recurring = db.Column(db.Boolean, default=False)
+    merchant_key = db.Column(db.String(100), nullable=True)    # normalized merchant
+    recurring_rule_id = db.Column(db.Integer, db.ForeignKey('recurring_rules.id'), nullable=True)  # set on generated rows
     transaction_date = db.Column(db.DateTime, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
@@ -32,3 +38,78 @@ class BudgetCategory(db.Model):
 
     def __repr__(self):
         return f"<BudgetCategory {self.name} (limit ${self.monthly_limit})>"
+
+class MonthlyCategorySpend(db.Model):
+    """
+    Rollup of personal spending per (user, category, month).
+    Maintained incrementally by the personal expense routes so budget
+    checks never have to scan `personal_expenses`.
+    """
+    __tablename__ = 'monthly_category_spend'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'category', 'month', name='uq_monthly_category_spend'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    category = db.Column(db.String(100), nullable=False)
+    month = db.Column(db.Date, nullable=False)                 # first day of the month
+    total = db.Column(db.Float, nullable=False, default=0.0)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<MonthlyCategorySpend {self.category} {self.month:%Y-%m} ${self.total}>"
+
+class RecurringScanState(db.Model):
+    """Per-user watermark for the incremental recurring-expense detector."""
+    __tablename__ = 'recurring_scan_state'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    last_expense_id = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<RecurringScanState user {self.user_id} @ {self.last_expense_id}>"
+
+class RecurringRule(db.Model):
+    """
+    A recurring personal expense. `next_due_at` is the rule's watermark:
+    the scheduler materializes every occurrence up to "now" and moves it forward.
+    """
+    __tablename__ = 'recurring_rules'
+    __table_args__ = (
+        db.Index('ix_recurring_rules_due', 'active', 'next_due_at'),
+        db.Index('ix_recurring_rules_user_merchant', 'user_id', 'merchant_key'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    source_expense_id = db.Column(
+        db.Integer,
+        db.ForeignKey('personal_expenses.id', ondelete='SET NULL', use_alter=True),
+        nullable=True
+    )
+    amount = db.Column(db.Float, nullable=False)
+    currency = db.Column(db.String(3), nullable=True)
+    description = db.Column(db.String(255), nullable=False)
+    category = db.Column(db.String(100), nullable=False)
+    merchant_key = db.Column(db.String(100), nullable=True)
+    cadence = db.Column(db.String(20), nullable=False, default='monthly')
+    next_due_at = db.Column(db.DateTime, nullable=False)
+    last_materialized_at = db.Column(db.DateTime, nullable=True)
+    active = db.Column(db.Boolean, nullable=False, default=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<RecurringRule {self.description} {self.cadence} next {self.next_due_at}>"
+
+class SchedulerLease(db.Model):
+    """A named, expiring lock so only one process runs a periodic job at a time."""
+    __tablename__ = 'scheduler_leases'
+
+    name = db.Column(db.String(50), primary_key=True)
+    holder = db.Column(db.String(100), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<SchedulerLease {self.name} held by {self.holder}>"
@@ -17,6 +17,9 @@ class Group(db.Model):
     name = db.Column(db.String(100), nullable=False)
     created_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Bumped whenever the group's expenses, splits, payments or members change (see utils/group_ledger)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    currency = db.Column(db.String(3), nullable=True)  # balances are shown in it; NULL = BASE_CURRENCY
 
     # many‑to‑many → User
     members = db.relationship('User', secondary=group_members, backref=db.backref('groups', lazy='dynamic'), lazy='dynamic')
@@ -26,11 +29,14 @@ class Group(db.Model):
 
 class SharedExpense(db.Model):
     __tablename__ = 'shared_expenses'
+    # Ids are never reused once rows move to the archive (checkpoints are positions in id order)
+    __table_args__ = {'sqlite_autoincrement': True}
 
     id = db.Column(db.Integer, primary_key=True)
-    group_id = db.Column(db.Integer, db.ForeignKey('groups.id'), nullable=False)
+    group_id = db.Column(db.Integer, db.ForeignKey('groups.id'), nullable=False, index=True)
     paid_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     amount = db.Column(db.Float, nullable=False)
+    currency = db.Column(db.String(3), nullable=True)  # ISO 4217; NULL = the group's currency
     description = db.Column(db.String(200), nullable=False)
     category = db.Column(db.String(50))
     notes = db.Column(db.Text)  # for AI context
@@ -45,7 +51,7 @@ class Split(db.Model):
     __tablename__ = 'splits'
 
     id = db.Column(db.Integer, primary_key=True)
-    expense_id = db.Column(db.Integer, db.ForeignKey('shared_expenses.id'), nullable=False)
+    expense_id = db.Column(db.Integer, db.ForeignKey('shared_expenses.id'), nullable=False, index=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     amount_owed = db.Column(db.Float, nullable=False)
     is_paid = db.Column(db.Boolean, default=False)
@@ -53,6 +59,50 @@ class Split(db.Model):
     def __repr__(self):
         return f"<Split: User {self.user_id} owes ${self.amount_owed}>"
 
+class BalanceCheckpoint(db.Model):
+    """
+    A member's net balance in a group from every expense with
+    id <= through_expense_id. Current balance = checkpoint + later expenses.
+    """
+    __tablename__ = 'balance_checkpoints'
+
+    group_id = db.Column(db.Integer, db.ForeignKey('groups.id'), primary_key=True)
+    user_id = db.Column(db.Integer, primary_key=True)
+    amount = db.Column(db.Float, nullable=False)
+    through_expense_id = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<BalanceCheckpoint group {self.group_id} user {self.user_id}: {self.amount}>"
+
+class ArchivedSharedExpense(db.Model):
+    """Settled, checkpointed expenses moved out of shared_expenses (same ids and columns)."""
+    __tablename__ = 'shared_expenses_archive'
+    __table_args__ = (
+        db.Index('ix_shared_expenses_archive_group', 'group_id', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    group_id = db.Column(db.Integer, nullable=False)
+    paid_by = db.Column(db.Integer, nullable=False)
+    amount = db.Column(db.Float, nullable=False)
+    currency = db.Column(db.String(3), nullable=True)
+    description = db.Column(db.String(200), nullable=False)
+    category = db.Column(db.String(50))
+    notes = db.Column(db.Text)
+    created_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class ArchivedSplit(db.Model):
+    """Splits of archived expenses."""
+    __tablename__ = 'splits_archive'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    expense_id = db.Column(db.Integer, nullable=False, index=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    amount_owed = db.Column(db.Float, nullable=False)
+    is_paid = db.Column(db.Boolean, default=False)
+
 class Payment(db.Model):
     __tablename__ = 'payments'
 
@@ -60,6 +110,7 @@ class Payment(db.Model):
     from_user = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     to_user = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     amount = db.Column(db.Float, nullable=False)
+    currency = db.Column(db.String(3), nullable=True)  # ISO 4217; NULL = BASE_CURRENCY
     status = db.Column(db.String(20), default="pending")
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
@@ -2,7 +2,7 @@
 
 from datetime import datetime
 from backend.extensions import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from backend.utils.passwords import hash_password, needs_rehash, verify_password
 from sqlalchemy.dialects.postgresql import JSON
 
 class User(db.Model):
@@ -42,10 +42,25 @@ class User(db.Model):
     )
 
     def set_password(self, password: str):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password: str) -> bool:
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
+
+    def password_needs_rehash(self) -> bool:
+        return needs_rehash(self.password_hash)
 
     def __repr__(self):
         return f"<User {self.username}>"
+
+
+# Case-insensitive prefix search (utils/user_search) range-scans these. Postgres
+# orders text by the database collation, not by code point, so there the key
+# (and its index) is lower(...) COLLATE "C".
+def _not_postgres(ddl, target, bind, dialect, **kw):
+    return dialect.name != 'postgresql'
+
+db.Index('ix_user_username_lower', db.func.lower(User.username)).ddl_if(callable_=_not_postgres)
+db.Index('ix_user_email_lower', db.func.lower(User.email)).ddl_if(callable_=_not_postgres)
+db.Index('ix_user_username_lower_c', db.func.lower(User.username).collate('C')).ddl_if(dialect='postgresql')
+db.Index('ix_user_email_lower_c', db.func.lower(User.email).collate('C')).ddl_if(dialect='postgresql')
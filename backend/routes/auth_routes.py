@@ -3,16 +3,23 @@ from flask_jwt_extended import (
     create_access_token,
     jwt_required,
     unset_jwt_cookies,
-    get_jwt_identity
+    current_user
 )
-from backend.extensions import db, bcrypt
+from backend.extensions import db
 from backend.models.user import User
+from backend.utils.passwords import PasswordHasherBusy
 
-from google_auth_oauthlib.flow import Flow
 import os
 
 auth_bp = Blueprint('auth', __name__)
 
+
+def _busy():
+    resp = jsonify(error="Server is busy, please retry")
+    resp.headers['Retry-After'] = '1'
+    return resp, 503
+
+
 # ========== Registro ==========
 @auth_bp.route('/register', methods=['POST'])
 def register():
@@ -28,7 +35,10 @@ def register():
         return jsonify(error="Username or email already exists"), 409
 
     user = User(username=username, email=email)
-    user.set_password(password)
+    try:
+        user.set_password(password)
+    except PasswordHasherBusy:
+        return _busy()
     db.session.add(user)
     db.session.commit()
 
@@ -45,8 +55,16 @@ def login():
         (User.username == identifier) | (User.email == identifier)
     ).first()
 
-    if not user or not user.check_password(password):
-        return jsonify(error="Invalid credentials"), 401
+    try:
+        if not user or not user.check_password(password):
+            return jsonify(error="Invalid credentials"), 401
+
+        # Cost changed or legacy werkzeug hash: upgrade while we have the plaintext
+        if user.password_needs_rehash():
+            user.set_password(password)
+            db.session.commit()
+    except PasswordHasherBusy:
+        return _busy()
 
     access_token = create_access_token(identity=str(user.id))
     resp = make_response(jsonify(message="Login successful"), 200)
@@ -72,6 +90,8 @@ def logout():
 @auth_bp.route('/calendar/connect')
 @jwt_required()
 def calendar_connect():
+    from google_auth_oauthlib.flow import Flow  # heavy; only needed for the OAuth dance
+
     flow = Flow.from_client_config(
         {
             "web": {
@@ -97,6 +117,8 @@ def calendar_connect():
 @auth_bp.route('/oauth2callback')
 @jwt_required()
 def oauth2callback():
+    from google_auth_oauthlib.flow import Flow
+
     flow = Flow.from_client_config(
         {
             "web": {
@@ -113,8 +135,7 @@ def oauth2callback():
     flow.fetch_token(authorization_response=request.url)
     credentials = flow.credentials
 
-    user_id = int(get_jwt_identity())
-    user = User.query.get(user_id)
+    user = current_user
 
     if user:
         user.google_calendar_token = {
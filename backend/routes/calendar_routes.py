@@ -1,8 +1,5 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from backend.models.user import User
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
+from flask_jwt_extended import jwt_required, current_user
 from datetime import datetime, timedelta
 
 calendar_bp = Blueprint('calendar', __name__)
@@ -10,12 +7,15 @@ calendar_bp = Blueprint('calendar', __name__)
 @calendar_bp.route('/calendar/create', methods=['POST'])
 @jwt_required()
 def create_calendar_event():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = current_user
 
-    if not user or not user.google_calendar_token:
+    if not user.google_calendar_token:
         return jsonify(error="Google Calendar not connected"), 400
 
+    # Google API clients are imported on first use to keep app startup fast
+    from google.oauth2.credentials import Credentials
+    from googleapiclient.discovery import build
+
     creds = Credentials(
         token=user.google_calendar_token['token'],
         refresh_token=user.google_calendar_token['refresh_token'],
@@ -1,13 +1,13 @@
 # backend/routes/frontend_routes.py
 
 from flask import Blueprint, render_template, redirect, url_for
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from backend.models.user import User
-from backend.models.personal import PersonalExpense, BudgetCategory
-from backend.models.shared import Group, SharedExpense, Split
-from backend.utils.split_logic import calculate_balances_from_splits
-from datetime import datetime
-from flask_jwt_extended import (jwt_required, get_jwt_identity, verify_jwt_in_request)
+from flask_jwt_extended import jwt_required, get_jwt_identity, current_user
+from backend.models.personal import PersonalExpense
+from backend.models.shared import Group
+from backend.utils.fx import to_currency
+from backend.utils.group_ledger import group_balances
+from backend.utils.budget_rollups import get_budget_status, get_category_spending
+from datetime import date, datetime
 
 frontend_bp = Blueprint('frontend', __name__)
 
@@ -26,43 +26,34 @@ def register_page():
 @frontend_bp.route('/dashboard', methods=['GET'])
 @jwt_required()
 def dashboard():
-    user_id = int(get_jwt_identity())
-    user = User.query.get(user_id)
-    username = user.username if user else 'User'
+    user = current_user
+    user_id = user.id
+    username = user.username
 
-    # Personal total spent this month
-    month_start = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    personal_exps = (
-        PersonalExpense.query
-        .filter_by(user_id=user_id)
-        .filter(PersonalExpense.transaction_date >= month_start)
-        .all()
-    )
-    personal_total = sum(e.amount for e in personal_exps)
+    # Personal total spent this month (from the monthly rollups)
+    personal_total = round(sum(get_category_spending(user_id).values()), 2)
 
-    # Shared balance across your groups
+    # Shared balance across your groups, in the base currency at today's rates
     groups = Group.query.filter(Group.members.any(id=user_id)).all()
-    shared_balance = 0.0
-    for grp in groups:
-        for exp in SharedExpense.query.filter_by(group_id=grp.id):
-            splits = Split.query.filter_by(expense_id=exp.id).all()
-            bal = calculate_balances_from_splits(splits, exp.paid_by)
-            shared_balance += bal.get(user_id, 0)
+    balances = [group_balances(grp.id, grp.currency).get(user_id, 0) for grp in groups]
+    shared_balance = float(to_currency(balances, [grp.currency for grp in groups], [date.today()] * len(groups)).sum())
 
     # Budget status
-    budgets = BudgetCategory.query.filter_by(user_id=user_id).all()
+    budgets = get_budget_status(user_id)
     if budgets:
-        over = any(b.current_spending > b.monthly_limit for b in budgets)
+        over = any(b['over_budget'] for b in budgets)
         budget_status = "Over budget" if over else "Under budget"
     else:
         budget_status = "No budget set"
 
     # Recent 5 personal expenses
-    recent_exps = sorted(
-        personal_exps,
-        key=lambda e: e.transaction_date,
-        reverse=True
-    )[:5]
+    recent_exps = (
+        PersonalExpense.query
+        .filter_by(user_id=user_id)
+        .order_by(PersonalExpense.transaction_date.desc())
+        .limit(5)
+        .all()
+    )
 
     return render_template(
         'dashboard.html',
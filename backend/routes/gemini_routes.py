@@ -1,19 +1,87 @@
 # backend/routes/gemini_routes.py
-from flask import Blueprint, request, jsonify
-from backend.utils.gemini_utils import _MODEL
+import hashlib
+import math
+import re
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from backend.utils import gemini_utils
+from backend.utils.caching import RateLimiter, SingleFlight, TTLCache
+from backend.utils.gemini_client import CircuitOpen, GeminiTimeout, GeminiUnavailable
 
 gemini_bp = Blueprint('gemini', __name__)
 
+
+def _in_flight() -> SingleFlight:
+    # Identical prompts share one upstream call while in flight, then the cached answer (per app)
+    single = current_app.extensions.get('gemini_in_flight')
+    if single is None:
+        single = current_app.extensions['gemini_in_flight'] = SingleFlight()
+    return single
+
+
+def _answers() -> TTLCache:
+    cache = current_app.extensions.get('gemini_answers')
+    if cache is None:
+        cfg = current_app.config
+        cache = current_app.extensions['gemini_answers'] = TTLCache(
+            cfg['GEMINI_PROMPT_CACHE_SIZE'], cfg['GEMINI_PROMPT_CACHE_TTL_SECONDS']
+        )
+    return cache
+
+
+def _limiter() -> RateLimiter:
+    limiter = current_app.extensions.get('gemini_limiter')
+    if limiter is None:
+        cfg = current_app.config
+        limiter = current_app.extensions['gemini_limiter'] = RateLimiter(
+            cfg['GEMINI_RATE_LIMIT_PER_MINUTE'] / 60, cfg['GEMINI_RATE_LIMIT_BURST']
+        )
+    return limiter
+
+
+def prompt_key(prompt: str) -> str:
+    """Cache key for a prompt: case and whitespace differences do not matter."""
+    normalized = re.sub(r"\s+", " ", prompt).strip().casefold()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
 @gemini_bp.route('/api/gemini/payments', methods=['POST'])
 def get_payment_suggestions():
     data = request.get_json() or {}
     prompt = data.get('prompt', '')
     
-    if not _MODEL or not prompt:
+    if not gemini_utils._get_model() or not prompt:
         return jsonify(output="Gemini model not available or prompt missing."), 400
 
+    verify_jwt_in_request(optional=True)
+    retry_after = _limiter().acquire(str(get_jwt_identity() or request.remote_addr))
+    if retry_after:
+        resp = jsonify(output="Too many requests, slow down.")
+        resp.headers['Retry-After'] = str(math.ceil(retry_after))
+        return resp, 429
+
+    key = prompt_key(prompt)
+    cached = _answers().get(key)
+    if cached is not None:
+        return jsonify(output=cached, cached=True), 200
+
+    def ask():
+        text = gemini_utils._generate_text(prompt)
+        _answers().set(key, text)
+        return text
+
     try:
-        response = _MODEL.generate_content(prompt)
-        return jsonify(output=response.text), 200
-    except Exception as e:
-        return jsonify(output="Error: " + str(e)), 500
+        text, shared = _in_flight().do(key, ask)
+        return jsonify(output=text, cached=shared), 200
+    except CircuitOpen as e:
+        return jsonify(output="Error: " + str(e)), 503
+    except GeminiTimeout as e:
+        return jsonify(output="Error: " + str(e)), 504
+    except GeminiUnavailable as e:
+        return jsonify(output="Error: " + str(e)), 502
+
+
+@gemini_bp.route('/api/gemini/status', methods=['GET'])
+def gemini_status():
+    """Circuit state and call counters of the shared Gemini client."""
+    return jsonify(configured=gemini_utils._get_model() is not None, **gemini_utils._client().metrics()), 200
@@ -1,13 +1,22 @@
 # backend/routes/personal_routes.py
 
 from flask import Blueprint, request, jsonify, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, current_user
 from datetime import datetime
 from backend.extensions import db
-from backend.models.personal import PersonalExpense
+from backend.models.personal import PersonalExpense, RecurringRule
 from backend.models.user import User
+from backend.utils.fx import UnknownCurrency, normalize_currency
 from backend.utils.gemini_utils import categorize_expense_text
 from backend.utils.google_calendar import create_calendar_reminder
+from backend.utils.analytics import load_expense_columns, compute_spending_analytics, normalize_merchant
+from backend.utils.recurring_detection import detect_recurring
+from backend.utils.recurring_scheduler import (
+    CADENCE_STEPS, create_rule, create_rules_for_merchants, deactivate_rules
+)
+from backend.utils.budget_rollups import record_expenses, remove_expenses, get_budget_status, get_category_spending
+from backend.utils import ledger_export
+from sqlalchemy import select
 
 personal_bp = Blueprint('personal', __name__)
 
@@ -28,6 +37,7 @@ def add_personal_expense():
     description = data.get('description')
     tx_date = data.get('transaction_date')
     is_recurring = bool(data.get('is_recurring', False))
+    cadence = data.get('cadence', 'monthly')
 
     if amount is None or not description or not tx_date:
         return jsonify(error="`amount`, `description` and `transaction_date` are required"), 400
@@ -41,6 +51,14 @@ def add_personal_expense():
     if not when:
         return jsonify(error="`transaction_date` must be ISO‑formatted"), 400
 
+    if cadence not in CADENCE_STEPS:
+        return jsonify(error=f"`cadence` must be one of {', '.join(CADENCE_STEPS)}"), 400
+
+    try:
+        currency = normalize_currency(data.get('currency'))
+    except UnknownCurrency as e:
+        return jsonify(error=str(e)), 400
+
     # Categoría via Gemini
     ai_resp = categorize_expense_text(description, context_notes=None)
     if not isinstance(ai_resp, dict):
@@ -55,24 +73,32 @@ def add_personal_expense():
 
     category = ai_resp.get('category', 'Uncategorized')
     confidence = ai_resp.get('confidence')
+    # Gemini's recurrence guess applies only when the client did not say
+    if 'is_recurring' not in data:
+        is_recurring = str(ai_resp.get('recurring', '')).lower() == 'yes'
 
     # Crear y guardar el gasto
     exp = PersonalExpense(
         user_id=user_id,
         amount=amount,
+        currency=currency,
         description=description,
         category=category,
         gemini_confidence=confidence,
         is_recurring=is_recurring,
+        merchant_key=normalize_merchant(description),
         transaction_date=when
     )
     db.session.add(exp)
     db.session.flush()  # para obtener exp.id
+    record_expenses([exp])
+    if is_recurring:
+        create_rule(exp, cadence)
 
     # Si es recurrente y el usuario tiene token de Google Calendar, crear recordatorio
     if is_recurring and current_app.config.get('ENABLE_CALENDAR') and hasattr(User, 'google_calendar_token'):
-        user = User.query.get(user_id)
-        if user and getattr(user, 'google_calendar_token', None):
+        user = current_user
+        if getattr(user, 'google_calendar_token', None):
             try:
                 ev_id = create_calendar_reminder(
                     user_token=user.google_calendar_token,
@@ -95,10 +121,11 @@ def add_personal_expense():
         expense={
             "id": exp.id,
             "amount": exp.amount,
+            "currency": exp.currency,
             "description": exp.description,
             "category": exp.category,
             "confidence": exp.gemini_confidence,
-            "transaction_date": exp.transaction_date.isoformat(),
+            "transaction_date": exp.transaction_date,
             "is_recurring": exp.is_recurring
         }
     ), 201
@@ -113,6 +140,7 @@ def import_mock_transactions():
         return jsonify(error="`transactions` must be an array"), 400
 
     imported = []
+    new_exps = []
     for t in txns:
         desc = t.get('description')
         amt = t.get('amount')
@@ -121,7 +149,8 @@ def import_mock_transactions():
             continue
         try:
             amt = float(amt)
-        except ValueError:
+            currency = normalize_currency(t.get('currency'))
+        except (ValueError, UnknownCurrency):
             continue
 
         when = _parse_iso_datetime(date_s) or datetime.utcnow()
@@ -133,22 +162,30 @@ def import_mock_transactions():
         exp = PersonalExpense(
             user_id=user_id,
             amount=amt,
+            currency=currency,
             description=desc,
             category=category,
+            merchant_key=normalize_merchant(desc),
             transaction_date=when
         )
         db.session.add(exp)
+        new_exps.append(exp)
         imported.append({"description": desc, "amount": amt})
 
+    record_expenses(new_exps)
     try:
         db.session.commit()
     except Exception as e:
         db.session.rollback()
         return jsonify(error="Import failed: " + str(e)), 500
 
+    # Only the newly imported rows are scanned for subscriptions
+    recurring = detect_recurring(user_id).get(user_id, {})
+
     return jsonify(
         message=f"Imported {len(imported)} transactions",
-        imported=imported
+        imported=imported,
+        recurring=recurring
     ), 200
 
 @personal_bp.route('/expenses', methods=['GET'])
@@ -166,19 +203,56 @@ def list_personal_expenses():
     result = [{
         "id": e.id,
         "amount": e.amount,
+        "currency": e.currency,
         "description": e.description,
         "category": e.category,
-        "transaction_date": e.transaction_date.isoformat(),
+        "transaction_date": e.transaction_date,
         "is_recurring": e.is_recurring
     } for e in exps]
 
     return jsonify(expenses=result), 200
 
+PERSONAL_EXPORT_COLUMNS = [
+    ('id', 'int'), ('transaction_date', 'datetime'), ('amount', 'float'), ('currency', 'str'),
+    ('category', 'str'), ('description', 'str'), ('merchant', 'str'), ('is_recurring', 'bool'),
+]
+
+@personal_bp.route('/expenses/export', methods=['GET'])
+@jwt_required()
+def export_personal_expenses():
+    """
+    Stream all of the user's expenses as a download, in id order.
+    Query args: format (csv | parquet), since (ISO date), after_id — resume
+    an interrupted export from the last id received.
+    """
+    user_id = int(get_jwt_identity())
+    fmt = request.args.get('format', 'csv')
+    after_id = request.args.get('after_id', 0, type=int)
+    if fmt not in ledger_export.FORMATS:
+        return jsonify(error="format must be csv or parquet"), 400
+    if fmt == 'parquet' and ledger_export.pq is None:
+        return jsonify(error="Parquet export needs pyarrow installed"), 501
+
+    stmt = select(
+        PersonalExpense.id, PersonalExpense.transaction_date, PersonalExpense.amount, PersonalExpense.currency,
+        PersonalExpense.category, PersonalExpense.description, PersonalExpense.merchant_key,
+        PersonalExpense.is_recurring
+    ).where(PersonalExpense.user_id == user_id)
+    since = _parse_iso_datetime(request.args.get('since', ''))
+    if since:
+        stmt = stmt.where(PersonalExpense.transaction_date >= since)
+
+    chunks = ledger_export.iter_chunks(stmt, PersonalExpense.id, after_id, current_app.config['EXPORT_CHUNK_ROWS'])
+    return ledger_export.export_response(fmt, 'expenses', PERSONAL_EXPORT_COLUMNS, chunks)
+
 @personal_bp.route('/expenses/<int:expense_id>', methods=['DELETE'])
 @jwt_required()
 def delete_personal_expense(expense_id):
     user_id = int(get_jwt_identity())
     exp = PersonalExpense.query.filter_by(id=expense_id, user_id=user_id).first_or_404()
+    remove_expenses([exp])
+    # A rule created from this expense must not keep generating copies of it
+    deactivate_rules(user_id, source_expense_ids=[exp.id])
     db.session.delete(exp)
     try:
         db.session.commit()
@@ -186,3 +260,87 @@ def delete_personal_expense(expense_id):
         db.session.rollback()
         return jsonify(error="Could not delete: " + str(e)), 500
     return jsonify(message=f"Expense {expense_id} deleted"), 200
+
+@personal_bp.route('/budgets', methods=['GET'])
+@jwt_required()
+def budget_status():
+    """Per-category spend for the current month, read from the monthly rollups."""
+    user_id = int(get_jwt_identity())
+    return jsonify(
+        budgets=get_budget_status(user_id),
+        spending=get_category_spending(user_id)
+    ), 200
+
+@personal_bp.route('/analytics', methods=['GET'])
+@jwt_required()
+def spending_analytics():
+    """
+    Monthly/weekly category totals, rolling averages, month-over-month deltas
+    and top merchants over the user's full history.
+    Optional query args: window (months, default 3), top (merchants, default 10).
+    """
+    user_id = int(get_jwt_identity())
+    window = request.args.get('window', 3, type=int)
+    top = request.args.get('top', 10, type=int)
+
+    columns = load_expense_columns(user_id)
+    return jsonify(compute_spending_analytics(columns, rolling_window=window, top_n=top)), 200
+
+@personal_bp.route('/recurring/detect', methods=['POST'])
+@jwt_required()
+def detect_recurring_expenses():
+    """
+    Flag subscriptions among expenses added since the last scan.
+    Returns {merchant_key: cadence} suggestions; confirm one with POST /recurring/rules.
+    """
+    user_id = int(get_jwt_identity())
+    found = detect_recurring(user_id).get(user_id, {})
+    return jsonify(recurring=found), 200
+
+@personal_bp.route('/recurring/rules', methods=['GET'])
+@jwt_required()
+def list_recurring_rules():
+    user_id = int(get_jwt_identity())
+    rules = RecurringRule.query.filter_by(user_id=user_id).order_by(RecurringRule.id).all()
+    return jsonify(rules=[{
+        "id": r.id,
+        "merchant_key": r.merchant_key,
+        "description": r.description,
+        "amount": r.amount,
+        "currency": r.currency,
+        "cadence": r.cadence,
+        "next_due_at": r.next_due_at,
+        "active": r.active
+    } for r in rules]), 200
+
+@personal_bp.route('/recurring/rules', methods=['POST'])
+@jwt_required()
+def confirm_recurring_rule():
+    """
+    Schedule a detected subscription the user confirmed.
+    Expects JSON: merchant_key, cadence (default monthly).
+    """
+    user_id = int(get_jwt_identity())
+    data = request.get_json() or {}
+    merchant = data.get('merchant_key')
+    cadence = data.get('cadence', 'monthly')
+    if not merchant:
+        return jsonify(error="`merchant_key` is required"), 400
+    if cadence not in CADENCE_STEPS:
+        return jsonify(error=f"`cadence` must be one of {', '.join(CADENCE_STEPS)}"), 400
+
+    created = create_rules_for_merchants(user_id, {merchant: cadence})
+    db.session.commit()
+    if not created and not RecurringRule.query.filter_by(user_id=user_id, merchant_key=merchant, active=True).count():
+        return jsonify(error="No expenses for this merchant"), 404
+    return jsonify(message="Recurring rule confirmed", created=created), 201 if created else 200
+
+@personal_bp.route('/recurring/rules/<int:rule_id>/deactivate', methods=['POST'])
+@jwt_required()
+def deactivate_recurring_rule(rule_id):
+    """Stop a rule: the scheduler creates no further expenses from it."""
+    user_id = int(get_jwt_identity())
+    RecurringRule.query.filter_by(id=rule_id, user_id=user_id).first_or_404()
+    deactivate_rules(user_id, rule_ids=[rule_id])
+    db.session.commit()
+    return jsonify(message=f"Rule {rule_id} deactivated"), 200
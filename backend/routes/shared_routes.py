@@ -1,14 +1,28 @@
 # backend/routes/shared_routes.py
 
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+import json
+import math
+from flask import Blueprint, Response, abort, request, jsonify, current_app, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request, current_user
 from backend.extensions import db
-from backend.models.shared import Group, SharedExpense, Split, Payment
+from backend.models.shared import ArchivedSharedExpense, Group, SharedExpense, Split, Payment
 from backend.models.user import User
-from backend.utils.split_logic import calculate_balances_from_splits, minimize_cash_flow, filter_members
+from backend.utils.split_logic import (
+    minimize_cash_flow, filter_members,
+    split_expense, split_expenses, SplitError
+)
 from backend.utils.gemini_utils import split_expense_with_context, extract_from_receipt
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
+from backend.utils.receipt_cache import receipt_cache_key, get_cached_receipt, store_receipt
+from backend.utils.receipt_images import read_upload, sniff_mime, preprocess_in_pool, ReceiptTooLarge
+from backend.utils.receipt_batch import process_receipt, run_bounded, parse_total, parse_vendor
+from backend.utils.group_ledger import (
+    bump_group_versions, expense_item, group_balances, group_expenses, group_overview, group_version,
+    overview_etag, settle_splits
+)
+from backend.utils.fx import UnknownCurrency, base_currency, fx_revision, normalize_currency
+from backend.utils import user_search
+from backend.utils import ledger_export
+from sqlalchemy import insert, select
 from datetime import datetime, timedelta
 
 shared_bp = Blueprint('shared', __name__)
@@ -20,23 +34,25 @@ shared_bp = Blueprint('shared', __name__)
 @shared_bp.route('/groups', methods=['POST'])
 @jwt_required()
 def create_group():
-    """Create a new group with a list of member IDs."""
+    """Create a new group with a list of member IDs and an optional currency (default BASE_CURRENCY)."""
     data = request.get_json() or {}
     name       = data.get('name')
     member_ids = data.get('members', [])
-    created_by = int(get_jwt_identity())
+    created_by = current_user.id
 
     if not name:
         return jsonify(error="Missing group name"), 400
-    
-    group = Group(name=name, created_by=created_by)
+    try:
+        currency = normalize_currency(data.get('currency'))
+    except UnknownCurrency as e:
+        return jsonify(error=str(e)), 400
+
+    group = Group(name=name, created_by=created_by, currency=currency)
     db.session.add(group)
     db.session.flush()  # so group.id is available
 
     # always include creator
-    creator = User.query.get(created_by)
-    if creator:
-       group.members.append(creator)
+    group.members.append(current_user)
 
     users = User.query.filter(User.id.in_(member_ids)).all()
     group.members.extend(users)
@@ -58,7 +74,7 @@ def get_user_groups(user_id):
         "group_id": g.id,
         "name": g.name,
         "created_by": g.created_by,
-        "created_at": g.created_at.isoformat()
+        "created_at": g.created_at
     } for g in groups]
 
     return jsonify(groups=result), 200
@@ -66,14 +82,13 @@ def get_user_groups(user_id):
 @shared_bp.route('/groups', methods=['GET'])
 @jwt_required()
 def get_my_groups():
-    user_id = int(get_jwt_identity())
-    user = User.query.get_or_404(user_id)
-    groups = user.groups.all()
+    groups = current_user.groups.all()
     result = [{
         "id": g.id,
         "name": g.name,
-        "created_at": g.created_at.isoformat(),
+        "created_at": g.created_at,
         "created_by": g.created_by,
+        "currency": g.currency or base_currency(),
         "members": [{"id": u.id, "username": u.username} for u in g.members]
     } for g in groups]
     return jsonify(result), 200
@@ -88,81 +103,76 @@ def get_group_info(group_id):
         "name": group.name,
         "created_by": group.created_by,
         "created_by_username": creator.username,
+        "currency": group.currency or base_currency(),
         "members": [{"id": u.id, "username": u.username} for u in group.members]
     }), 200
 
+@shared_bp.route('/group/<int:group_id>/overview', methods=['GET'])
+def get_group_overview(group_id):
+    """
+    Group info, net balances, settlements and the first history page in one
+    response. Query param: limit (history page size).
+    Revalidates with If-None-Match: an unchanged group is answered with 304
+    from its version and the FX revision alone, without reading any expenses.
+    """
+    cfg = current_app.config
+    limit = request.args.get('limit', cfg['GROUP_HISTORY_PAGE_SIZE'], type=int)
+    limit = max(1, min(limit, cfg['GROUP_HISTORY_MAX_PAGE_SIZE']))
+
+    version = group_version(group_id)
+    if version is None:
+        return jsonify(error="Group not found"), 404
+
+    etag = overview_etag(group_id, version, limit, fx_revision())
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+    else:
+        group = db.session.get(Group, group_id)
+        response = jsonify(group_overview(group, limit))
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
 #
 # Shared expense endpoints
 #
 
-@shared_bp.route('/expense', methods=['POST'])
-def add_shared_expense():
+def _model_split_spec(description, amount, users, context):
     """
-    Add a new shared expense.
-    Expects JSON: description, amount, group_id, paid_by,
-                  excluded_members (opt), context (opt)
+    Ask Gemini to interpret free-text split instructions, within the configured
+    latency budget. Returns a `shares` split spec built from the model's
+    amounts, or None (equal split) if the model gave no answer or an unusable one.
     """
-    data = request.get_json() or {}
-    description = data.get('description')
-    amount = float(data.get('amount', 0))
-    date_str    = data.get('date')
-    group_id = data.get('group_id')
-    paid_by = data.get('paid_by')
-    excluded = data.get('excluded_members', [])
-    context = data.get('context', '')
-
-    group = Group.query.get_or_404(group_id)
-    member_ids = [u.id for u in group.members]
-    included_users = [u for u in group.members if u.id not in excluded]
-    included = [u.id for u in included_users]
-    participants = [u.username for u in included_users]
-
-    splits_suggestion = split_expense_with_context(description, amount, participants, context)
-    if all(isinstance(k, str) for k in splits_suggestion.keys()):
-        remapped = {}
-        for uname, owed in splits_suggestion.items():
-            # find the matching User object
-            user_obj = next((u for u in included_users if u.username == uname), None)
-            if user_obj:
-                remapped[user_obj.id] = owed
-        splits_suggestion = remapped
-
-        # Fallback to equal split if Gemini returns invalid data or came back empty
-    payer_id = int(paid_by)
-    n = len(included)
-    share = round(amount / n, 2) if n else 0
-    splits_suggestion = {}
+    suggestion = split_expense_with_context(
+        description, amount, [u.username for u in users], context,
+        timeout=current_app.config['GEMINI_SPLIT_TIMEOUT_SECONDS']
+    )
+    ids = {u.username: u.id for u in users}
+    if amount <= 0 or not isinstance(suggestion, dict) or not suggestion:
+        return None
 
-    for uid in included:
-        if uid == payer_id:
-            splits_suggestion[uid] = round(amount - share, 2) * -1
-        else:
-            splits_suggestion[uid] = share
+    shares = {}
+    for name, owed in suggestion.items():
+        if name not in ids or not isinstance(owed, (int, float)) or owed < 0:
+            return None
+        shares[ids[name]] = owed
 
-    expense = SharedExpense(
-        group_id=group_id,
-        paid_by=paid_by,
-        amount=amount,
-        description=description,
-        notes=context
-    )
-    db.session.add(expense)
-    db.session.flush()
+    # The engine rescales to the exact total; reject answers that are clearly off
+    if abs(sum(shares.values()) - amount) > max(0.05, 0.01 * amount):
+        return None
+    return {"method": "shares", "shares": shares}
 
-    for uid, owed in splits_suggestion.items():
-        db.session.add(Split(
-            expense_id=expense.id,
-            user_id=uid,
-            amount_owed=round(owed, 2),
-            is_paid=(uid == paid_by)
-        ))
 
-    db.session.commit()
-        # === Crear evento en Google Calendar para cada miembro con token ===
+def _send_calendar_reminders(group, summary):
+    """Create a Google Calendar event for each group member that connected their calendar."""
     for member in group.members:
         if not member.google_calendar_token:
             continue  # Ignora si no ha conectado su cuenta
 
+        # Google API clients are imported on first use to keep app startup fast
+        from google.oauth2.credentials import Credentials
+        from googleapiclient.discovery import build
+
         creds_data = member.google_calendar_token
         creds = Credentials(
             token=creds_data['token'],
@@ -177,7 +187,7 @@ def add_shared_expense():
             service = build('calendar', 'v3', credentials=creds)
 
             event = {
-                'summary': f"[Divy] Expense Reminder: {description}",
+                'summary': summary,
                 'description': f"You were part of the shared expense in group '{group.name}'.",
                 'start': {
                     'dateTime': (datetime.utcnow() + timedelta(days=3)).isoformat() + 'Z',
@@ -194,10 +204,76 @@ def add_shared_expense():
         except Exception as e:
             print(f"[Calendar] Error creating event for {member.username}: {e}")
 
+
+@shared_bp.route('/expense', methods=['POST'])
+def add_shared_expense():
+    """
+    Add a new shared expense.
+    Expects JSON: description, amount, group_id, paid_by,
+                  currency (opt, defaults to the group's),
+                  excluded_members (opt), context (opt),
+                  split (opt) — a split spec, see split_logic.split_expenses
+    """
+    data = request.get_json() or {}
+    description = data.get('description')
+    amount = float(data.get('amount', 0))
+    date_str    = data.get('date')
+    group_id = data.get('group_id')
+    paid_by = data.get('paid_by')
+    excluded = data.get('excluded_members', [])
+    context = data.get('context') or ''
+
+    group = Group.query.get_or_404(group_id)
+    try:
+        currency = normalize_currency(data.get('currency'))
+    except UnknownCurrency as e:
+        return jsonify(error=str(e)), 400
+    included_users = [u for u in group.members if u.id not in excluded]
+    included = [u.id for u in included_users]
+
+    # Only free-text instructions need the model; everything else is split locally
+    spec = data.get('split')
+    split_source = 'local'
+    if not spec and context.strip():
+        spec = _model_split_spec(description, amount, included_users, context)
+        split_source = 'context' if spec else 'fallback'
+
+    # Each participant (payer included) owes their share; the payer's is already paid
+    payer_id = int(paid_by)
+    try:
+        splits_suggestion = split_expense(amount, included, spec)
+    except SplitError as e:
+        return jsonify(error=str(e)), 400
+
+    expense = SharedExpense(
+        group_id=group_id,
+        paid_by=paid_by,
+        amount=amount,
+        currency=currency,
+        description=description,
+        notes=context
+    )
+    db.session.add(expense)
+    db.session.flush()
+
+    for uid, owed in splits_suggestion.items():
+        db.session.add(Split(
+            expense_id=expense.id,
+            user_id=uid,
+            amount_owed=owed,
+            is_paid=(uid == payer_id)
+        ))
+
+    db.session.commit()
+    # === Crear evento en Google Calendar para cada miembro con token ===
+    _send_calendar_reminders(group, f"[Divy] Expense Reminder: {description}")
+
     return jsonify(
         message="Expense added",
         expense_id=expense.id,
-        splits=splits_suggestion  
+        currency=currency or group.currency or base_currency(),
+        splits=splits_suggestion,
+        split_source=split_source
     ), 201
 
 @shared_bp.route('/expense/receipt', methods=['POST'])
@@ -212,74 +288,299 @@ def upload_receipt():
     if not image:
         return jsonify(error="Missing receipt file"), 400
 
-    data = image.read()
-    result = extract_from_receipt(data, context)
-    return jsonify(gemini_output=result), 200
+    cfg = current_app.config
+    try:
+        data = read_upload(image.stream, cfg['RECEIPT_MAX_UPLOAD_BYTES'])
+    except ReceiptTooLarge as e:
+        return jsonify(error=str(e)), 413
+
+    mime = sniff_mime(data)
+    if not mime:
+        return jsonify(error="Unsupported receipt file type"), 415
+
+    # Retries of the same photo are answered from the content-addressed cache
+    key = receipt_cache_key(data, context)
+    cached = get_cached_receipt(key)
+    if cached is not None:
+        return jsonify(gemini_output=cached, cached=True), 200
+
+    # Downscale/grayscale/recompress so the model payload stays small
+    try:
+        payload, payload_mime, stats = preprocess_in_pool(
+            data, mime,
+            workers=cfg['RECEIPT_PREPROCESS_WORKERS'],
+            max_side=cfg['RECEIPT_MAX_SIDE'],
+            quality=cfg['RECEIPT_JPEG_QUALITY'],
+            max_pixels=cfg['RECEIPT_MAX_PIXELS']
+        )
+    except ReceiptTooLarge as e:
+        return jsonify(error=str(e)), 413
+    result = extract_from_receipt(payload, context, mime_type=payload_mime)
+    store_receipt(key, result)
+    return jsonify(gemini_output=result, cached=False, upload=stats), 200
+
+@shared_bp.route('/expense/receipts', methods=['POST'])
+def upload_receipts_batch():
+    """
+    Upload many receipts at once. Each one is parsed concurrently and its
+    result is streamed back as an NDJSON line as soon as it completes.
+    Expects multipart/form-data: files under 'receipts', plus form fields
+    context (opt), and create_expenses=true with group_id/paid_by to turn
+    every parsed total into a SharedExpense (split equally) at the end.
+    """
+    cfg = current_app.config
+    files = request.files.getlist('receipts')
+    context = request.form.get('context', '')
+    create = request.form.get('create_expenses', '').lower() == 'true'
+
+    if not files:
+        return jsonify(error="Missing receipt files"), 400
+    if len(files) > cfg['RECEIPT_BATCH_MAX_FILES']:
+        return jsonify(error=f"At most {cfg['RECEIPT_BATCH_MAX_FILES']} receipts per batch"), 400
+
+    group = None
+    if create:
+        group = Group.query.get_or_404(request.form.get('group_id', type=int))
+        paid_by = request.form.get('paid_by', type=int)
+        if paid_by is None:
+            return jsonify(error="`paid_by` is required to create expenses"), 400
+        if paid_by not in {u.id for u in group.members}:
+            return jsonify(error="`paid_by` is not a group member"), 400
+
+    verify_jwt_in_request(optional=True)
+    user_key = str(get_jwt_identity() or request.remote_addr)
+    options = dict(
+        max_side=cfg['RECEIPT_MAX_SIDE'], quality=cfg['RECEIPT_JPEG_QUALITY'], max_pixels=cfg['RECEIPT_MAX_PIXELS']
+    )
+
+    # Validate and hit the cache up front; only misses go to the worker pool
+    app = current_app._get_current_object()
+    ready, jobs = [], []
+    for index, f in enumerate(files):
+        line = {"index": index, "filename": f.filename}
+        try:
+            data = read_upload(f.stream, cfg['RECEIPT_MAX_UPLOAD_BYTES'])
+        except ReceiptTooLarge as e:
+            ready.append(dict(line, status="error", error=str(e)))
+            continue
+        mime = sniff_mime(data)
+        if not mime:
+            ready.append(dict(line, status="error", error="Unsupported receipt file type"))
+            continue
+
+        key = receipt_cache_key(data, context)
+        cached = get_cached_receipt(key)
+        if cached is not None:
+            ready.append(dict(line, status="ok", cached=True, gemini_output=cached))
+        else:
+            def job(data=data, mime=mime):
+                # Workers have no app context of their own; the Gemini client is per app
+                with app.app_context():
+                    return process_receipt(data, mime, context, **options)
+            jobs.append(((line, key), job))
+
+    def generate():
+        parsed = []
+        for line in ready:
+            parsed.append(line)
+            yield json.dumps(line) + "\n"
+
+        results = run_bounded(jobs, user_key, cfg['RECEIPT_BATCH_PER_USER'], cfg['RECEIPT_BATCH_WORKERS'])
+        for (line, key), result, error in results:
+            if error is not None:
+                line = dict(line, status="error", error=str(error))
+            else:
+                store_receipt(key, result)
+                line = dict(line, status="ok", cached=False, gemini_output=result)
+            parsed.append(line)
+            yield json.dumps(line) + "\n"
+
+        if create:
+            yield json.dumps(_create_receipt_expenses(group, paid_by, parsed, context)) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+def _create_receipt_expenses(group, paid_by, parsed, context):
+    """Bulk-create one equally split SharedExpense per receipt with a usable total."""
+    usable = [
+        (line, parse_total(line.get("gemini_output")))
+        for line in sorted(parsed, key=lambda l: l["index"])
+        if line["status"] == "ok"
+    ]
+    usable = [(line, total) for line, total in usable if total]
+    if not usable:
+        return {"created_expenses": []}
+
+    member_ids = [u.id for u in group.members]
+    owed_cents = split_expenses([total for _, total in usable], member_ids)
+
+    expenses = []
+    for (line, total), row in zip(usable, owed_cents.tolist()):
+        exp = SharedExpense(
+            group_id=group.id,
+            paid_by=paid_by,
+            amount=total,
+            description=parse_vendor(line["gemini_output"]) or f"Receipt {line['filename']}",
+            notes=context
+        )
+        exp.splits = [
+            Split(user_id=uid, amount_owed=cents / 100, is_paid=(uid == paid_by))
+            for uid, cents in zip(member_ids, row) if cents
+        ]
+        expenses.append(exp)
+
+    db.session.add_all(expenses)
+    db.session.commit()
+    return {"created_expenses": [
+        {"index": line["index"], "expense_id": exp.id, "amount": exp.amount}
+        for (line, _), exp in zip(usable, expenses)
+    ]}
 
 @shared_bp.route('/expense/import-mock', methods=['POST'])
 def import_card_history():
     """
-    Mock-import a list of card transactions.
-    Expects JSON: { transactions: [{description,amount}, ...], group_id, paid_by, context }
+    Mock-import a list of card transactions, split equally across the group
+    (or by an optional per-transaction `split` spec).
+    Expects JSON: { transactions: [{description,amount,split?}, ...], group_id, paid_by, context }
     """
     data = request.get_json() or {}
     txns = data.get('transactions', [])
     group_id = data.get('group_id')
     paid_by = data.get('paid_by')
-    context = data.get('context', '')
+    context = data.get('context') or ''
 
-    created = []
-    for txn in txns:
-        desc = txn.get('description')
-        amt = float(txn.get('amount', 0))
-        suggestion = split_expense_with_context(desc, amt, [], context)
-
-        if (
-            not isinstance(suggestion, dict)
-            or any(not isinstance(v, (int, float)) for v in suggestion.values())
-        ):
-            # no participants => no splits
-            suggestion = {}
+    group = Group.query.get_or_404(group_id)
+    member_ids = [u.id for u in group.members]
+    payer_id = int(paid_by)
+    txns = [t for t in txns if t.get('description')]
+    amounts = [float(t.get('amount', 0)) for t in txns]
+
+    # One vectorized pass splits every transaction equally across the group
+    try:
+        owed_cents = split_expenses(amounts, member_ids, [t.get('split') for t in txns])
+    except SplitError as e:
+        return jsonify(error=str(e)), 400
 
+    created = []
+    for txn, amt, row in zip(txns, amounts, owed_cents.tolist()):
         exp = SharedExpense(
             group_id=group_id,
             paid_by=paid_by,
             amount=amt,
-            description=desc,
+            description=txn['description'],
             notes=context
         )
+        exp.splits = [
+            Split(user_id=uid, amount_owed=cents / 100, is_paid=(uid == payer_id))
+            for uid, cents in zip(member_ids, row) if cents
+        ]
         db.session.add(exp)
-        db.session.flush()
+        created.append(txn['description'])
 
-        for uid, owed in suggestion.items():
-            db.session.add(Split(
-                expense_id=exp.id,
-                user_id=uid,
-                amount_owed=round(owed, 2)
-            ))
+    db.session.commit()
+    return jsonify(imported=created), 200
 
-        created.append(desc)
+@shared_bp.route('/expenses/batch', methods=['POST'])
+def add_shared_expenses_batch():
+    """
+    Add many shared expenses to one group in a single transaction.
+    Expects JSON: { group_id, paid_by, currency (opt), context (opt),
+                    expenses: [{description, amount, paid_by?, currency?,
+                                excluded_members?, split?}, ...] }
+    Per-expense fields override the request-level defaults. Splits come from
+    the local engine only (no Gemini); the whole batch is rejected if any
+    expense is invalid. Calendar reminders are sent once per batch.
+    """
+    data = request.get_json() or {}
+    items = data.get('expenses')
+    context = data.get('context') or ''
+    if not isinstance(items, list) or not items:
+        return jsonify(error="`expenses` must be a non-empty array"), 400
+    if len(items) > current_app.config['SHARED_EXPENSE_BATCH_MAX']:
+        return jsonify(error=f"At most {current_app.config['SHARED_EXPENSE_BATCH_MAX']} expenses per batch"), 400
+
+    group = Group.query.get_or_404(data.get('group_id'))
+    member_ids = [u.id for u in group.members]
+    members = set(member_ids)
 
+    currencies = {}
+    amounts, payers, codes, specs = [], [], [], []
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            return jsonify(error=f"Expense {i}: must be an object"), 400
+        try:
+            amount = float(item.get('amount'))
+            payer = int(item.get('paid_by', data.get('paid_by')))
+            code = item.get('currency', data.get('currency'))
+            if code not in currencies:
+                currencies[code] = normalize_currency(code)
+        except (TypeError, ValueError) as e:
+            return jsonify(error=f"Expense {i}: {e}"), 400
+        if not math.isfinite(amount) or amount <= 0:
+            return jsonify(error=f"Expense {i}: amount must be a positive number"), 400
+        if not item.get('description'):
+            return jsonify(error=f"Expense {i}: missing description"), 400
+        if payer not in members:
+            return jsonify(error=f"Expense {i}: payer is not a group member"), 400
+
+        spec = item.get('split')
+        excluded = item.get('excluded_members')
+        if excluded is not None and not (
+            isinstance(excluded, list) and all(type(uid) is int for uid in excluded)
+        ):
+            return jsonify(error=f"Expense {i}: excluded_members must be a list of user ids"), 400
+        if not spec and excluded:
+            spec = {"method": "equal", "participants": [uid for uid in member_ids if uid not in excluded]}
+        amounts.append(amount)
+        payers.append(payer)
+        codes.append(currencies[code])
+        specs.append(spec)
+
+    # One vectorized pass over every expense; columns are the group's members
+    try:
+        owed_cents = split_expenses(amounts, member_ids, specs)
+    except SplitError as e:
+        return jsonify(error=str(e)), 400
+
+    now = datetime.utcnow()
+    expense_ids = db.session.execute(
+        insert(SharedExpense).returning(SharedExpense.id, sort_by_parameter_order=True),
+        [{
+            "group_id": group.id, "paid_by": payer, "amount": amount, "currency": code,
+            "description": item['description'], "notes": context, "created_at": now,
+        } for item, amount, payer, code in zip(items, amounts, payers, codes)]
+    ).scalars().all()
+    splits = [
+        {"expense_id": eid, "user_id": uid, "amount_owed": cents / 100, "is_paid": uid == payer}
+        for eid, payer, row in zip(expense_ids, payers, owed_cents.tolist())
+        for uid, cents in zip(member_ids, row) if cents
+    ]
+    # An executemany with no rows is an error on some drivers
+    if splits:
+        db.session.execute(insert(Split), splits)
+    # Bulk inserts skip the unit of work, so the overview version is bumped here, once
+    bump_group_versions([group.id])
     db.session.commit()
-    return jsonify(imported=created), 200
+
+    _send_calendar_reminders(group, f"[Divy] Expense Reminder: {len(expense_ids)} new expenses")
+
+    return jsonify(
+        message=f"Added {len(expense_ids)} expenses",
+        expense_ids=expense_ids
+    ), 201
 
 @shared_bp.route('/group/<int:group_id>/history', methods=['GET'])
 def get_group_history(group_id):
-    """Return all expenses + payments for a group, newest first."""
-    expenses = SharedExpense.query \
-        .filter_by(group_id=group_id) \
-        .order_by(SharedExpense.created_at.desc()) \
-        .all()
+    """Return all expenses (hot and archived) + payments for a group, newest first."""
+    expense = group_expenses(group_id)
+    expenses = db.session.execute(
+        select(expense, User.username.label('paid_by_username'))
+        .join(User, User.id == expense.c.paid_by)
+        .order_by(expense.c.created_at.desc())
+    ).all()
 
-    expense_list = [{
-        "id":                e.id,
-        "description":       e.description,
-        "amount":            e.amount,
-        "paid_by":           e.paid_by,
-        "paid_by_username":  User.query.get(e.paid_by).username,
-        "notes":             e.notes,
-        "date":              e.created_at.isoformat()
-    } for e in expenses]
+    expense_list = [expense_item(e) for e in expenses]
 
     # fetch payments too, if you want to bundle them here
     group = Group.query.get_or_404(group_id)
@@ -294,8 +595,9 @@ def get_group_history(group_id):
         "from_user":  p.from_user,
         "to_user":    p.to_user,
         "amount":     p.amount,
+        "currency":   p.currency,
         "status":     p.status,
-        "date":       p.created_at.isoformat()
+        "date":       p.created_at
     } for p in payments]
 
     return jsonify(
@@ -304,10 +606,53 @@ def get_group_history(group_id):
     ), 200
 
 
+GROUP_EXPORT_COLUMNS = [
+    ('id', 'int'), ('date', 'datetime'), ('amount', 'float'), ('currency', 'str'), ('description', 'str'),
+    ('category', 'str'), ('paid_by', 'int'), ('paid_by_username', 'str'), ('notes', 'str'),
+]
+
+@shared_bp.route('/group/<int:group_id>/export', methods=['GET'])
+@jwt_required()
+def export_group_expenses(group_id):
+    """
+    Stream every expense of a group as a download, in id order. Members only.
+    Query args: format (csv | parquet), after_id — resume an interrupted
+    export from the last id received.
+    """
+    fmt = request.args.get('format', 'csv')
+    after_id = request.args.get('after_id', 0, type=int)
+    if fmt not in ledger_export.FORMATS:
+        return jsonify(error="format must be csv or parquet"), 400
+    if fmt == 'parquet' and ledger_export.pq is None:
+        return jsonify(error="Parquet export needs pyarrow installed"), 501
+    group = db.session.get(Group, group_id)
+    if group is None:
+        return jsonify(error="Group not found"), 404
+    if group.members.filter_by(id=current_user.id).first() is None:
+        return jsonify(error="Not authorized"), 403
+
+    expense = group_expenses(group_id)
+    stmt = select(
+        expense.c.id, expense.c.created_at, expense.c.amount, expense.c.currency, expense.c.description,
+        expense.c.category, expense.c.paid_by, User.username, expense.c.notes
+    ).join(User, User.id == expense.c.paid_by)
+
+    chunks = ledger_export.iter_chunks(stmt, expense.c.id, after_id, current_app.config['EXPORT_CHUNK_ROWS'])
+    return ledger_export.export_response(fmt, f'group-{group_id}-expenses', GROUP_EXPORT_COLUMNS, chunks)
+
+
 @shared_bp.route('/expense/<int:expense_id>', methods=['DELETE'])
 def delete_shared_expense(expense_id):
-    """Delete an expense and all its splits."""
-    expense = SharedExpense.query.get_or_404(expense_id)
+    """
+    Delete an expense and all its splits. Archived expenses still show up in
+    the group's history but are settled and folded into its checkpoint, so
+    they cannot be deleted (409).
+    """
+    expense = db.session.get(SharedExpense, expense_id)
+    if expense is None:
+        if db.session.get(ArchivedSharedExpense, expense_id) is not None:
+            return jsonify(error="Archived expenses cannot be deleted"), 409
+        abort(404)
     Split.query.filter_by(expense_id=expense.id).delete()
     db.session.delete(expense)
     db.session.commit()
@@ -315,7 +660,11 @@ def delete_shared_expense(expense_id):
 
 @shared_bp.route('/group/<int:group_id>/pay', methods=['POST'])
 def record_group_payment(group_id):
-    """Record a transfer from one user to another within a group."""
+    """
+    Record a transfer from one user to another within a group, in the group's
+    currency by default. A completed payment settles the payer's open splits
+    on the payee's expenses, oldest first, as far as the amount covers.
+    """
     data = request.get_json() or {}
     frm = data.get('from_user')
     to_user = data.get('to_user')
@@ -324,9 +673,16 @@ def record_group_payment(group_id):
 
     if not all([frm, to_user, amt]):
         return jsonify(error="Missing required fields"), 400
+    group = db.session.get(Group, group_id)
+    try:
+        currency = normalize_currency(data.get('currency'), group.currency if group else None)
+    except UnknownCurrency as e:
+        return jsonify(error=str(e)), 400
 
-    payment = Payment(from_user=frm, to_user=to_user, amount=amt, status=status)
+    payment = Payment(from_user=frm, to_user=to_user, amount=amt, currency=currency, status=status)
     db.session.add(payment)
+    if group is not None and status == 'completed':
+        settle_splits(group, int(frm), int(to_user), amt, currency)
     db.session.commit()
     return jsonify(message="Payment recorded"), 201
 
@@ -336,21 +692,24 @@ def get_group_balances(group_id):
     Calculate net balances (who owes/is owed) and simplified settlement transactions.
     """
     group = Group.query.get_or_404(group_id)
-    net = {}
-
-    for exp in SharedExpense.query.filter_by(group_id=group_id):
-        splits = Split.query.filter_by(expense_id=exp.id).all()
-        bal = calculate_balances_from_splits(splits, exp.paid_by)
-        for uid, v in bal.items():
-            net[uid] = net.get(uid, 0) + v
+    net = group_balances(group_id, group.currency)
 
     settlements = minimize_cash_flow(net.copy())
-    return jsonify(net_balances=net, simplified_transactions=settlements), 200
+    return jsonify(
+        net_balances=net, simplified_transactions=settlements, currency=group.currency or base_currency()
+    ), 200
 
-@shared_bp.route('/users', methods=['GET'])
-def list_users():
-    users = User.query.all()
-    return jsonify([{"id": u.id, "username": u.username} for u in users]), 200
+@shared_bp.route('/users/search', methods=['GET'])
+@jwt_required()
+def search_users():
+    """
+    Typeahead for the member picker: users whose username or email starts
+    with `q` (case-insensitive). Query params: q, limit.
+    """
+    cfg = current_app.config
+    limit = request.args.get('limit', cfg['USER_SEARCH_LIMIT'], type=int)
+    limit = max(1, min(limit, cfg['USER_SEARCH_MAX_LIMIT']))
+    return jsonify(user_search.search_users(request.args.get('q', ''), limit)), 200
 
 @shared_bp.route('/groups/<int:group_id>', methods=['DELETE'])
 @jwt_required()
@@ -0,0 +1,81 @@
+# backend/serve.py
+"""
+Cooperative serving mode: one process, one greenlet per request.
+
+    python -m backend.serve --port 5000 --max-connections 1000
+
+gevent patches sockets, sleeps, locks and threads before anything else is
+imported, so a request waiting on Gemini (REST transport), Google Calendar
+(httplib2) or a receipt upload only parks its greenlet instead of holding an
+OS thread. The app, routes and clients are unchanged; the Gemini client's
+deadline executor and semaphore become greenlet-based as well.
+
+Patched threads are greenlets, so CPU-bound work would stall every request
+on the hub. Receipt preprocessing (Pillow) and password hashing (bcrypt)
+go to the hub's threadpool instead, real OS threads that release the GIL
+while they work (backend/utils/offload.py); the bcrypt process pool is not
+used here. SQLite calls still run on the hub: use a networked database
+whose driver goes through the patched sockets.
+
+Keep GEMINI_MAX_CONCURRENCY and the database pool in line with the number
+of slow calls you expect to be in flight at once.
+"""
+
+from gevent import monkey
+
+monkey.patch_all()
+
+import argparse  # noqa: E402
+import os  # noqa: E402
+
+# gRPC does not cooperate with gevent; the REST transport goes through patched sockets
+os.environ.setdefault("GEMINI_TRANSPORT", "rest")
+os.environ.setdefault("GEMINI_MAX_CONCURRENCY", "256")
+
+from gevent import get_hub  # noqa: E402
+from gevent.pool import Pool  # noqa: E402
+from gevent.pywsgi import WSGIServer  # noqa: E402
+
+from backend.app import create_app  # noqa: E402
+from backend.utils.offload import set_cpu_runner  # noqa: E402
+
+
+def _run_on_threadpool(fn, *args, **kwargs):
+    # The calling greenlet waits on the hub; other requests keep running
+    return get_hub().threadpool.apply(fn, args, kwargs)
+
+
+def make_server(
+    app,
+    host: str = "0.0.0.0",
+    port: int = 5000,
+    max_connections: int = 1000,
+    cpu_threads: int = os.cpu_count() or 1
+) -> WSGIServer:
+    """
+    A gevent WSGI server for `app` that runs at most `max_connections`
+    requests at once and CPU-bound work on `cpu_threads` OS threads.
+    """
+    get_hub().threadpool.maxsize = cpu_threads
+    set_cpu_runner(_run_on_threadpool)
+    return WSGIServer((host, port), app, spawn=Pool(max_connections), log=None)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default=os.getenv("FLASK_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("FLASK_PORT", 5000)))
+    parser.add_argument("--max-connections", type=int, default=1000)
+    parser.add_argument("--cpu-threads", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    app = create_app()
+    if app.config['SQLALCHEMY_DATABASE_URI'].startswith("sqlite"):
+        print("Warning: SQLite queries block the gevent hub; set DATABASE_URL to a server database")
+    server = make_server(app, args.host, args.port, args.max_connections, args.cpu_threads)
+    print(f"Serving on http://{args.host}:{args.port} (gevent, up to {args.max_connections} concurrent requests)")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
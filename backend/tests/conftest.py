@@ -1,6 +1,8 @@
 import pytest
 from backend.app import create_app
 from backend.extensions import db
+from backend.models.shared import Group
+from backend.models.user import User
 
 @pytest.fixture
 def app():
@@ -10,6 +12,7 @@ def app():
         "TESTING": True,
         "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
         "JWT_SECRET_KEY": "test-secret",
+        "BCRYPT_LOG_ROUNDS": 4,
     })
     with app.app_context():
         db.create_all()
@@ -21,3 +24,23 @@ def app():
 def client(app):
     """A test client for the app."""
     return app.test_client()
+
+@pytest.fixture
+def make_group(app):
+    """Factory for a group of `members` new users u0, u1, ... created by u0. Returns (group, users)."""
+    def make(members=3, name="Flat"):
+        users = [User(username=f"u{i}", email=f"u{i}@example.com", password_hash="x") for i in range(members)]
+        db.session.add_all(users)
+        db.session.flush()
+        group = Group(name=name, created_by=users[0].id)
+        db.session.add(group)
+        db.session.flush()
+        group.members.extend(users)
+        db.session.commit()
+        return group, users
+    return make
+
+@pytest.fixture
+def group(make_group):
+    """A three-member group: (group, users)."""
+    return make_group()
@@ -0,0 +1,70 @@
+from datetime import datetime
+
+import numpy as np
+
+from backend.extensions import db
+from backend.models.personal import PersonalExpense
+from backend.utils.analytics import compute_spending_analytics, normalize_merchant
+
+
+def columns(rows):
+    amounts, days, cats, descs = zip(*rows)
+    return {
+        "amount": np.array(amounts, dtype=np.float64),
+        "day": np.array(days, dtype="datetime64[D]"),
+        "category": np.array(cats, dtype=object),
+        "description": np.array(descs, dtype=object),
+    }
+
+def test_normalize_merchant():
+    assert normalize_merchant("Netflix Subscription") == "netflix"
+    assert normalize_merchant("NETFLIX.COM 8842") == "netflix"
+    assert normalize_merchant("CITY GYM 0042") == normalize_merchant("City Gym") == "city gym"
+
+def test_distinct_merchants_stay_distinct():
+    keys = [normalize_merchant(d) for d in (
+        "Uber Eats", "Uber Ride", "Amazon Prime", "Amazon - Wireless Mouse", "Apple iCloud", "Apple Store"
+    )]
+    assert len(set(keys)) == len(keys)
+
+def test_rebuild_merchant_keys(app):
+    db.session.add(PersonalExpense(user_id=1, amount=9.0, description="Uber Eats", category="Food",
+                                   merchant_key="uber", transaction_date=datetime(2025, 1, 1)))
+    db.session.commit()
+    result = app.test_cli_runner().invoke(args=['rebuild-merchant-keys'])
+    assert "Updated 1 merchant keys" in result.output
+    assert PersonalExpense.query.one().merchant_key == "uber eats"
+
+def test_monthly_weekly_and_merchants():
+    result = compute_spending_analytics(columns([
+        (10.0, "2025-05-05", "Food", "Starbucks Coffee"),
+        (20.0, "2025-07-01", "Food", "Starbucks #12"),
+        (13.99, "2025-07-10", "Fun", "Netflix Subscription"),
+    ]), rolling_window=2)
+
+    monthly = result["monthly"]
+    assert monthly["months"] == ["2025-05", "2025-06", "2025-07"]
+    assert monthly["totals"]["Food"] == [10.0, 0.0, 20.0]
+    assert monthly["rolling_avg"]["Food"] == [10.0, 5.0, 10.0]
+    assert monthly["mom_delta"]["Food"] == [None, -10.0, 20.0]
+
+    weekly = result["weekly"]
+    assert weekly["weeks"][0] == "2025-05-05"  # a Monday
+    assert weekly["weeks"][-1] == "2025-07-07"
+    assert sum(weekly["totals"]["Fun"]) == 13.99
+
+    assert result["top_merchants"][0] == {"merchant": "starbucks", "total": 30.0, "count": 2}
+
+def test_analytics_endpoint(client):
+    client.post("/api/auth/register", json={"username": "an", "email": "an@example.com", "password": "pw"})
+    client.post("/api/auth/login", json={"username": "an", "password": "pw"})
+
+    assert client.get("/api/personal/analytics").get_json()["categories"] == []
+
+    db.session.add(PersonalExpense(
+        user_id=1, amount=5, description="Uber Ride", category="Transport",
+        transaction_date=datetime(2025, 7, 12, 18, 30)
+    ))
+    db.session.commit()
+    data = client.get("/api/personal/analytics").get_json()
+    assert data["monthly"]["totals"] == {"Transport": [5.0]}
@@ -0,0 +1,69 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from backend.utils import offload, passwords, receipt_batch
+from backend.utils.receipt_images import preprocess_receipt
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+@pytest.fixture
+def cpu_runner():
+    # What backend.serve installs, with a plain thread pool standing in for the gevent hub's
+    calls, pool = [], ThreadPoolExecutor(max_workers=2, thread_name_prefix="cpu-runner")
+
+    def runner(fn, *args, **kwargs):
+        calls.append(fn.__name__)
+        return pool.submit(fn, *args, **kwargs).result()
+
+    offload.set_cpu_runner(runner)
+    yield calls
+    offload.set_cpu_runner(None)
+    pool.shutdown()
+
+
+def test_cpu_work_goes_to_the_installed_runner(client, cpu_runner, monkeypatch):
+    Image = pytest.importorskip("PIL.Image")
+    monkeypatch.setattr(passwords, "_pool", lambda *_: pytest.fail("process pool used under the CPU runner"))
+    client.post("/api/auth/register", json={"username": "ana", "email": "ana@example.com", "password": "pw"})
+    client.post("/api/auth/login", json={"username": "ana", "password": "pw"})
+    assert cpu_runner == ["_hash", "_verify"]
+
+    out = io.BytesIO()
+    Image.radial_gradient("L").resize((1200, 1600)).convert("RGB").save(out, format="PNG")
+    monkeypatch.setattr("backend.routes.shared_routes.extract_from_receipt", lambda *a, **kw: {"total": "1"})
+    resp = client.post("/api/shared/expense/receipt", data={"receipt": (io.BytesIO(out.getvalue()), "r.png")},
+                       content_type="multipart/form-data")
+    assert resp.status_code == 200 and resp.get_json()["upload"]["processed"]
+
+    monkeypatch.setattr(receipt_batch, "extract_from_receipt", lambda payload, context, mime_type: mime_type)
+    assert receipt_batch.process_receipt(out.getvalue(), "image/png", "") == "image/jpeg"
+    assert cpu_runner[2:] == ["preprocess_receipt", "preprocess_receipt"]
+
+
+def test_without_a_runner_cpu_work_stays_on_the_caller():
+    assert not offload.has_cpu_runner()
+    assert offload.run_cpu(threading.current_thread) is threading.current_thread()
+    assert preprocess_receipt(b"%PDF-1.7", "application/pdf")[1] == "application/pdf"
+
+
+def test_one_process_overlaps_hundreds_of_slow_upstream_calls():
+    pytest.importorskip("gevent")
+    # Runs in its own interpreter: the serving mode monkey-patches the standard library
+    proc = subprocess.run(
+        [sys.executable, "-m", "backend.benchmarks.bench_async_serving",
+         "--concurrency", "200", "--latency", "0.5", "--json"],
+        cwd=ROOT, capture_output=True, text=True, timeout=120, check=True,
+    )
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    assert result["ok"] == 200
+    # Serialized on a thread pool this would take 200 * 0.5s / threads; overlapped it is ~one latency
+    assert result["elapsed"] < 0.5 * 4
@@ -0,0 +1,51 @@
+from datetime import datetime
+
+from backend.extensions import db
+from backend.models.personal import BudgetCategory, MonthlyCategorySpend, PersonalExpense
+from backend.utils.budget_rollups import backfill_rollups, get_category_spending
+
+
+def login(client):
+    client.post(
+        "/api/auth/register",
+        json={"username": "budget", "email": "budget@example.com", "password": "pw"}
+    )
+    client.post("/api/auth/login", json={"username": "budget", "password": "pw"})
+    return 1
+
+def test_rollups_follow_add_import_and_delete(client):
+    user_id = login(client)
+    now = datetime.utcnow().isoformat()
+
+    resp = client.post("/api/personal/expenses", json={
+        "amount": 12.5, "description": "Coffee", "transaction_date": now
+    })
+    assert resp.status_code == 201
+    eid = resp.get_json()["expense"]["id"]
+
+    client.post("/api/personal/expenses/import-mock", json={"transactions": [
+        {"description": "Lunch", "amount": 7.5, "transaction_date": now},
+        {"description": "Dinner", "amount": 20, "transaction_date": now},
+    ]})
+    assert get_category_spending(user_id) == {"Other": 40.0}
+
+    client.delete(f"/api/personal/expenses/{eid}")
+    assert get_category_spending(user_id) == {"Other": 27.5}
+
+    db.session.add(BudgetCategory(user_id=user_id, name="Other", monthly_limit=25))
+    db.session.commit()
+    budgets = client.get("/api/personal/budgets").get_json()["budgets"]
+    assert budgets[0]["spent"] == 27.5
+    assert budgets[0]["over_budget"] is True
+
+def test_backfill_matches_incremental(client):
+    user_id = login(client)
+    for amt, when in [(5, datetime(2025, 6, 3)), (6, datetime(2025, 6, 20)), (7, datetime(2025, 7, 1))]:
+        db.session.add(PersonalExpense(
+            user_id=user_id, amount=amt, description="x", category="Food", transaction_date=when
+        ))
+    db.session.commit()
+
+    assert backfill_rollups() == 2
+    rows = {r.month.month: (r.total, r.count) for r in MonthlyCategorySpend.query.all()}
+    assert rows == {6: (11, 2), 7: (7, 1)}
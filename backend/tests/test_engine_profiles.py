@@ -0,0 +1,31 @@
+from sqlalchemy import text
+
+from backend.app import create_app
+from backend.config import Config, engine_options
+from backend.extensions import db
+
+
+def pragmas(tmp_path, **overrides):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'p.db'}", **overrides})
+    with app.app_context():
+        with db.engine.connect() as conn:
+            result = {name: conn.execute(text(f"PRAGMA {name}")).scalar()
+                      for name in ("journal_mode", "synchronous", "busy_timeout")}
+        db.engine.dispose()
+    return result
+
+
+def test_sqlite_profile_applied_on_connect(tmp_path):
+    assert pragmas(tmp_path) == {"journal_mode": "wal", "synchronous": 1, "busy_timeout": 5000}
+
+
+def test_sqlite_profile_can_be_disabled(tmp_path):
+    assert pragmas(tmp_path, DB_ENGINE_PROFILE="none")["journal_mode"] == "delete"
+
+
+def test_postgres_profile_pools_connections():
+    cfg = {k: getattr(Config, k) for k in dir(Config) if k.isupper()}
+    options = engine_options(dict(cfg, SQLALCHEMY_DATABASE_URI="postgresql+psycopg://u:p@db/divy"))
+    assert options["pool_pre_ping"] and options["pool_size"] == Config.PG_POOL_SIZE
+    assert options["connect_args"] == {"prepare_threshold": Config.PG_PREPARE_THRESHOLD}
+    assert "connect_args" not in engine_options(dict(cfg, SQLALCHEMY_DATABASE_URI="postgresql://u:p@db/divy"))
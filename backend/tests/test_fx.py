@@ -0,0 +1,159 @@
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+from flask import g
+from sqlalchemy import update
+
+from backend.extensions import db
+from backend.models.fx import FxRate
+from backend.models.personal import PersonalExpense
+from backend.models.shared import BalanceCheckpoint, SharedExpense, Split
+from backend.utils.analytics import load_expense_columns
+from backend.utils.budget_rollups import get_category_spending, record_expenses
+from backend.utils.fx import fx_table
+from backend.utils.group_ledger import group_version
+
+RATES = """date,currency,rate
+2025-01-01,EUR,0.5
+2025-02-01,EUR,0.8
+2025-01-01,GBP,0.25
+"""
+
+
+@pytest.fixture
+def rates(app, tmp_path):
+    path = tmp_path / "rates.csv"
+    path.write_text(RATES)
+    result = app.test_cli_runner().invoke(args=['load-fx-rates', str(path)])
+    assert "Loaded 3 exchange rates" in result.output
+    return path
+
+
+@pytest.fixture
+def group(make_group):
+    return make_group(members=2, name="Trip")
+
+
+def add_expense(group, payer, amount, currency, when):
+    exp = SharedExpense(group_id=group.id, paid_by=payer.id, amount=amount, currency=currency,
+                        description="x", created_at=when)
+    exp.splits = [Split(user_id=u.id, amount_owed=amount / 2, is_paid=(u.id == payer.id)) for u in group.members]
+    db.session.add(exp)
+    db.session.commit()
+    return exp
+
+
+def test_rates_pick_latest_on_or_before(rates):
+    table = fx_table()
+    assert FxRate.query.count() == 3
+    days = np.array(['2024-06-01', '2025-01-15', '2025-02-01', '2026-01-01'], dtype='datetime64[D]')
+    assert table.rates(['EUR'] * 4, days).tolist() == [0.5, 0.5, 0.8, 0.8]
+    assert table.factors(['USD', None, 'GBP', 'EUR'], days).tolist() == [1.0, 1.0, 4.0, 1.25]
+    assert table.factors(['GBP'], days[:1], to='EUR').tolist() == [2.0]
+
+
+def test_foreign_expenses_convert_into_group_currency(app, client, rates, group):
+    group, (a, b) = group
+    add_expense(group, a, 10.0, 'EUR', datetime(2025, 1, 10))   # 20 USD
+    add_expense(group, b, 8.0, 'USD', datetime(2025, 3, 1))     # 8 USD
+
+    body = client.get(f'/api/shared/group/{group.id}/balances').get_json()
+    assert body["currency"] == "USD"
+    assert body["net_balances"][str(a.id)] == pytest.approx(10.0 - 4.0)
+    assert body["net_balances"][str(b.id)] == pytest.approx(4.0 - 10.0)
+
+    # A group kept in EUR sees the USD expense at February's rate
+    group.currency = 'EUR'
+    db.session.commit()
+    body = client.get(f'/api/shared/group/{group.id}/balances').get_json()
+    assert body["currency"] == "EUR"
+    assert body["net_balances"][str(a.id)] == pytest.approx(5.0 - 3.2)
+
+
+def test_reloading_rates_invalidates_converted_checkpoints(app, client, rates, group):
+    group, (a, b) = group
+    add_expense(group, a, 10.0, 'EUR', datetime(2025, 1, 10))
+    app.test_cli_runner().invoke(args=['checkpoint-balances'])
+    assert BalanceCheckpoint.query.filter_by(group_id=group.id).count() == 2
+    version = group_version(group.id)
+
+    rates.write_text("date,currency,rate\n2025-01-01,EUR,0.25\n")
+    app.test_cli_runner().invoke(args=['load-fx-rates', str(rates)])
+    assert BalanceCheckpoint.query.filter_by(group_id=group.id).count() == 0
+    assert group_version(group.id) > version
+    body = client.get(f'/api/shared/group/{group.id}/balances').get_json()
+    assert body["net_balances"][str(a.id)] == pytest.approx(20.0)
+
+
+def test_unknown_currency_is_rejected(client, rates, group):
+    group, (a, _) = group
+    resp = client.post('/api/shared/expense', json={
+        "description": "Dinner", "amount": 10, "group_id": group.id, "paid_by": a.id, "currency": "XYZ"
+    })
+    assert resp.status_code == 400
+    assert SharedExpense.query.count() == 0
+
+    resp = client.post('/api/shared/expense', json={
+        "description": "Dinner", "amount": 10, "group_id": group.id, "paid_by": a.id, "currency": "eur"
+    })
+    assert resp.status_code == 201
+    assert resp.get_json()["currency"] == "EUR"
+    assert client.post(f'/api/shared/group/{group.id}/pay', json={
+        "from_user": a.id, "to_user": a.id, "amount": 1, "currency": "usd1"
+    }).status_code == 400
+
+
+def test_personal_analytics_and_rollups_in_base_currency(rates, group):
+    _, (user, _) = group
+    expenses = [
+        PersonalExpense(user_id=user.id, amount=5.0, currency='EUR', description="Cafe", category="Food",
+                        transaction_date=datetime(2025, 2, 3)),
+        PersonalExpense(user_id=user.id, amount=3.0, description="Bakery", category="Food",
+                        transaction_date=datetime(2025, 2, 4)),
+    ]
+    db.session.add_all(expenses)
+    db.session.flush()
+    record_expenses(expenses)
+    db.session.commit()
+
+    assert load_expense_columns(user.id)["amount"].tolist() == [6.25, 3.0]
+    assert get_category_spending(user.id, date(2025, 2, 1)) == {"Food": 9.25}
+
+
+def test_reloading_rates_rebuilds_converted_rollups(app, rates, group):
+    _, (user, other) = group
+    expenses = [
+        PersonalExpense(user_id=user.id, amount=5.0, currency='EUR', description="Cafe", category="Food",
+                        transaction_date=datetime(2025, 2, 3)),
+        PersonalExpense(user_id=other.id, amount=3.0, description="Bakery", category="Food",
+                        transaction_date=datetime(2025, 2, 4)),
+    ]
+    db.session.add_all(expenses)
+    db.session.flush()
+    record_expenses(expenses)
+    db.session.commit()
+
+    rates.write_text("date,currency,rate\n2025-02-01,EUR,0.5\n")
+    app.test_cli_runner().invoke(args=['load-fx-rates', str(rates)])
+    assert get_category_spending(user.id, date(2025, 2, 1)) == {"Food": 10.0}
+    assert get_category_spending(other.id, date(2025, 2, 1)) == {"Food": 3.0}
+
+
+def test_rates_loaded_elsewhere_refresh_this_process(app, client, rates, group):
+    group, (a, _) = group
+    add_expense(group, a, 10.0, 'EUR', datetime(2025, 1, 10))
+    url = f'/api/shared/group/{group.id}/overview'
+    first = client.get(url)
+    assert first.get_json()["net_balances"][str(a.id)] == pytest.approx(10.0)
+
+    # Another worker loads new rates: only the database changes, not this process's cache or versions
+    db.session.execute(update(FxRate).where(FxRate.currency == 'EUR')
+                       .values(rate=0.25, loaded_at=datetime.utcnow()))
+    db.session.commit()
+    g.pop('fx_revision', None)  # the fixture's app context outlives requests
+    app.extensions['fx_table'].pop('revision')  # as after FX_REVISION_TTL_SECONDS
+
+    again = client.get(url, headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 200
+    assert again.get_json()["net_balances"][str(a.id)] == pytest.approx(20.0)
@@ -0,0 +1,104 @@
+import time
+
+import pytest
+
+from backend.utils.gemini_client import (
+    CircuitOpen, FakeModel, GeminiBusy, GeminiClient, GeminiTimeout, GeminiUnavailable,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_client(model, **kwargs):
+    kwargs.setdefault("sleep", lambda s: None)
+    return GeminiClient(lambda: model, **kwargs)
+
+
+def test_retries_transient_errors_then_succeeds():
+    model = FakeModel(text="ok", errors=[ConnectionError("reset"), ConnectionError("reset")])
+    client = make_client(model, retries=2)
+    assert client.generate("hi") == "ok"
+    assert model.calls == 3
+    metrics = client.metrics()
+    assert metrics["retries"] == 2 and metrics["successes"] == 1 and metrics["state"] == "closed"
+
+
+def test_client_errors_are_not_retried():
+    class BadRequest(Exception):
+        code = 400
+
+    model = FakeModel(errors=[BadRequest("bad prompt")])
+    client = make_client(model, retries=3)
+    with pytest.raises(GeminiUnavailable):
+        client.generate("hi")
+    assert model.calls == 1
+
+
+def test_deadline_bounds_slow_calls():
+    client = make_client(FakeModel(latency=0.5), timeout=0.05)
+    start = time.perf_counter()
+    with pytest.raises(GeminiTimeout):
+        client.generate("hi")
+    assert time.perf_counter() - start < 0.3
+    assert client.metrics()["timeouts"] == 1
+
+
+def test_concurrency_cap_rejects_when_saturated():
+    client = make_client(FakeModel(latency=0.3), max_concurrency=1)
+    with pytest.raises(GeminiTimeout):
+        client.generate("first", timeout=0.02)   # abandoned, but still holds the slot
+    with pytest.raises(GeminiBusy):
+        client.generate("second", timeout=0.05)
+    assert client.metrics()["rejected_busy"] == 1
+
+
+def test_breaker_opens_fails_fast_and_recovers():
+    clock = Clock()
+    model = FakeModel(text="ok", errors=[ConnectionError("down")] * 3)
+    client = make_client(model, retries=0, breaker_threshold=3, breaker_reset=10, clock=clock)
+
+    for _ in range(3):
+        with pytest.raises(GeminiUnavailable):
+            client.generate("hi")
+    assert client.metrics()["state"] == "open"
+
+    with pytest.raises(CircuitOpen):
+        client.generate("hi")
+    assert model.calls == 3   # not tried while open
+
+    clock.now = 11
+    assert client.metrics()["state"] == "half_open"
+    assert client.generate("hi") == "ok"
+    metrics = client.metrics()
+    assert metrics["state"] == "closed"
+    assert metrics["breaker_open"] == 1 and metrics["breaker_half_open"] == 1 and metrics["breaker_closed"] == 1
+
+
+def test_helpers_fall_back_when_circuit_is_open(app, monkeypatch):
+    from backend.utils import gemini_utils
+
+    model = FakeModel(text='{"category": "Food"}')
+    client = make_client(model, breaker_threshold=1, breaker_reset=60)
+    client.breaker.record_failure()
+    monkeypatch.setattr(gemini_utils, "_MODEL", model)
+    monkeypatch.setitem(app.extensions, "gemini_client", client)
+
+    assert gemini_utils.categorize_expense_text("Tacos")["category"] == "Other"
+    assert gemini_utils.split_expense_with_context("Pizza", 30, ["ana", "ben"], "ben pays double") is None
+    assert model.calls == 0
+
+
+def test_client_settings_come_from_the_app_config(app):
+    from backend.utils import gemini_utils
+
+    app.config.update(GEMINI_RETRIES=0, GEMINI_TIMEOUT_SECONDS=1.5, GEMINI_BREAKER_THRESHOLD=2)
+    client = gemini_utils._client()
+    assert (client.retries, client.timeout, client.breaker.failure_threshold) == (0, 1.5, 2)
+    assert gemini_utils._client() is client
+    assert app.extensions["gemini_client"] is client
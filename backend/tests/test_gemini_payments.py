@@ -0,0 +1,77 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from backend.routes import gemini_routes
+from backend.utils import gemini_utils
+from backend.utils.caching import RateLimiter, TTLCache
+from backend.utils.gemini_client import FakeModel, GeminiClient
+
+
+@pytest.fixture
+def fake_model(app, monkeypatch):
+    model = FakeModel(text=lambda prompt: f"answer to {prompt.strip()}", latency=0.2)
+    monkeypatch.setattr(gemini_utils, "_MODEL", model)
+    monkeypatch.setitem(app.extensions, "gemini_client", GeminiClient(lambda: model, max_concurrency=32))
+    app.config.update(GEMINI_RATE_LIMIT_PER_MINUTE=6000, GEMINI_RATE_LIMIT_BURST=1000)
+    return model
+
+
+def test_burst_costs_one_upstream_call_per_distinct_prompt(app, fake_model):
+    prompts = ["Who owes whom?", "  who owes   WHOM? ", "Settle group 7"] * 10
+
+    def ask(prompt):
+        resp = app.test_client().post('/api/gemini/payments', json={"prompt": prompt})
+        return resp.status_code, resp.get_json()
+
+    with ThreadPoolExecutor(max_workers=30) as pool:
+        results = list(pool.map(ask, prompts))
+
+    assert all(status == 200 for status, _ in results)
+    assert fake_model.calls == 2
+    assert sum(not body["cached"] for _, body in results) == 2
+
+    # Later requests are served from the cache
+    status, body = ask("WHO OWES WHOM?")
+    assert body["cached"] and fake_model.calls == 2
+
+
+def test_rate_limit_per_client(app, client, fake_model):
+    app.config.update(GEMINI_RATE_LIMIT_PER_MINUTE=1, GEMINI_RATE_LIMIT_BURST=2)
+    codes = [client.post('/api/gemini/payments', json={"prompt": f"p{i}"}).status_code for i in range(3)]
+    assert codes == [200, 200, 429]
+
+
+def test_ttl_cache_expires_and_evicts():
+    now = [0.0]
+    cache = TTLCache(maxsize=2, ttl=10, clock=lambda: now[0])
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)               # evicts least recently used "b"
+    assert cache.get("b") is None and cache.get("a") == 1
+    now[0] = 11
+    assert cache.get("a") is None
+
+
+def test_rate_limiter_refills():
+    now = [0.0]
+    limiter = RateLimiter(rate=1, burst=1, clock=lambda: now[0])
+    assert limiter.acquire("u") == 0
+    assert limiter.acquire("u") == pytest.approx(1.0)
+    now[0] = 1.0
+    assert limiter.acquire("u") == 0
+
+
+def test_answer_cache_and_limits_are_per_app(app, fake_model):
+    from backend.app import create_app
+
+    assert app.test_client().post('/api/gemini/payments', json={"prompt": "Who owes whom?"}).status_code == 200
+    other = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://", "GEMINI_RATE_LIMIT_BURST": 1})
+    other.extensions["gemini_client"] = app.extensions["gemini_client"]
+    with other.app_context():
+        assert gemini_routes._answers() is not app.extensions["gemini_answers"]
+        assert gemini_routes._limiter().burst == 1
+    client = other.test_client()
+    assert client.post('/api/gemini/payments', json={"prompt": "Who owes whom?"}).get_json()["cached"] is False
+    assert client.post('/api/gemini/payments', json={"prompt": "Settle up"}).status_code == 429
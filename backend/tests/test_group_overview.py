@@ -0,0 +1,71 @@
+import re
+
+import pytest
+from sqlalchemy import event
+
+from backend.extensions import db
+from backend.models.shared import SharedExpense, Split
+
+
+@pytest.fixture
+def group(group):
+    group, users = group
+    for i in range(5):
+        exp = SharedExpense(group_id=group.id, paid_by=users[i % 3].id, amount=30.0 + i, description=f"exp {i}")
+        exp.splits = [Split(user_id=u.id, amount_owed=(30.0 + i) / 3) for u in users]
+        db.session.add(exp)
+    db.session.commit()
+    return group, users
+
+
+def test_overview_matches_the_separate_endpoints(client, group):
+    group, users = group
+
+    overview = client.get(f'/api/shared/group/{group.id}/overview?limit=3').get_json()
+    balances = client.get(f'/api/shared/group/{group.id}/balances').get_json()
+    history = client.get(f'/api/shared/group/{group.id}/history').get_json()
+
+    assert overview["net_balances"] == balances["net_balances"]
+    assert overview["simplified_transactions"] == balances["simplified_transactions"]
+    assert overview["group"]["created_by_username"] == "u0"
+    assert {m["username"] for m in overview["group"]["members"]} == {"u0", "u1", "u2"}
+    newest = sorted(history["expenses"], key=lambda e: (e["date"], e["id"]), reverse=True)
+    assert overview["history"]["expenses"] == newest[:3]
+    assert overview["history"]["has_more_expenses"] is True
+
+
+def test_unchanged_group_revalidates_without_reading_expenses(app, client, group):
+    group, users = group
+    url = f'/api/shared/group/{group.id}/overview'
+    first = client.get(url)
+    etag = first.headers['ETag']
+    assert etag.startswith('W/')
+
+    tables = []
+    event.listen(db.engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: tables.extend(re.findall(r'FROM (\w+)', statement)))
+    with app.app_context():  # a fresh `g`, as each request gets in production
+        again = client.get(url, headers={'If-None-Match': etag})
+    assert again.status_code == 304
+    assert set(tables) == {"groups"}
+
+    # A new expense changes the version, so the stale validator misses
+    resp = client.post('/api/shared/expense', json={
+        "description": "Dinner", "amount": 60, "group_id": group.id, "paid_by": users[1].id
+    })
+    assert resp.status_code == 201
+    fresh = client.get(url, headers={'If-None-Match': etag})
+    assert fresh.status_code == 200
+    assert fresh.headers['ETag'] != etag
+    assert fresh.get_json()["history"]["expenses"][0]["description"] == "Dinner"
+
+    # Payments between members count too
+    etag = fresh.headers['ETag']
+    client.post(f'/api/shared/group/{group.id}/pay', json={
+        "from_user": users[2].id, "to_user": users[1].id, "amount": 10
+    })
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_missing_group_is_404(client):
+    assert client.get('/api/shared/group/999/overview').status_code == 404
@@ -0,0 +1,43 @@
+import gzip
+import json
+from datetime import datetime
+
+from flask import jsonify
+
+from backend.extensions import db
+from backend.json_provider import IsoJSONProvider
+from backend.models.shared import SharedExpense
+
+
+def test_json_provider_writes_iso_datetimes_and_int_keys(app):
+    payload = {"when": datetime(2025, 5, 1, 12, 30, 0, 250), "net": {1: 9.5, 2: -9.5}}
+    body = json.loads(jsonify(payload).get_data())
+    assert body == {"when": "2025-05-01T12:30:00.000250", "net": {"1": 9.5, "2": -9.5}}
+
+    stdlib = json.loads(IsoJSONProvider(app).dumps(payload))
+    assert stdlib == body
+
+
+def test_large_responses_are_compressed_when_accepted(client, group):
+    group, users = group
+    db.session.add_all([
+        SharedExpense(group_id=group.id, paid_by=users[0].id, amount=10, description=f"Item {i:04d}")
+        for i in range(300)
+    ])
+    db.session.commit()
+    url = f'/api/shared/group/{group.id}/history'
+
+    plain = client.get(url)
+    assert 'Content-Encoding' not in plain.headers
+    assert plain.headers['Vary'] == 'Accept-Encoding'
+
+    packed = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert packed.headers['Content-Encoding'] == 'gzip'
+    assert len(packed.data) < len(plain.data) / 3
+    assert json.loads(gzip.decompress(packed.data)) == plain.get_json()
+
+
+def test_small_responses_stay_uncompressed(client, group):
+    group, _ = group
+    resp = client.get(f'/api/shared/group/{group.id}/history', headers={"Accept-Encoding": "gzip, br"})
+    assert 'Content-Encoding' not in resp.headers
@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from backend.extensions import db
+from backend.models.shared import (
+    ArchivedSharedExpense, ArchivedSplit, BalanceCheckpoint, SharedExpense, Split
+)
+from backend.utils.group_ledger import fold_expenses, group_balances
+
+
+def full_recompute(group_id):
+    net = {}
+    fold_expenses(group_id, 0, net)
+    return net
+
+
+def login_as(client, user):
+    client.set_cookie('access_token', create_access_token(identity=str(user.id)))
+
+
+@pytest.fixture
+def group(group):
+    group, users = group
+    for i in range(6):
+        payer = users[i % 3].id
+        exp = SharedExpense(group_id=group.id, paid_by=payer, amount=30.0 + i, description=f"e{i}",
+                            created_at=datetime.utcnow() - timedelta(hours=1))
+        exp.splits = [Split(user_id=u.id, amount_owed=(30.0 + i) / 3, is_paid=(u.id == payer)) for u in users]
+        db.session.add(exp)
+    db.session.commit()
+    return group, users
+
+
+def pay(client, group, frm, to, amount, status="completed"):
+    return client.post(f'/api/shared/group/{group.id}/pay', json={
+        "from_user": frm, "to_user": to, "amount": amount, "status": status
+    })
+
+
+def open_splits(expense):
+    return sorted(s.user_id for s in Split.query.filter_by(expense_id=expense.id, is_paid=False))
+
+
+def test_payments_settle_the_oldest_splits_first(client, group):
+    group, users = group
+    u0, u1, _ = (u.id for u in users)
+    e0, _, _, e3, _, _ = SharedExpense.query.order_by(SharedExpense.id).all()
+
+    assert pay(client, group, u1, u0, 11, status="pending").status_code == 201
+    assert open_splits(e0) == [u1, users[2].id]
+
+    # 11 covers u1's 10 on e0 but not the 11 on e3
+    pay(client, group, u1, u0, 11)
+    assert open_splits(e0) == [users[2].id]
+    assert open_splits(e3) == [u1, users[2].id]
+
+
+def test_archive_keeps_balances_and_history(app, client, group):
+    group, users = group
+    # Settle the first three expenses in full; the rest keep open splits
+    for exp in SharedExpense.query.order_by(SharedExpense.id).limit(3).all():
+        for split in exp.splits:
+            if not split.is_paid:
+                pay(client, group, split.user_id, exp.paid_by, round(split.amount_owed, 2))
+
+    before = client.get(f'/api/shared/group/{group.id}/balances').get_json()
+    history = client.get(f'/api/shared/group/{group.id}/history').get_json()["expenses"]
+
+    result = app.test_cli_runner().invoke(args=['archive-settled', '--older-than-days', '0'])
+    assert "Archived 3 expenses" in result.output
+    assert SharedExpense.query.count() == 3
+    assert ArchivedSharedExpense.query.count() == 3
+    assert ArchivedSplit.query.count() == 9
+    assert Split.query.count() == 9
+
+    after = client.get(f'/api/shared/group/{group.id}/balances').get_json()
+    assert after["net_balances"] == pytest.approx(before["net_balances"])
+    assert full_recompute(group.id) == pytest.approx(group_balances(group.id))
+    assert sorted(e["id"] for e in client.get(f'/api/shared/group/{group.id}/history').get_json()["expenses"]) \
+        == sorted(e["id"] for e in history)
+    overview = client.get(f'/api/shared/group/{group.id}/overview?limit=10').get_json()
+    assert len(overview["history"]["expenses"]) == 6
+    login_as(client, users[0])
+    assert client.get(f'/api/shared/group/{group.id}/export').get_data(as_text=True).count("\n") == 7
+
+    # Archived ids are never handed out again
+    resp = client.post('/api/shared/expense', json={
+        "description": "Late", "amount": 9, "group_id": group.id, "paid_by": users[0].id
+    })
+    assert resp.get_json()["expense_id"] > max(e["id"] for e in history)
+    assert group_balances(group.id) == pytest.approx(full_recompute(group.id))
+
+    # Archived expenses are listed in the history but refuse deletion
+    archived = ArchivedSharedExpense.query.first()
+    assert client.delete(f'/api/shared/expense/{archived.id}').status_code == 409
+    assert client.delete('/api/shared/expense/9999').status_code == 404
+
+
+def test_checkpoint_plus_deltas_and_invalidation(app, client, group):
+    group, users = group
+    app.test_cli_runner().invoke(args=['checkpoint-balances'])
+    assert BalanceCheckpoint.query.filter_by(group_id=group.id).count() == 3
+
+    client.post('/api/shared/expense', json={
+        "description": "Taxi", "amount": 12, "group_id": group.id, "paid_by": users[2].id
+    })
+    assert BalanceCheckpoint.query.filter_by(group_id=group.id).count() == 3
+    assert group_balances(group.id) == pytest.approx(full_recompute(group.id))
+
+    # Deleting an expense the checkpoint covers drops the checkpoint
+    covered = SharedExpense.query.filter_by(group_id=group.id).order_by(SharedExpense.id).first()
+    assert client.delete(f'/api/shared/expense/{covered.id}').status_code == 200
+    assert BalanceCheckpoint.query.filter_by(group_id=group.id).count() == 0
+    assert group_balances(group.id) == pytest.approx(full_recompute(group.id))
+
+
+def test_checkpoint_leaves_out_recent_expenses(app, client, group):
+    group, users = group
+    client.post('/api/shared/expense', json={
+        "description": "Taxi", "amount": 12, "group_id": group.id, "paid_by": users[2].id
+    })
+    newest = SharedExpense.query.order_by(SharedExpense.id.desc()).first()
+
+    # The new expense may sit behind a lower id that is not committed yet
+    app.test_cli_runner().invoke(args=['checkpoint-balances'])
+    assert BalanceCheckpoint.query.filter_by(group_id=group.id).first().through_expense_id == newest.id - 1
+    assert group_balances(group.id) == pytest.approx(full_recompute(group.id))
+
+    app.config['CHECKPOINT_SAFETY_SECONDS'] = 0
+    app.test_cli_runner().invoke(args=['checkpoint-balances'])
+    assert BalanceCheckpoint.query.filter_by(group_id=group.id).first().through_expense_id == newest.id
@@ -0,0 +1,93 @@
+import csv
+import io
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.extensions import db
+from backend.models.personal import PersonalExpense
+from backend.models.shared import Group, SharedExpense
+from backend.models.user import User
+from backend.utils import ledger_export
+
+
+def login(client, username="ana"):
+    client.post('/api/auth/register', json={"username": username, "email": f"{username}@example.com", "password": "pw"})
+    client.post('/api/auth/login', json={"username": username, "password": "pw"})
+    return User.query.filter_by(username=username).one()
+
+
+def add_expenses(user, n=12):
+    start = datetime(2025, 1, 1)
+    db.session.add_all([PersonalExpense(
+        user_id=user.id, amount=1.5 * i, description=f"item, {i}", category="Food",
+        transaction_date=start + timedelta(days=i)
+    ) for i in range(n)])
+    db.session.commit()
+
+
+def read_csv(resp):
+    return parse_csv(resp.get_data(as_text=True))
+
+
+def parse_csv(text):
+    return list(csv.DictReader(io.StringIO(text)))
+
+
+def test_personal_csv_streams_in_chunks_and_resumes(app, client):
+    add_expenses(login(client))
+    app.config['EXPORT_CHUNK_ROWS'] = 5
+
+    resp = client.get('/api/personal/expenses/export')
+    assert resp.is_streamed
+    assert resp.mimetype == 'text/csv'
+    assert 'attachment' in resp.headers['Content-Disposition']
+    pieces = [p for p in resp.response if p]
+    assert len(pieces) == 3  # header + first chunk, then one piece per further chunk
+    rows = parse_csv("".join(p.decode() for p in pieces))
+    assert len(rows) == 12
+    assert rows[1]["description"] == "item, 1"
+    assert rows[1]["transaction_date"] == "2025-01-02T00:00:00"
+
+    resumed = read_csv(client.get(f'/api/personal/expenses/export?after_id={rows[6]["id"]}'))
+    assert resumed == rows[7:]
+
+
+def test_group_csv_export(client):
+    user = login(client)
+    group = Group(name="Trip", created_by=user.id)
+    group.members.append(user)
+    db.session.add(group)
+    db.session.flush()
+    db.session.add_all([SharedExpense(group_id=group.id, paid_by=user.id, amount=10 + i, description=f"d{i}") for i in range(3)])
+    db.session.commit()
+
+    rows = read_csv(client.get(f'/api/shared/group/{group.id}/export'))
+    assert [r["description"] for r in rows] == ["d0", "d1", "d2"]
+    assert rows[0]["paid_by_username"] == "ana"
+    assert client.get('/api/shared/group/999/export').status_code == 404
+
+
+def test_group_export_is_for_members_only(app, client, group):
+    group, _ = group
+    assert client.get(f'/api/shared/group/{group.id}/export').status_code == 401
+    login(client)
+    assert client.get(f'/api/shared/group/{group.id}/export').status_code == 403
+
+
+def test_unknown_or_unavailable_formats(client, monkeypatch):
+    login(client)
+    assert client.get('/api/personal/expenses/export?format=xlsx').status_code == 400
+    monkeypatch.setattr(ledger_export, "pq", None)
+    assert client.get('/api/personal/expenses/export?format=parquet').status_code == 501
+
+
+def test_parquet_row_groups(app, client):
+    pq = pytest.importorskip("pyarrow.parquet")
+    add_expenses(login(client))
+    app.config['EXPORT_CHUNK_ROWS'] = 5
+
+    resp = client.get('/api/personal/expenses/export?format=parquet')
+    parquet = pq.ParquetFile(io.BytesIO(resp.get_data()))
+    assert parquet.metadata.num_row_groups == 3
+    assert parquet.read().column("amount").to_pylist() == [1.5 * i for i in range(12)]
@@ -0,0 +1,43 @@
+import threading
+
+from werkzeug.security import generate_password_hash
+
+from backend.extensions import db
+from backend.models.user import User
+from backend.utils import passwords
+
+
+def test_register_stores_bcrypt_hash_at_configured_cost(client):
+    client.post('/api/auth/register', json={"username": "ana", "email": "ana@example.com", "password": "pw"})
+    assert User.query.filter_by(username="ana").one().password_hash.startswith("$2b$04$")
+
+
+def test_login_upgrades_legacy_and_outdated_hashes(app, client):
+    user = User(username="old", email="old@example.com", password_hash=generate_password_hash("pw"))
+    db.session.add(user)
+    db.session.commit()
+
+    assert client.post('/api/auth/login', json={"username": "old", "password": "nope"}).status_code == 401
+    assert not user.password_hash.startswith("$2b$")
+
+    assert client.post('/api/auth/login', json={"username": "old", "password": "pw"}).status_code == 200
+    db.session.refresh(user)
+    assert user.password_hash.startswith("$2b$04$")
+
+    app.config["BCRYPT_LOG_ROUNDS"] = 5
+    assert client.post('/api/auth/login', json={"username": "old", "password": "pw"}).status_code == 200
+    db.session.refresh(user)
+    assert user.password_hash.startswith("$2b$05$")
+
+
+def test_full_queue_sheds_logins(app, client, monkeypatch):
+    client.post('/api/auth/register', json={"username": "ana", "email": "ana@example.com", "password": "pw"})
+
+    full = threading.BoundedSemaphore(1)
+    full.acquire()
+    monkeypatch.setattr(passwords, "_pool", lambda workers, queue: (None, full))
+    app.config["PASSWORD_HASH_WORKERS"] = 1
+
+    resp = client.post('/api/auth/login', json={"username": "ana", "password": "pw"})
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
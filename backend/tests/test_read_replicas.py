@@ -0,0 +1,82 @@
+import sqlite3
+
+import pytest
+
+from backend.app import create_app
+from backend.db_routing import STICKY_COOKIE
+from backend.extensions import db
+
+
+@pytest.fixture
+def replicated(tmp_path):
+    primary, replica = tmp_path / "primary.db", tmp_path / "replica.db"
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{primary}",
+        "SQLALCHEMY_REPLICA_URIS": [f"sqlite:///{replica}"],
+        "BCRYPT_LOG_ROUNDS": 4,
+    })
+
+    def sync():
+        """Stand-in for replication: copy the primary over the replica."""
+        with sqlite3.connect(primary) as src, sqlite3.connect(replica) as dst:
+            src.backup(dst)
+
+    with app.app_context():
+        db.create_all()
+    sync()
+    yield app, sync
+    with app.app_context():
+        for engine in [*db.engines.values(), *app.extensions['db_replicas']]:
+            engine.dispose()
+
+
+def test_reads_go_to_replica_except_right_after_a_write(replicated):
+    app, sync = replicated
+    client = app.test_client()
+    client.post('/api/auth/register', json={"username": "ana", "email": "ana@example.com", "password": "pw"})
+    client.post('/api/auth/login', json={"username": "ana", "password": "pw"})
+    sync()
+
+    resp = client.post('/api/personal/expenses', json={
+        "amount": 9.5, "description": "Lunch", "transaction_date": "2025-05-01T12:00:00"
+    })
+    assert resp.status_code == 201
+    assert client.get_cookie(STICKY_COOKIE) is not None
+
+    # Within the stickiness window the writer reads its own write from the primary
+    assert len(client.get('/api/personal/expenses').get_json()["expenses"]) == 1
+
+    # Once it lapses, reads come from the (lagging) replica
+    client.delete_cookie(STICKY_COOKIE)
+    assert client.get('/api/personal/expenses').get_json()["expenses"] == []
+
+    sync()
+    assert len(client.get('/api/personal/expenses').get_json()["expenses"]) == 1
+
+
+def test_get_requests_that_write_stick_and_the_user_cache_reads_the_primary(replicated):
+    from flask_jwt_extended import current_user, jwt_required
+
+    app, sync = replicated
+
+    @app.get('/rename')
+    @jwt_required()
+    def rename():
+        # Like the OAuth callback: a GET that commits
+        current_user.username = "anabel"
+        db.session.commit()
+        return "", 302
+
+    client = app.test_client()
+    client.post('/api/auth/register', json={"username": "ana", "email": "ana@example.com", "password": "pw"})
+    client.post('/api/auth/login', json={"username": "ana", "password": "pw"})
+    sync()
+    client.delete_cookie(STICKY_COOKIE)
+
+    client.get('/rename')
+    assert client.get_cookie(STICKY_COOKIE) is not None
+
+    # Even past the window, with the replica still lagging, the refilled cache holds the new name
+    client.delete_cookie(STICKY_COOKIE)
+    assert b"anabel" in client.get('/dashboard').data
+    assert b"anabel" in client.get('/dashboard').data
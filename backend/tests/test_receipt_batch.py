@@ -0,0 +1,92 @@
+import gc
+import io
+import json
+import threading
+import time
+
+from backend.models.shared import SharedExpense
+from backend.utils import receipt_batch
+
+
+def login_with_group(client):
+    for name in ("ana", "ben"):
+        client.post("/api/auth/register", json={"username": name, "email": f"{name}@example.com", "password": "pw"})
+    client.post("/api/auth/login", json={"username": "ana", "password": "pw"})
+    return client.post("/api/shared/groups", json={"name": "Trip", "members": [2]}).get_json()["group_id"]
+
+def post_batch(client, images, **form):
+    data = {"receipts": [(io.BytesIO(img), f"r{i}.jpg") for i, img in enumerate(images)], **form}
+    resp = client.post("/api/shared/expense/receipts", data=data, content_type="multipart/form-data")
+    return resp, [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+
+def test_batch_streams_results_with_bounded_concurrency(app, client, monkeypatch):
+    gid = login_with_group(client)
+    app.config["RECEIPT_BATCH_PER_USER"] = 2
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def fake_extract(data, context, mime_type):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return {"vendor": "Shop", "total": f"${len(data)}.00"}
+    monkeypatch.setattr("backend.utils.receipt_batch.extract_from_receipt", fake_extract)
+
+    images = [b"\xff\xd8\xff" + b"x" * n for n in (7, 17, 27, 37)] + [b"nope"]
+    resp, lines = post_batch(client, images, create_expenses="true", group_id=gid, paid_by=1)
+
+    assert resp.mimetype == "application/x-ndjson"
+    assert lines[0] == {"index": 4, "filename": "r4.jpg", "status": "error", "error": "Unsupported receipt file type"}
+    assert sorted(l["index"] for l in lines[1:5]) == [0, 1, 2, 3]
+    assert all(l["status"] == "ok" for l in lines[1:5])
+    assert peak[0] <= 2
+
+    created = lines[-1]["created_expenses"]
+    assert [c["amount"] for c in created] == [10.0, 20.0, 30.0, 40.0]
+    assert SharedExpense.query.count() == 4
+
+    # A retry of the same photos is served from the cache without new model calls
+    monkeypatch.setattr("backend.utils.receipt_batch.extract_from_receipt", None)
+    _, lines = post_batch(client, images[:2])
+    assert [l["cached"] for l in lines] == [True, True]
+
+def test_running_jobs_keep_their_slot_after_the_client_leaves():
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+
+    results = receipt_batch.run_bounded([("fast", lambda: 1), ("slow", slow)], "leaver", per_user=2, workers=4)
+    assert next(results)[0] == "fast"
+    started.wait(5)
+    results.close()  # cannot cancel `slow`: it is already running
+
+    slots = receipt_batch._user_slots("leaver", 2)
+    assert slots.acquire(blocking=False)
+    assert not slots.acquire(blocking=False)  # `slow` still holds the other slot
+    slots.release()
+
+    release.set()
+    assert slots.acquire(timeout=5) and slots.acquire(timeout=5)
+    slots.release()
+    slots.release()
+
+    del slots, results
+    gc.collect()
+    assert ("leaver", 2) not in receipt_batch._USER_SLOTS
+
+def test_parse_total_reads_decimal_commas_and_rejects_non_positive():
+    totals = ["$12.50", "12,50", "1.234,56", "1,234.56", "1 234,50 €", 9.99]
+    assert [receipt_batch.parse_total({"total": t}) for t in totals] == [12.5, 12.5, 1234.56, 1234.56, 1234.5, 9.99]
+    for bad in ("-5", "0,00", 0, -3.0, float("nan"), float("inf"), True, "n/a"):
+        assert receipt_batch.parse_total({"total": bad}) is None, bad
+
+def test_batch_rejects_a_payer_outside_the_group(client):
+    gid = login_with_group(client)
+    client.post("/api/auth/register", json={"username": "cy", "email": "cy@example.com", "password": "pw"})
+    resp, _ = post_batch(client, [b"\xff\xd8\xffx"], create_expenses="true", group_id=gid, paid_by=3)
+    assert resp.status_code == 400
+    assert SharedExpense.query.count() == 0
@@ -0,0 +1,54 @@
+import io
+
+from backend.models.cache import ReceiptCache
+from backend.utils import gemini_utils
+from backend.utils.gemini_client import FakeModel, GeminiClient
+from backend.utils.receipt_cache import receipt_cache_key, store_receipt
+
+
+def upload(client, image=b"\xff\xd8\xff fake jpeg", context=""):
+    return client.post(
+        "/api/shared/expense/receipt",
+        data={"receipt": (io.BytesIO(image), "receipt.jpg"), "context": context},
+        content_type="multipart/form-data",
+    )
+
+def test_duplicate_upload_is_served_from_cache(client, monkeypatch):
+    calls = []
+    def fake_extract(data, context, mime_type="image/jpeg"):
+        calls.append(data)
+        return {"vendor": "Cafe", "total": 12.5}
+    monkeypatch.setattr("backend.routes.shared_routes.extract_from_receipt", fake_extract)
+
+    first = upload(client).get_json()
+    second = upload(client).get_json()
+    assert first["gemini_output"] == {"vendor": "Cafe", "total": 12.5} and first["cached"] is False
+    assert second == {"gemini_output": {"vendor": "Cafe", "total": 12.5}, "cached": True}
+    assert len(calls) == 1
+
+    # Different context is a different question
+    assert upload(client, context="split with Ana").get_json()["cached"] is False
+    assert len(calls) == 2
+
+def test_unparsed_results_are_not_cached(client, monkeypatch):
+    monkeypatch.setattr("backend.routes.shared_routes.extract_from_receipt", lambda d, c, mime_type: "No Gemini model configured.")
+    upload(client)
+    assert ReceiptCache.query.count() == 0
+
+def test_cache_keys_and_lru_eviction(app):
+    assert receipt_cache_key(b"img", "Split  with ANA") == receipt_cache_key(b"img", "split with ana")
+    assert receipt_cache_key(b"img") != receipt_cache_key(b"img2")
+
+    app.config["RECEIPT_CACHE_MAX_BYTES"] = 80
+    for i in range(3):
+        store_receipt(f"k{i}", {"total": i, "vendor": "x" * 10})   # 36 bytes each
+    assert [e.key for e in ReceiptCache.query.order_by(ReceiptCache.key)] == ["k1", "k2"]
+
+def test_fenced_model_answers_are_parsed_and_cached(app, client, monkeypatch):
+    model = FakeModel(text='```json\n{"vendor": "Cafe", "total": 12.5}\n```')
+    monkeypatch.setattr(gemini_utils, "_MODEL", model)
+    monkeypatch.setitem(app.extensions, "gemini_client", GeminiClient(lambda: model))
+
+    assert upload(client).get_json()["gemini_output"] == {"vendor": "Cafe", "total": 12.5}
+    assert upload(client).get_json()["cached"] is True
+    assert model.calls == 1
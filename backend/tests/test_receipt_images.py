@@ -0,0 +1,69 @@
+import io
+
+import pytest
+
+from backend.utils.receipt_images import ReceiptTooLarge, preprocess_receipt, read_upload, sniff_mime
+
+
+def make_photo(size=(3000, 4000), fmt="JPEG"):
+    Image = pytest.importorskip("PIL.Image")
+    img = Image.radial_gradient("L").resize(size).convert("RGB")
+    out = io.BytesIO()
+    img.save(out, format=fmt, quality=95)
+    return out.getvalue()
+
+def test_sniff_mime():
+    assert sniff_mime(b"\xff\xd8\xff\xe0rest") == "image/jpeg"
+    assert sniff_mime(b"\x89PNG\r\n\x1a\nrest") == "image/png"
+    assert sniff_mime(b"RIFF\x00\x00\x00\x00WEBPVP8 ") == "image/webp"
+    assert sniff_mime(b"\x00\x00\x00\x18ftypheic") == "image/heic"
+    assert sniff_mime(b"%PDF-1.7") == "application/pdf"
+    assert sniff_mime(b"hello") is None
+
+def test_read_upload_enforces_cap():
+    assert read_upload(io.BytesIO(b"x" * 100), max_bytes=100) == b"x" * 100
+    with pytest.raises(ReceiptTooLarge):
+        read_upload(io.BytesIO(b"x" * 200_000), max_bytes=100_000)
+
+def test_preprocess_shrinks_to_grayscale_jpeg():
+    from PIL import Image
+    original = make_photo(fmt="PNG")
+    payload, mime, stats = preprocess_receipt(original, "image/png", max_side=1000)
+
+    assert mime == "image/jpeg"
+    assert stats["processed"] and stats["sent_bytes"] < stats["original_bytes"]
+    img = Image.open(io.BytesIO(payload))
+    assert img.mode == "L" and max(img.size) == 1000
+
+def test_oversized_images_are_rejected_before_decoding(monkeypatch):
+    from PIL import Image
+    photo = make_photo()  # 12M pixels
+    limit = Image.MAX_IMAGE_PIXELS
+    with pytest.raises(ReceiptTooLarge):
+        preprocess_receipt(photo, "image/jpeg", max_pixels=8_000_000)   # over the limit
+    assert Image.MAX_IMAGE_PIXELS == limit
+    assert preprocess_receipt(photo, "image/jpeg")[2]["processed"]
+
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1_000_000)
+    with pytest.raises(ReceiptTooLarge):
+        preprocess_receipt(photo, "image/jpeg")   # Pillow's bomb error
+
+def test_non_raster_passes_through():
+    payload, mime, stats = preprocess_receipt(b"%PDF-1.7 ...", "application/pdf")
+    assert payload == b"%PDF-1.7 ..." and mime == "application/pdf" and not stats["processed"]
+
+def test_upload_rejects_oversized_and_unknown_files(app, client):
+    app.config["RECEIPT_MAX_UPLOAD_BYTES"] = 1024
+    big = client.post("/api/shared/expense/receipt", content_type="multipart/form-data",
+                      data={"receipt": (io.BytesIO(b"\xff\xd8\xff" + b"0" * 4096), "r.jpg")})
+    assert big.status_code == 413
+
+    odd = client.post("/api/shared/expense/receipt", content_type="multipart/form-data",
+                      data={"receipt": (io.BytesIO(b"not an image"), "r.jpg")})
+    assert odd.status_code == 415
+
+def test_request_body_is_capped(app, client):
+    app.config["MAX_CONTENT_LENGTH"] = 1024
+    resp = client.post("/api/shared/expense/receipt", content_type="multipart/form-data",
+                       data={"receipt": (io.BytesIO(b"\xff\xd8\xff" + b"0" * 4096), "r.jpg")})
+    assert resp.status_code == 413
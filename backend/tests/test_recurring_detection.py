@@ -0,0 +1,84 @@
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+
+from backend.extensions import db
+from backend.models.personal import PersonalExpense
+from backend.utils.analytics import normalize_merchant
+from backend.utils.recurring_detection import _near_median, classify_series, detect_recurring
+
+MOCK_PLAID = os.path.join(os.path.dirname(__file__), "..", "..", "mock_data", "plaid_transactions.json")
+
+
+def login(client):
+    client.post("/api/auth/register", json={"username": "rec", "email": "rec@example.com", "password": "pw"})
+    client.post("/api/auth/login", json={"username": "rec", "password": "pw"})
+
+def test_classify_series():
+    # merchant 0: monthly, same amount; merchant 1: irregular; merchant 2: weekly with drifting price
+    codes = np.array([0, 0, 0, 1, 1, 1, 2, 2, 2])
+    days = np.array([0, 31, 61, 0, 3, 40, 0, 7, 14])
+    amounts = np.array([9.99, 9.99, 9.99, 5, 5, 5, 10, 20, 30])
+    assert classify_series(codes, days, amounts, 3) == ["monthly", None, None]
+
+def test_near_median_matches_per_merchant_medians():
+    # merchant 0: series plus a one-off; merchant 1: even count; merchant 2: refunds
+    codes = np.array([0, 1, 0, 2, 0, 1, 2, 0, 1, 1, 2])
+    amounts = np.array([10.0, 4.0, 10.5, -20.0, 80.0, 6.0, -20.0, 9.8, 5.0, 5.2, -21.0])
+    expected = np.array([abs(a - np.median(amounts[codes == c])) <= 0.10 * abs(np.median(amounts[codes == c]))
+                         for a, c in zip(amounts, codes)])
+    assert _near_median(codes, amounts, 4).tolist() == expected.tolist()
+    assert _near_median(codes, amounts, 4)[codes == 2].all()
+
+def test_mock_plaid_import_flags_subscriptions(client):
+    login(client)
+    with open(MOCK_PLAID) as f:
+        txns = json.load(f)["transactions"]
+    # A hinted description still needs a second, spaced charge
+    txns.append({"description": "NETFLIX.COM 8842", "amount": 13.99, "transaction_date": "2025-06-10"})
+
+    resp = client.post("/api/personal/expenses/import-mock", json={"transactions": txns})
+    recurring = resp.get_json()["recurring"]
+    assert recurring["netflix"] == "monthly"
+    assert "starbucks" not in recurring
+
+    netflix = PersonalExpense.query.filter_by(merchant_key="netflix").all()
+    assert len(netflix) == 2 and all(e.is_recurring for e in netflix)
+    assert "spotify" not in recurring  # a single charge, hint or not
+
+    # Nothing new since the last run
+    assert detect_recurring(1) == {}
+
+def test_interval_pattern_detected_incrementally(client):
+    login(client)
+    for date in ["2025-04-02", "2025-05-02"]:
+        client.post("/api/personal/expenses", json={
+            "amount": 45, "description": "City Gym", "transaction_date": date, "is_recurring": False
+        })
+    assert client.post("/api/personal/recurring/detect").get_json()["recurring"] == {}
+
+    client.post("/api/personal/expenses", json={
+        "amount": 45, "description": "CITY GYM 0042", "transaction_date": "2025-06-01", "is_recurring": False
+    })
+    assert client.post("/api/personal/recurring/detect").get_json()["recurring"] == {"city gym": "monthly"}
+
+def add(user_id, description, amount, day):
+    db.session.add(PersonalExpense(
+        user_id=user_id, amount=amount, description=description, category="Other",
+        merchant_key=normalize_merchant(description), transaction_date=datetime.fromisoformat(day)
+    ))
+
+def test_only_the_periodic_series_is_flagged(app):
+    for day in ["2025-04-02", "2025-05-02", "2025-06-01"]:
+        add(7, "City Gym", 45, day)
+    add(7, "City Gym", 120, "2025-05-20")           # a one-off personal training session
+    add(7, "Apple iCloud", 0.99, "2025-05-05")
+    add(7, "Apple iCloud", 0.99, "2025-05-05")      # same day: not a spaced second charge
+    add(7, "Apple Store", 999, "2025-05-06")
+    db.session.commit()
+
+    assert detect_recurring(7) == {7: {"city gym": "monthly"}}
+    flagged = PersonalExpense.query.filter_by(is_recurring=True).all()
+    assert sorted(e.amount for e in flagged) == [45, 45, 45]
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+
+from backend.models.personal import PersonalExpense, RecurringRule
+from backend.utils.recurring_scheduler import acquire_lease, next_occurrence, tick
+
+
+def login(client):
+    client.post("/api/auth/register", json={"username": "sch", "email": "sch@example.com", "password": "pw"})
+    client.post("/api/auth/login", json={"username": "sch", "password": "pw"})
+
+def test_next_occurrence_clamps_month_end():
+    assert next_occurrence(datetime(2025, 1, 31), "monthly") == datetime(2025, 2, 28)
+    assert next_occurrence(datetime(2024, 11, 30), "quarterly") == datetime(2025, 2, 28)
+    assert next_occurrence(datetime(2025, 12, 15), "monthly") == datetime(2026, 1, 15)
+    assert next_occurrence(datetime(2025, 1, 1), "weekly") == datetime(2025, 1, 8)
+
+def test_tick_materializes_due_occurrences_once(client):
+    login(client)
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    resp = client.post("/api/personal/expenses", json={
+        "amount": 20, "description": "Rent share", "transaction_date": today.isoformat(),
+        "is_recurring": True, "cadence": "weekly"
+    })
+    assert resp.status_code == 201
+    rule = RecurringRule.query.one()
+    assert rule.next_due_at == today + timedelta(days=7)
+
+    later = today + timedelta(days=22)
+    assert tick(now=later) == 3
+    assert tick(now=later) == 0
+
+    generated = PersonalExpense.query.filter_by(recurring_rule_id=rule.id).all()
+    assert sorted(e.transaction_date for e in generated) == [
+        today + timedelta(days=7), today + timedelta(days=14), today + timedelta(days=21)
+    ]
+    assert RecurringRule.query.one().next_due_at == today + timedelta(days=28)
+
+def test_tick_skips_while_another_process_holds_lease(client):
+    login(client)
+    client.post("/api/personal/expenses", json={
+        "amount": 5, "description": "Music", "transaction_date": datetime.utcnow().isoformat(),
+        "is_recurring": True
+    })
+    later = datetime.utcnow() + timedelta(days=40)
+    assert acquire_lease("other-host:1", timedelta(minutes=5), now=later)
+    assert tick(now=later, holder="this-host:2") == 0
+    assert tick(now=later + timedelta(minutes=6), holder="this-host:2") == 1
+
+def test_detected_subscription_needs_confirmation(client):
+    login(client)
+    client.post("/api/personal/expenses/import-mock", json={"transactions": [
+        {"description": "Netflix Subscription", "amount": 13.99, "transaction_date": "2025-06-10"},
+        {"description": "Netflix Subscription", "amount": 13.99, "transaction_date": "2025-07-10"},
+    ]})
+    assert RecurringRule.query.count() == 0
+
+    resp = client.post("/api/personal/recurring/rules", json={"merchant_key": "netflix", "cadence": "monthly"})
+    assert resp.status_code == 201
+    rule = RecurringRule.query.filter_by(merchant_key="netflix").one()
+    assert rule.cadence == "monthly"
+    assert rule.next_due_at >= datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    assert rule.next_due_at.day == 10
+    assert client.post("/api/personal/recurring/rules", json={"merchant_key": "hulu"}).status_code == 404
+
+def test_deactivated_rules_stop_generating(client):
+    login(client)
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    ids = []
+    for desc in ("Gym", "Music"):
+        resp = client.post("/api/personal/expenses", json={
+            "amount": 10, "description": desc, "transaction_date": today.isoformat(),
+            "is_recurring": True, "cadence": "weekly"
+        })
+        ids.append(resp.get_json()["expense"]["id"])
+    gym, music = RecurringRule.query.order_by(RecurringRule.id).all()
+
+    assert client.post(f"/api/personal/recurring/rules/{gym.id}/deactivate").status_code == 200
+    # Deleting the expense a rule was created from stops that rule too
+    assert client.delete(f"/api/personal/expenses/{ids[1]}").status_code == 200
+    assert [r.active for r in RecurringRule.query.order_by(RecurringRule.id)] == [False, False]
+    assert tick(now=today + timedelta(days=30)) == 0
+    assert client.get("/api/personal/recurring/rules").get_json()["rules"][0]["active"] is False
@@ -0,0 +1,83 @@
+import pytest
+
+from backend.extensions import db
+from backend.models.shared import SharedExpense, Split
+from backend.models.user import User
+from backend.routes import shared_routes
+from backend.utils.group_ledger import group_balances, group_version
+
+
+@pytest.fixture
+def reminders(monkeypatch):
+    sent = []
+    monkeypatch.setattr(shared_routes, '_send_calendar_reminders', lambda group, summary: sent.append(summary))
+    return sent
+
+
+def test_batch_creates_expenses_in_one_pass(client, group, reminders):
+    group, (a, b, c) = group
+    version = group_version(group.id)
+
+    resp = client.post('/api/shared/expenses/batch', json={
+        "group_id": group.id, "paid_by": a.id,
+        "expenses": [
+            {"description": "Rent", "amount": 100},
+            {"description": "Taxi", "amount": 9, "paid_by": b.id, "excluded_members": [c.id]},
+            {"description": "Wine", "amount": 10, "split": {"method": "shares", "shares": {a.id: 1, c.id: 4}}},
+        ] + [{"description": f"Snack {i}", "amount": 1} for i in range(200)],
+    })
+    assert resp.status_code == 201
+    ids = resp.get_json()["expense_ids"]
+    assert len(ids) == 203 and ids == sorted(ids)
+    assert group_version(group.id) == version + 1
+    assert reminders == ["[Divy] Expense Reminder: 203 new expenses"]
+
+    rent, taxi, wine = (db.session.get(SharedExpense, i) for i in ids[:3])
+    assert sorted(s.amount_owed for s in rent.splits) == [33.33, 33.33, 33.34]
+    assert {s.user_id: (s.amount_owed, s.is_paid) for s in taxi.splits} == {a.id: (4.5, False), b.id: (4.5, True)}
+    assert {s.user_id: s.amount_owed for s in wine.splits} == {a.id: 2.0, c.id: 8.0}
+    assert Split.query.count() == 3 + 2 + 2 + 200 * 3
+
+    net = group_balances(group.id)
+    assert sum(net.values()) == pytest.approx(0)
+    owed_by_b = sum(s.amount_owed for s in Split.query.filter_by(user_id=b.id))
+    assert net[b.id] == pytest.approx(9 - owed_by_b)
+
+
+def test_batch_is_all_or_nothing(client, group, reminders):
+    group, (a, _, _) = group
+    outsider = User(username="x", email="x@example.com", password_hash="x")
+    db.session.add(outsider)
+    db.session.commit()
+    base = {"group_id": group.id, "paid_by": a.id}
+
+    for bad in (
+        {"description": "Late", "amount": "n/a"},
+        {"description": "Late", "amount": "nan"},
+        {"description": "Late", "amount": "inf"},
+        {"description": "Late", "amount": 0},
+        {"description": "Late", "amount": -5},
+        {"description": "Taxi", "amount": 5, "excluded_members": a.id},
+        {"description": "Taxi", "amount": 5, "excluded_members": str(a.id)},
+        {"description": "Taxi", "amount": 5, "excluded_members": [str(a.id)]},
+        {"amount": 5},
+        {"description": "Other", "amount": 5, "paid_by": outsider.id},
+        {"description": "Odd", "amount": 5, "currency": "XYZ"},
+        {"description": "Off", "amount": 5, "split": {"method": "percent", "percentages": {a.id: 50}}},
+    ):
+        resp = client.post('/api/shared/expenses/batch', json={
+            **base, "expenses": [{"description": "Ok", "amount": 1}, bad]
+        })
+        assert resp.status_code == 400, bad
+    assert client.post('/api/shared/expenses/batch', json={**base, "expenses": []}).status_code == 400
+    assert SharedExpense.query.count() == 0
+    assert reminders == []
+
+
+def test_batch_without_split_rows(client, group, reminders):
+    group, (a, _, _) = group
+    resp = client.post('/api/shared/expenses/batch', json={
+        "group_id": group.id, "paid_by": a.id, "expenses": [{"description": "Rounding", "amount": 0.001}]
+    })
+    assert resp.status_code == 201
+    assert SharedExpense.query.count() == 1 and Split.query.count() == 0
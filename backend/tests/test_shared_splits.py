@@ -0,0 +1,84 @@
+def setup_group(client):
+    for name in ("ana", "ben", "cleo"):
+        client.post("/api/auth/register", json={"username": name, "email": f"{name}@example.com", "password": "pw"})
+    client.post("/api/auth/login", json={"username": "ana", "password": "pw"})
+    resp = client.post("/api/shared/groups", json={"name": "Trip", "members": [2, 3]})
+    return resp.get_json()["group_id"]
+
+def test_equal_split_includes_payer_share(client):
+    gid = setup_group(client)
+    resp = client.post("/api/shared/expense", json={
+        "description": "Dinner", "amount": 100, "group_id": gid, "paid_by": 1
+    })
+    assert resp.status_code == 201
+    assert resp.get_json()["splits"] == {"1": 33.34, "2": 33.33, "3": 33.33}
+
+    balances = client.get(f"/api/shared/group/{gid}/balances").get_json()["net_balances"]
+    assert balances == {"1": 66.66, "2": -33.33, "3": -33.33}
+
+def test_structured_split_and_validation(client):
+    gid = setup_group(client)
+    resp = client.post("/api/shared/expense", json={
+        "description": "Cabin", "amount": 90, "group_id": gid, "paid_by": 2,
+        "split": {"method": "shares", "shares": {"1": 1, "2": 1, "3": 4}}
+    })
+    assert resp.get_json()["splits"] == {"1": 15.0, "2": 15.0, "3": 60.0}
+
+    resp = client.post("/api/shared/expense", json={
+        "description": "Bad", "amount": 90, "group_id": gid, "paid_by": 2,
+        "split": {"method": "percent", "percentages": {"1": 10}}
+    })
+    assert resp.status_code == 400
+
+def test_bulk_import_splits_every_transaction(client):
+    gid = setup_group(client)
+    resp = client.post("/api/shared/expense/import-mock", json={
+        "group_id": gid, "paid_by": 1,
+        "transactions": [{"description": "Gas", "amount": 10}, {"description": "Tolls", "amount": 5}]
+    })
+    assert resp.get_json()["imported"] == ["Gas", "Tolls"]
+    balances = client.get(f"/api/shared/group/{gid}/balances").get_json()["net_balances"]
+    # Leftover cents go to the earliest member: 3.34+1.67 for ana, 3.33+1.67 and 3.33+1.66 for the others
+    assert balances == {"1": 9.99, "2": -5.0, "3": -4.99}
+
+def test_no_context_never_calls_the_model(client, monkeypatch):
+    gid = setup_group(client)
+
+    def boom(*args, **kwargs):
+        raise AssertionError("model should not be called")
+    monkeypatch.setattr("backend.routes.shared_routes.split_expense_with_context", boom)
+
+    resp = client.post("/api/shared/expense", json={
+        "description": "Taxi", "amount": 30, "group_id": gid, "paid_by": 1, "context": "  "
+    })
+    assert resp.get_json()["split_source"] == "local"
+
+def test_context_answer_is_used_or_falls_back(client, monkeypatch):
+    gid = setup_group(client)
+    answers = iter([{"ana": 50, "ben": 25, "cleo": 25}, {"raw": "not json"}, None])
+    monkeypatch.setattr(
+        "backend.routes.shared_routes.split_expense_with_context",
+        lambda *args, **kwargs: next(answers)
+    )
+
+    body = {"description": "Hotel", "amount": 100, "group_id": gid, "paid_by": 1,
+            "context": "Ana had the big room so she pays half"}
+    data = client.post("/api/shared/expense", json=body).get_json()
+    assert data["split_source"] == "context"
+    assert data["splits"] == {"1": 50.0, "2": 25.0, "3": 25.0}
+
+    data = client.post("/api/shared/expense", json=body).get_json()
+    assert data["split_source"] == "fallback"
+    assert data["splits"] == {"1": 33.34, "2": 33.33, "3": 33.33}
+
+    # No answer at all (timeout, open circuit, no model) is a fallback too
+    data = client.post("/api/shared/expense", json=body).get_json()
+    assert data["split_source"] == "fallback"
+
+def test_null_context_splits_locally(client):
+    gid = setup_group(client)
+    resp = client.post("/api/shared/expense", json={
+        "description": "Taxi", "amount": 30, "group_id": gid, "paid_by": 1, "context": None
+    })
+    assert resp.status_code == 201
+    assert resp.get_json()["split_source"] == "local"
@@ -1,5 +1,12 @@
 from collections import namedtuple
-from backend.utils.split_logic import filter_members, calculate_balances_from_splits, minimize_cash_flow
+
+import numpy as np
+import pytest
+
+from backend.utils.split_logic import (
+    filter_members, calculate_balances_from_splits, minimize_cash_flow,
+    allocate_cents, split_expense, split_expenses, SplitError
+)
 
 Dummy = namedtuple("Dummy", ["user_id", "amount_owed"])
 
@@ -18,3 +25,49 @@ def test_minimize_cash_flow_simple():
     # Should settle 1→3 $10 and 1→2 $5 (order may vary)
     assert {"from": 1, "to": 3, "amount": 10} in txns
     assert {"from": 1, "to": 2, "amount": 5} in txns
+
+def test_allocate_cents_largest_remainder():
+    cents = allocate_cents(np.array([100, 1000, -100]), np.ones((3, 3)))
+    assert cents.tolist() == [[34, 33, 33], [334, 333, 333], [-34, -33, -33]]
+    assert (cents.sum(axis=1) == [100, 1000, -100]).all()
+
+def test_split_methods():
+    assert split_expense(10, [1, 2, 3], {"method": "shares", "shares": {"1": 2, "2": 1}}) == {1: 6.67, 2: 3.33}
+    assert split_expense(10, [1, 2], {"method": "percent", "percentages": {"1": 70, "2": 30}}) == {1: 7.0, 2: 3.0}
+    assert split_expense(10, [1, 2], {"method": "exact", "amounts": {"1": 2.5, "2": 7.5}}) == {1: 2.5, 2: 7.5}
+    # 10 of tax/tip spread by item subtotal: 1 ate 60, 2 and 3 shared 40
+    itemized = {"method": "itemized", "items": [
+        {"amount": 60, "participants": [1]},
+        {"amount": 40, "participants": [2, 3]},
+    ]}
+    assert split_expense(110, [1, 2, 3], itemized) == {1: 66.0, 2: 22.0, 3: 22.0}
+
+def test_split_spec_errors():
+    with pytest.raises(SplitError):
+        split_expense(10, [1, 2], {"method": "percent", "percentages": {"1": 70}})
+    with pytest.raises(SplitError):
+        split_expense(10, [1, 2], {"method": "exact", "amounts": {"1": 2, "9": 8}})
+    with pytest.raises(SplitError):
+        split_expense(10, [1, 2], {"method": "coin-flip"})
+
+def test_split_expenses_many_at_once():
+    amounts = np.round(np.random.default_rng(0).uniform(0, 500, 5000), 2)
+    cents = split_expenses(amounts, [1, 2, 3, 4, 5, 6, 7])
+    assert cents.shape == (5000, 7)
+    assert (cents.sum(axis=1) == np.rint(amounts * 100)).all()
+    assert (cents.max(axis=1) - cents.min(axis=1) <= 1).all()
+
+def test_model_split_falls_back_to_equal_on_timeout(app, monkeypatch):
+    import time
+    from backend.utils import gemini_utils
+
+    class SlowModel:
+        def generate_content(self, prompt):
+            time.sleep(0.5)
+            raise AssertionError("answer should have been abandoned")
+
+    monkeypatch.setattr(gemini_utils, "_MODEL", SlowModel())
+    start = time.perf_counter()
+    result = gemini_utils.split_expense_with_context("Pizza", 30, ["ana", "ben"], "ben pays double", timeout=0.05)
+    assert time.perf_counter() - start < 0.4
+    assert result is None  # the caller applies the equal split
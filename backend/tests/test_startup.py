@@ -0,0 +1,14 @@
+import os
+
+from backend.benchmarks.bench_startup import HEAVY_MODULES, measure_startup
+
+# Cold-start budget for `import backend.app; create_app()` in a fresh interpreter
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "1200"))
+
+
+def test_cold_start_stays_lazy_and_within_budget():
+    runs = [measure_startup() for _ in range(3)]
+
+    assert runs[0]["heavy"] == [], f"imported at startup: {runs[0]['heavy']} (expected lazily: {HEAVY_MODULES})"
+    best = min(r["ms"] for r in runs)
+    assert best < STARTUP_BUDGET_MS, f"cold start took {best:.0f} ms (budget {STARTUP_BUDGET_MS:.0f} ms)"
@@ -0,0 +1,46 @@
+import gzip
+import os
+import re
+
+from flask import url_for
+
+
+def _static_bytes(app, filename):
+    with open(os.path.join(app.static_folder, filename), 'rb') as fh:
+        return fh.read()
+
+
+def test_url_for_static_returns_hashed_url(app):
+    with app.test_request_context():
+        url = url_for('static', filename='css/main.css')
+    assert re.fullmatch(r'/static/css/main\.[0-9a-f]{12}\.css', url)
+
+
+def test_hashed_asset_is_precompressed_and_immutable(app, client):
+    with app.test_request_context():
+        url = url_for('static', filename='js/groups.js')
+
+    resp = client.get(url, headers={'Accept-Encoding': 'gzip'})
+    assert resp.status_code == 200
+    assert resp.headers['Content-Encoding'] == 'gzip'
+    assert 'immutable' in resp.headers['Cache-Control']
+    assert 'Accept-Encoding' in resp.headers['Vary']
+    assert gzip.decompress(resp.data) == _static_bytes(app, 'js/groups.js')
+
+    plain = client.get(url)
+    assert 'Content-Encoding' not in plain.headers
+    assert plain.data == _static_bytes(app, 'js/groups.js')
+
+    assert resp.headers['ETag'] != plain.headers['ETag']
+    again = client.get(url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': resp.headers['ETag']})
+    assert again.status_code == 304
+    assert client.get(url, headers={'If-None-Match': resp.headers['ETag']}).status_code == 200
+    assert client.get(url, headers={'If-None-Match': plain.headers['ETag']}).status_code == 304
+
+
+def test_unhashed_paths_still_served(app, client):
+    resp = client.get('/static/css/main.css')
+    assert resp.status_code == 200
+    assert resp.data == _static_bytes(app, 'css/main.css')
+    assert 'immutable' not in resp.headers.get('Cache-Control', '')
+    resp.close()
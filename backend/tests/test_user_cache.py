@@ -0,0 +1,63 @@
+import re
+
+from sqlalchemy import event
+
+from backend.extensions import db
+from backend.models.user import User
+from backend.utils.user_cache import load_user
+
+
+def login(client, username="ana"):
+    client.post('/api/auth/register', json={"username": username, "email": f"{username}@example.com", "password": "pw"})
+    client.post('/api/auth/login', json={"username": username, "password": "pw"})
+
+
+def count_user_selects(app):
+    seen = []
+
+    def before(conn, cursor, statement, params, context, executemany):
+        if statement.lstrip().startswith("SELECT") and re.search(r'\bFROM "?user"?\s', statement):
+            seen.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before)
+    return seen
+
+
+def test_authenticated_requests_skip_the_user_query(app, client):
+    login(client)
+    client.get('/api/shared/groups')  # first request fills the cache
+
+    # Requests here share the fixture's app context; start each from an empty session like in production
+    selects = count_user_selects(app)
+    for path in ('/api/shared/groups', '/api/personal/budgets'):
+        db.session.remove()
+        assert client.get(path).status_code == 200
+    assert selects == []
+
+
+def test_profile_change_invalidates_cached_user(app, client):
+    login(client)
+    assert b"ana" in client.get('/dashboard').data
+
+    user = User.query.filter_by(username="ana").one()
+    user.username = "ana-maria"
+    db.session.commit()
+    db.session.remove()
+
+    assert b"ana-maria" in client.get('/dashboard').data
+
+
+def test_cached_user_values_are_not_shared(app, client):
+    login(client)
+    user = User.query.filter_by(username="ana").one()
+    user.google_calendar_token = {"token": "t1", "scopes": ["calendar"]}
+    db.session.commit()
+    user_id = user.id
+    db.session.remove()
+
+    load_user(user_id)  # fills the cache
+    db.session.remove()
+    load_user(user_id).google_calendar_token["scopes"].append("leaked")
+    db.session.remove()
+
+    assert load_user(user_id).google_calendar_token == {"token": "t1", "scopes": ["calendar"]}
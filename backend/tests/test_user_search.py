@@ -0,0 +1,74 @@
+from sqlalchemy import event, func, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+from backend.extensions import db
+from backend.models.user import User
+from backend.utils.user_search import prefix_bounds, search_key
+
+
+def login(client, username="zed"):
+    client.post('/api/auth/register', json={"username": username, "email": f"{username}@example.com", "password": "pw"})
+    client.post('/api/auth/login', json={"username": username, "password": "pw"})
+
+
+def add_users():
+    db.session.add_all([
+        User(username="Ana", email="ana@example.com", password_hash="x"),
+        User(username="andres", email="a.r@example.com", password_hash="x"),
+        User(username="bea", email="ANDREA@example.com", password_hash="x"),
+        User(username="carl", email="carl@example.com", password_hash="x"),
+    ])
+    db.session.commit()
+
+
+def test_prefix_search_over_username_and_email(client):
+    add_users()
+    assert client.get('/api/shared/users/search?q=an').status_code == 401
+
+    login(client)
+    found = client.get('/api/shared/users/search?q=AN').get_json()
+    assert [u["username"] for u in found] == ["Ana", "andres", "bea"]
+    assert set(found[0]) == {"id", "username"}
+
+    limited = client.get('/api/shared/users/search?q=an&limit=2').get_json()
+    assert [u["username"] for u in limited] == ["Ana", "andres"]
+    assert client.get('/api/shared/users/search?q=%20').get_json() == []
+
+
+def test_search_uses_the_lowercase_index_and_caches_hot_prefixes(app, client):
+    add_users()
+    login(client)
+
+    low, high = prefix_bounds("an")
+    key = func.lower(User.username)
+    stmt = select(User.id).where(key >= low, key < high).order_by(key).limit(10)
+    compiled = stmt.compile(db.engine, compile_kwargs={"literal_binds": True})
+    plan = db.session.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).all()
+    assert any("ix_user_username_lower" in row[-1] for row in plan)
+
+    client.get('/api/shared/users/search?q=car')
+    selects = []
+    event.listen(db.engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: selects.append(statement) if "lower(" in statement else None)
+    assert [u["username"] for u in client.get('/api/shared/users/search?q=car').get_json()] == ["carl"]
+    assert selects == []
+
+
+def test_postgres_compares_in_code_point_order(app):
+    dialect = postgresql.dialect()
+    key = search_key(User.username, 'postgresql')
+    assert str(select(User.id).where(key >= "an").compile(dialect=dialect)).count('COLLATE "C"') == 1
+    assert str(search_key(User.username, 'sqlite').compile()) == "lower(\"user\".username)"
+
+    ddl = [str(CreateIndex(ix).compile(dialect=dialect)) for ix in User.__table__.indexes if ix.name.endswith('_lower_c')]
+    assert len(ddl) == 2 and all('COLLATE "C"' in stmt for stmt in ddl)
+    created = set(db.session.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'")).scalars())
+    assert {'ix_user_username_lower', 'ix_user_email_lower'} <= created
+    assert not any(name.endswith('_lower_c') for name in created)
+
+
+def test_full_user_dump_is_gone(client):
+    add_users()
+    login(client)
+    assert client.get('/api/shared/users').status_code == 404
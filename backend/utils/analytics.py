@@ -0,0 +1,217 @@
+# backend/utils/analytics.py
+
+import gc
+import re
+from contextlib import contextmanager
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from sqlalchemy import String, select, type_coerce
+
+from backend.extensions import db
+from backend.models.personal import PersonalExpense
+from backend.utils.fx import to_currency
+
+_NOISE = re.compile(r"[^a-z ]+")
+_STOPWORDS = {"the", "inc", "llc", "co", "com", "www", "payment", "purchase", "pos", "debit"}
+# Words that describe the charge rather than the merchant ("Spotify Premium", "Starbucks Coffee #12")
+_DESCRIPTORS = {
+    "subscription", "membership", "premium", "plan", "monthly", "annual", "renewal",
+    "bill", "online", "store", "shop", "coffee",
+}
+MERCHANT_KEY_WORDS = 2
+
+
+def description_tokens(description: str) -> List[str]:
+    """
+    Lower-cased words of a description with digits, punctuation and
+    single letters dropped: "NETFLIX.COM 8842" → ["netflix", "com"].
+    """
+    text = _NOISE.sub(" ", description.lower().replace("'", ""))
+    return [w for w in text.split() if len(w) > 1]
+
+
+def normalize_merchant(description: str) -> str:
+    """
+    Reduce a free-text transaction description to a stable merchant key.
+
+    "Netflix Subscription" and "NETFLIX.COM 8842" both become "netflix",
+    while "Uber Eats" and "Uber Ride" stay apart. The first
+    MERCHANT_KEY_WORDS significant words are kept; filler words and words
+    describing the charge rather than the merchant are dropped.
+    """
+    words = [w for w in description_tokens(description) if w not in _STOPWORDS and w not in _DESCRIPTORS]
+    key = " ".join(words[:MERCHANT_KEY_WORDS]) if words else description.strip().lower()
+    return key[:100]
+
+
+@contextmanager
+def _gc_paused():
+    """
+    Suspend the cyclic GC while materializing a large result set.
+    Building ~100k row tuples otherwise triggers repeated full collections.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def _factorize(values) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Map each value to a dense integer code (first-seen order).
+    Hashing is much cheaper than the string sort `np.unique` would do.
+
+    Returns:
+      (uniques as an object array, int64 code per value)
+    """
+    index: Dict[str, int] = {}
+    codes = np.fromiter((index.setdefault(v, len(index)) for v in values), dtype=np.int64, count=len(values))
+    return np.array(list(index), dtype=object), codes
+
+
+def load_expense_columns(user_id: int) -> Dict[str, np.ndarray]:
+    """
+    Pull a user's whole expense history in one projection query.
+
+    The date is read as its stored text so SQLite rows skip per-row datetime
+    parsing; NumPy parses the whole column at once instead. Amounts in other
+    currencies are converted to BASE_CURRENCY at each day's rate.
+
+    Returns:
+      {"amount": float64[], "day": datetime64[D][], "category": object[], "description": object[]}
+    """
+    with _gc_paused():
+        # Core execution on the session's connection: no ORM row wrapping
+        rows = db.session.connection().execute(
+            select(
+                PersonalExpense.amount,
+                PersonalExpense.currency,
+                type_coerce(PersonalExpense.transaction_date, String),
+                PersonalExpense.category,
+                PersonalExpense.description,
+            ).where(PersonalExpense.user_id == user_id)
+        ).all()
+        if not rows:
+            return {
+                "amount": np.empty(0, dtype=np.float64),
+                "day": np.empty(0, dtype="datetime64[D]"),
+                "category": np.empty(0, dtype=object),
+                "description": np.empty(0, dtype=object),
+            }
+        amounts, currencies, stamps, categories, descriptions = zip(*rows)
+
+    days = np.array(stamps, dtype="datetime64[us]").astype("datetime64[D]")
+    return {
+        "amount": to_currency(np.fromiter(amounts, dtype=np.float64, count=len(amounts)), currencies, days),
+        "day": days,
+        "category": np.array(categories, dtype=object),
+        "description": np.array(descriptions, dtype=object),
+    }
+
+
+def _totals_by_period(periods: np.ndarray, cat_codes: np.ndarray, amounts: np.ndarray, n_cats: int):
+    """
+    Sum amounts into a dense (period × category) matrix covering every period
+    between the first and last one, so gaps show up as zero rows.
+    """
+    start = periods.min()
+    offsets = periods - start
+    n_periods = int(offsets.max()) + 1
+    flat = np.bincount(offsets * n_cats + cat_codes, weights=amounts, minlength=n_periods * n_cats)
+    return start, flat.reshape(n_periods, n_cats)
+
+
+def _rolling_mean(matrix: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over `window` rows (shorter at the start of the series)."""
+    csum = np.cumsum(matrix, axis=0)
+    shifted = np.zeros_like(csum)
+    shifted[window:] = csum[:-window]
+    counts = np.minimum(np.arange(1, matrix.shape[0] + 1), window)[:, None]
+    return (csum - shifted) / counts
+
+
+def _by_category(categories, matrix: np.ndarray) -> Dict[str, list]:
+    rounded = np.round(matrix, 2)
+    return {cat: rounded[:, i].tolist() for i, cat in enumerate(categories)}
+
+
+def compute_spending_analytics(
+    columns: Dict[str, np.ndarray],
+    rolling_window: int = 3,
+    top_n: int = 10
+) -> Dict[str, Any]:
+    """
+    Monthly/weekly totals per category, rolling averages, month-over-month
+    deltas and top merchants, computed with vectorized group-bys.
+
+    Args:
+      columns: Output of `load_expense_columns`.
+      rolling_window: Months in the trailing average.
+      top_n: How many merchants to return.
+
+    Returns:
+      A JSON-ready dict with "categories", "monthly", "weekly" and "top_merchants".
+    """
+    amounts = columns["amount"]
+    if amounts.size == 0:
+        return {
+            "categories": [],
+            "monthly": {"months": [], "totals": {}, "rolling_avg": {}, "mom_delta": {}},
+            "weekly": {"weeks": [], "totals": {}},
+            "top_merchants": [],
+        }
+
+    categories, cat_codes = _factorize(columns["category"])
+    order = np.argsort(categories.astype(str))
+    categories, cat_codes = categories[order], np.argsort(order)[cat_codes]
+    n_cats = len(categories)
+    days = columns["day"]
+
+    # Monthly totals, rolling mean and month-over-month change
+    months = days.astype("datetime64[M]").astype(np.int64)
+    m_start, monthly = _totals_by_period(months, cat_codes, amounts, n_cats)
+    month_labels = np.arange(m_start, m_start + monthly.shape[0]).astype("datetime64[M]").astype(str)
+    rolling = _rolling_mean(monthly, max(1, rolling_window))
+    deltas = np.diff(monthly, axis=0)
+
+    # Weekly totals, weeks starting on Monday (1970-01-01 was a Thursday)
+    weeks = (days.astype(np.int64) + 3) // 7
+    w_start, weekly = _totals_by_period(weeks, cat_codes, amounts, n_cats)
+    week_labels = (np.arange(w_start, w_start + weekly.shape[0]) * 7 - 3).astype("datetime64[D]").astype(str)
+
+    # Top merchants: normalize each distinct description once, then group by key
+    uniq_desc, desc_codes = _factorize(columns["description"])
+    merchants, merchant_of_desc = _factorize([normalize_merchant(d) for d in uniq_desc])
+    merchant_codes = merchant_of_desc[desc_codes]
+    m_totals = np.bincount(merchant_codes, weights=amounts, minlength=len(merchants))
+    m_counts = np.bincount(merchant_codes, minlength=len(merchants))
+    top = np.argsort(-m_totals, kind="stable")[:top_n]
+
+    return {
+        "categories": categories.tolist(),
+        "monthly": {
+            "months": month_labels.tolist(),
+            "totals": _by_category(categories, monthly),
+            "rolling_avg": _by_category(categories, rolling),
+            "mom_delta": {
+                cat: [None] + vals
+                for cat, vals in _by_category(categories, deltas).items()
+            },
+        },
+        "weekly": {
+            "weeks": week_labels.tolist(),
+            "totals": _by_category(categories, weekly),
+        },
+        "top_merchants": [
+            {
+                "merchant": merchants[i],
+                "total": round(float(m_totals[i]), 2),
+                "count": int(m_counts[i]),
+            }
+            for i in top
+        ],
+    }
@@ -0,0 +1,179 @@
+# backend/utils/budget_rollups.py
+
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from backend.extensions import db
+from backend.models.personal import BudgetCategory, MonthlyCategorySpend, PersonalExpense
+from backend.utils.fx import base_currency, to_currency
+
+# (user_id, category, month) → (total delta, count delta); totals are in BASE_CURRENCY
+RollupKey = Tuple[int, str, date]
+
+
+def month_start(when: datetime | date) -> date:
+    """Return the first day of the month `when` falls in."""
+    return date(when.year, when.month, 1)
+
+
+def _aggregate(
+    expenses: Iterable[PersonalExpense],
+    sign: int
+) -> Dict[RollupKey, Tuple[float, int]]:
+    expenses = list(expenses)
+    amounts = to_currency(
+        [e.amount for e in expenses], [e.currency for e in expenses], [e.transaction_date for e in expenses]
+    )
+    deltas: Dict[RollupKey, Tuple[float, int]] = {}
+    for e, amount in zip(expenses, amounts.tolist()):
+        key = (e.user_id, e.category, month_start(e.transaction_date))
+        total, count = deltas.get(key, (0.0, 0))
+        deltas[key] = (total + sign * amount, count + sign)
+    return deltas
+
+
+def _upsert(key: RollupKey, total: float, count: int) -> None:
+    """
+    Add (total, count) to one rollup row, creating it if needed.
+    Uses a native upsert on SQLite/Postgres so concurrent writers never lose updates.
+    """
+    user_id, category, month = key
+    dialect = db.session.get_bind(mapper=MonthlyCategorySpend).dialect.name
+    values = dict(user_id=user_id, category=category, month=month, total=total, count=count)
+
+    if dialect in ('sqlite', 'postgresql'):
+        insert = sqlite_insert if dialect == 'sqlite' else pg_insert
+        stmt = insert(MonthlyCategorySpend).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['user_id', 'category', 'month'],
+            set_={
+                'total': MonthlyCategorySpend.total + stmt.excluded.total,
+                'count': MonthlyCategorySpend.count + stmt.excluded.count,
+            }
+        )
+        db.session.execute(stmt)
+        return
+
+    res = db.session.execute(
+        update(MonthlyCategorySpend)
+        .where(
+            MonthlyCategorySpend.user_id == user_id,
+            MonthlyCategorySpend.category == category,
+            MonthlyCategorySpend.month == month,
+        )
+        .values(
+            total=MonthlyCategorySpend.total + total,
+            count=MonthlyCategorySpend.count + count,
+        )
+    )
+    if res.rowcount == 0:
+        db.session.add(MonthlyCategorySpend(**values))
+
+
+def record_expenses(expenses: Iterable[PersonalExpense]) -> None:
+    """
+    Add a batch of new expenses to the monthly rollups.
+    Expenses sharing a (user, category, month) bucket cost a single upsert.
+    Runs inside the caller's transaction; the caller commits.
+    """
+    for key, (total, count) in _aggregate(expenses, 1).items():
+        _upsert(key, total, count)
+
+
+def remove_expenses(expenses: Iterable[PersonalExpense]) -> None:
+    """Subtract a batch of deleted expenses from the monthly rollups."""
+    for key, (total, count) in _aggregate(expenses, -1).items():
+        _upsert(key, total, count)
+
+
+def get_category_spending(user_id: int, month: Optional[date] = None) -> Dict[str, float]:
+    """
+    Spend per category for one month (defaults to the current one).
+
+    Returns:
+      A dict mapping category → total spent.
+    """
+    month = month or month_start(datetime.utcnow())
+    rows = (
+        MonthlyCategorySpend.query
+        .filter_by(user_id=user_id, month=month)
+        .filter(MonthlyCategorySpend.count > 0)
+        .all()
+    )
+    return {r.category: round(r.total, 2) for r in rows}
+
+
+def get_budget_status(user_id: int, month: Optional[date] = None) -> List[dict]:
+    """
+    Compare each of the user's budget categories against this month's rollup.
+
+    Returns:
+      A list of {"category", "monthly_limit", "spent", "remaining", "over_budget"}.
+    """
+    spending = get_category_spending(user_id, month)
+    budgets = BudgetCategory.query.filter_by(user_id=user_id).all()
+
+    status = []
+    for b in budgets:
+        spent = spending.get(b.name, 0.0)
+        status.append({
+            "category": b.name,
+            "monthly_limit": b.monthly_limit,
+            "spent": spent,
+            "remaining": round(b.monthly_limit - spent, 2),
+            "over_budget": spent > b.monthly_limit,
+        })
+    return status
+
+
+def foreign_currency_users() -> List[int]:
+    """Ids of the users with a personal expense in another currency than BASE_CURRENCY."""
+    return db.session.execute(
+        db.select(PersonalExpense.user_id).distinct()
+        .where(PersonalExpense.currency.isnot(None), PersonalExpense.currency != base_currency())
+    ).scalars().all()
+
+
+def backfill_rollups(user_id: Optional[int] = None, batch_size: int = 5000) -> int:
+    """
+    Rebuild the rollups from `personal_expenses`, for one user or everyone.
+
+    Rows are streamed in batches so memory stays proportional to the number
+    of (user, category, month) buckets rather than the number of expenses;
+    each batch is converted to BASE_CURRENCY in one vectorized pass.
+
+    Returns:
+      The number of rollup rows written.
+    """
+    clear = MonthlyCategorySpend.query
+    source = db.select(
+        PersonalExpense.user_id,
+        PersonalExpense.category,
+        PersonalExpense.transaction_date,
+        PersonalExpense.amount,
+        PersonalExpense.currency,
+    )
+    if user_id is not None:
+        clear = clear.filter_by(user_id=user_id)
+        source = source.where(PersonalExpense.user_id == user_id)
+    clear.delete(synchronize_session=False)
+
+    buckets: Dict[RollupKey, List[float]] = {}
+    result = db.session.execute(source.execution_options(yield_per=batch_size))
+    for rows in result.partitions():
+        amounts = to_currency([r.amount for r in rows], [r.currency for r in rows], [r.transaction_date for r in rows])
+        for (uid, category, when, _, _), amount in zip(rows, amounts.tolist()):
+            acc = buckets.setdefault((uid, category, month_start(when)), [0.0, 0])
+            acc[0] += amount
+            acc[1] += 1
+
+    db.session.add_all(
+        MonthlyCategorySpend(user_id=uid, category=cat, month=month, total=total, count=count)
+        for (uid, cat, month), (total, count) in buckets.items()
+    )
+    db.session.commit()
+    return len(buckets)
@@ -0,0 +1,215 @@
+# backend/utils/fx.py
+
+import csv
+import re
+from datetime import date, datetime
+from itertools import groupby
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from flask import current_app, g
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from backend.extensions import db
+from backend.models.fx import FxRate
+from backend.models.shared import BalanceCheckpoint, Group
+from backend.utils.caching import TTLCache
+
+_CODE = re.compile(r'^[A-Z]{3}$')
+
+
+class UnknownCurrency(ValueError):
+    """A currency code that is malformed or has no rates in the FX table."""
+
+
+def base_currency() -> str:
+    return current_app.config['BASE_CURRENCY']
+
+
+class FxTable:
+    """
+    In-memory copy of `fx_rates`: per currency, its rate days (sorted) and
+    rates as NumPy arrays. Rates are units of the currency per one unit of
+    the base currency; the base itself is always 1.
+    """
+
+    def __init__(self, base: str, series: Dict[str, Tuple[np.ndarray, np.ndarray]]):
+        self.base = base
+        self.series = series
+
+    def knows(self, currency: str) -> bool:
+        return currency == self.base or currency in self.series
+
+    def rates(self, currencies, days) -> np.ndarray:
+        """
+        Rate of each currency on each day, vectorized: one `searchsorted`
+        per distinct currency picks the latest rate on or before the day
+        (the earliest known rate for older days).
+
+        Args:
+          currencies: Currency code per row (None = base).
+          days: datetime64[D] per row.
+        """
+        codes = np.array([c or self.base for c in currencies], dtype=object)
+        days = np.asarray(days, dtype='datetime64[D]')
+        out = np.ones(len(codes), dtype=np.float64)
+        for currency in set(codes.tolist()) - {self.base}:
+            if currency not in self.series:
+                raise UnknownCurrency(f"No exchange rates for {currency}")
+            mask = codes == currency
+            series_days, series_rates = self.series[currency]
+            idx = np.searchsorted(series_days, days[mask], side='right') - 1
+            out[mask] = series_rates[np.clip(idx, 0, None)]
+        return out
+
+    def factors(self, currencies, days, to: Optional[str] = None) -> np.ndarray:
+        """Multipliers taking an amount in each row's currency to `to` (default: base) on that day."""
+        factor = 1.0 / self.rates(currencies, days)
+        if to and to != self.base:
+            factor *= self.rates([to] * len(factor), days)
+        return factor
+
+
+def _load_table() -> FxTable:
+    rows = db.session.execute(
+        select(FxRate.currency, FxRate.day, FxRate.rate).order_by(FxRate.currency, FxRate.day)
+    ).all()
+    series = {}
+    for currency, group in groupby(rows, key=lambda r: r.currency):
+        group = list(group)
+        series[currency] = (
+            np.array([r.day for r in group], dtype='datetime64[D]'),
+            np.fromiter((r.rate for r in group), dtype=np.float64, count=len(group)),
+        )
+    return FxTable(base_currency(), series)
+
+
+def _cache() -> TTLCache:
+    cache = current_app.extensions.get('fx_table')
+    if cache is None:
+        cache = current_app.extensions['fx_table'] = TTLCache(2, current_app.config['FX_CACHE_TTL_SECONDS'])
+    return cache
+
+
+def fx_revision() -> str:
+    """
+    Identifies the rates in the database: the newest `loaded_at`, so a load
+    by any process changes it. Fixed for the length of a request (or CLI
+    run) and read from the database at most every FX_REVISION_TTL_SECONDS
+    per process, so revalidating an overview costs no extra query. Loads
+    in this process take effect at once.
+    """
+    if 'fx_revision' not in g:
+        revision = _cache().get('revision')
+        if revision is None:
+            loaded = db.session.execute(select(func.max(FxRate.loaded_at))).scalar()
+            revision = loaded.strftime('%Y%m%d%H%M%S%f') if loaded else '0'
+            _cache().set('revision', revision, ttl=current_app.config['FX_REVISION_TTL_SECONDS'])
+        g.fx_revision = revision
+    return g.fx_revision
+
+
+def fx_table() -> FxTable:
+    """
+    The rate table, cached per process and read again from the database
+    when the revision changes or FX_CACHE_TTL_SECONDS pass.
+    """
+    revision = fx_revision()
+    cached = _cache().get('table')
+    if cached is None or cached[0] != revision:
+        cached = (revision, _load_table())
+        _cache().set('table', cached)
+    return cached[1]
+
+
+def normalize_currency(value: Optional[str], default: Optional[str] = None) -> Optional[str]:
+    """
+    Upper-cased ISO code, or `default` when `value` is empty.
+    Raises UnknownCurrency unless it is the base currency or has rates.
+    """
+    if value is None or not str(value).strip():
+        return default
+    code = str(value).strip().upper()
+    if not _CODE.match(code) or not fx_table().knows(code):
+        raise UnknownCurrency(f"Unsupported currency {value!r}")
+    return code
+
+
+def needs_conversion(currencies: Iterable[Optional[str]], target: str) -> bool:
+    """Whether any row is in a currency other than `target` (None counts as `target`)."""
+    return any(c is not None and c != target for c in currencies)
+
+
+def to_currency(amounts, currencies, days, to: Optional[str] = None) -> np.ndarray:
+    """
+    Convert amounts, each in its row's currency (None = base), to `to`
+    (default: base) at the rate of each row's day.
+
+    Args:
+      amounts: Amount per row.
+      currencies: Currency code per row.
+      days: Date (or datetime64) per row.
+    """
+    amounts = np.asarray(amounts, dtype=np.float64)
+    currencies = list(currencies)
+    base = base_currency()
+    if (to or base) == base and not needs_conversion(currencies, base):
+        return amounts
+    days = np.array(days, dtype='datetime64[D]')
+    return amounts * fx_table().factors(currencies, days, to=to)
+
+
+def load_rates(path: str) -> int:
+    """
+    Upsert daily rates from a CSV file with a `date,currency,rate` header
+    (rate = units of currency per one unit of BASE_CURRENCY).
+
+    Groups with expenses in another currency than their own get their
+    balance checkpoints dropped and their version bumped, since their
+    converted balances may change. Users with personal expenses in another
+    currency than the base get their budget rollups rebuilt at the new rates.
+
+    Returns:
+      The number of rates read.
+    """
+    # group_ledger and budget_rollups convert amounts with this module
+    from backend.utils.budget_rollups import backfill_rollups, foreign_currency_users
+    from backend.utils.group_ledger import foreign_currency_groups
+
+    now = datetime.utcnow()
+    with open(path, newline='') as fh:
+        rows = [{
+            "day": date.fromisoformat(r["date"].strip()),
+            "currency": r["currency"].strip().upper(),
+            "rate": float(r["rate"]),
+            "loaded_at": now,
+        } for r in csv.DictReader(fh)]
+    if not rows:
+        return 0
+
+    dialect = db.session.get_bind(mapper=FxRate).dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        insert = sqlite_insert if dialect == 'sqlite' else pg_insert
+        stmt = insert(FxRate)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['currency', 'day'],
+            set_={'rate': stmt.excluded.rate, 'loaded_at': stmt.excluded.loaded_at}
+        )
+        db.session.execute(stmt, rows)
+    else:
+        for row in rows:
+            db.session.merge(FxRate(**row))
+
+    stale = foreign_currency_groups()
+    if stale:
+        db.session.execute(delete(BalanceCheckpoint).where(BalanceCheckpoint.group_id.in_(stale)))
+        db.session.execute(update(Group).where(Group.id.in_(stale)).values(version=Group.version + 1))
+    db.session.commit()
+    g.pop('fx_revision', None)
+    _cache().clear()
+
+    for user_id in foreign_currency_users():
+        backfill_rollups(user_id)
+    return len(rows)
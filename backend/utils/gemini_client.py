@@ -0,0 +1,264 @@
+# backend/utils/gemini_client.py
+
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from types import SimpleNamespace
+from typing import Any, Callable, Optional
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class GeminiUnavailable(Exception):
+    """The model could not answer; callers should use their local fallback."""
+
+
+class GeminiTimeout(GeminiUnavailable, TimeoutError):
+    """The call's deadline passed before the model answered."""
+
+
+class GeminiBusy(GeminiUnavailable):
+    """Every concurrency slot stayed taken until the deadline."""
+
+
+class CircuitOpen(GeminiUnavailable):
+    """Recent calls failed; the upstream is not being tried right now."""
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    # google.api_core errors carry an HTTP-ish `code`; 4xx other than 429 will fail the same way again
+    code = getattr(exc, "code", None)
+    if isinstance(code, int) and 400 <= code < 500 and code != 429:
+        return False
+    return not isinstance(exc, (ValueError, TypeError))
+
+
+class CircuitBreaker:
+    """
+    Classic three-state breaker.
+
+    `failure_threshold` consecutive failures open it; after `reset_timeout`
+    seconds one trial call is let through (half-open) and its outcome
+    closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic, on_transition=None):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._on_transition = on_transition
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def _move(self, state: str) -> None:
+        if state != self._state:
+            self._state = state
+            if self._on_transition:
+                self._on_transition(state)
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream now (claims the trial slot when half-open)."""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                self._move(HALF_OPEN)
+            if self._state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._trial_running = False
+            self._move(CLOSED)
+
+    def release_trial(self) -> None:
+        """Give back a half-open trial slot that never reached the upstream."""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+                self._move(OPEN)
+
+
+class GeminiClient:
+    """
+    Wraps `GenerativeModel.generate_content` with:
+
+      - a per-call deadline that covers queueing, every attempt and backoff,
+      - a cap on calls in flight upstream (abandoned calls keep their slot
+        until the model actually returns),
+      - retries with full-jitter exponential backoff for transient errors,
+      - a circuit breaker that fails fast while the upstream is unhealthy,
+      - counters for every outcome and breaker transition (`metrics()`).
+
+    Every failure surfaces as a `GeminiUnavailable` subclass.
+    """
+
+    def __init__(
+        self,
+        model_factory: Callable[[], Any],
+        timeout: float = 10.0,
+        max_concurrency: int = 8,
+        retries: int = 2,
+        backoff_base: float = 0.2,
+        backoff_max: float = 2.0,
+        breaker_threshold: int = 5,
+        breaker_reset: float = 30.0,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._model_factory = model_factory
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._sleep = sleep
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="gemini")
+        self._counts = Counter()
+        self._counts_lock = threading.Lock()
+        self._in_flight = 0
+        self.breaker = CircuitBreaker(
+            breaker_threshold, breaker_reset, clock=clock,
+            on_transition=lambda state: self._count(f"breaker_{state}")
+        )
+
+    @property
+    def available(self) -> bool:
+        return self._model_factory() is not None
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._counts_lock:
+            self._counts[key] += n
+
+    def metrics(self) -> dict:
+        with self._counts_lock:
+            counts = dict(self._counts)
+            in_flight = self._in_flight
+        return {"state": self.breaker.state, "in_flight": in_flight, **counts}
+
+    def _release(self, _future) -> None:
+        with self._counts_lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def _attempt(self, model, args, kwargs, deadline: float) -> str:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not self._slots.acquire(timeout=remaining):
+            self._count("rejected_busy")
+            raise GeminiBusy("All Gemini slots are busy")
+
+        with self._counts_lock:
+            self._in_flight += 1
+        future = self._executor.submit(lambda: model.generate_content(*args, **kwargs).text)
+        future.add_done_callback(self._release)
+        try:
+            return future.result(timeout=max(deadline - time.monotonic(), 0))
+        except FutureTimeout:
+            future.cancel()
+            raise GeminiTimeout("Gemini did not answer in time")
+
+    def generate(self, *args, timeout: Optional[float] = None, **kwargs) -> str:
+        """
+        Call `generate_content(*args, **kwargs)` and return the response text.
+
+        Raises:
+          GeminiUnavailable: no model, circuit open, no free slot, deadline
+          passed, or the last attempt failed.
+        """
+        model = self._model_factory()
+        if model is None:
+            raise GeminiUnavailable("No Gemini model configured")
+
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        self._count("calls")
+        for attempt in range(self.retries + 1):
+            if not self.breaker.allow():
+                self._count("rejected_open")
+                raise CircuitOpen("Gemini circuit is open")
+
+            start = time.monotonic()
+            try:
+                text = self._attempt(model, args, kwargs, deadline)
+            except GeminiBusy:
+                # Local saturation says nothing about upstream health
+                self.breaker.release_trial()
+                raise
+            except GeminiTimeout:
+                self._count("timeouts")
+                self.breaker.record_failure()
+                raise
+            except Exception as exc:
+                if not _is_retryable(exc):
+                    self._count("rejected_request")
+                    self.breaker.record_success()
+                    raise GeminiUnavailable(str(exc)) from exc
+                self._count("errors")
+                self.breaker.record_failure()
+                backoff = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                if attempt == self.retries or time.monotonic() + backoff >= deadline:
+                    raise GeminiUnavailable(str(exc)) from exc
+                self._count("retries")
+                self._sleep(backoff)
+                continue
+
+            self._count("successes")
+            self._count("latency_ms_total", int((time.monotonic() - start) * 1000))
+            self.breaker.record_success()
+            return text
+
+
+class FakeModel:
+    """
+    Local stand-in for `GenerativeModel` with injectable latency and errors,
+    for tests and load experiments.
+
+    Args:
+      text: Response text (or a callable taking the prompt).
+      latency: Seconds each call sleeps before answering.
+      errors: Exceptions to raise on the first calls, in order.
+      error_rate: Probability of raising `ConnectionError` once `errors` is used up.
+    """
+
+    def __init__(self, text: Any = "{}", latency: float = 0.0, errors=(), error_rate: float = 0.0, seed=None):
+        self.text = text
+        self.latency = latency
+        self.errors = list(errors)
+        self.error_rate = error_rate
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def generate_content(self, *args, **kwargs):
+        with self._lock:
+            self.calls += 1
+            error = self.errors.pop(0) if self.errors else None
+            if error is None and self._rng.random() < self.error_rate:
+                error = ConnectionError("injected upstream failure")
+        if self.latency:
+            time.sleep(self.latency)
+        if error is not None:
+            raise error
+        prompt = args[0] if args else kwargs.get("contents")
+        return SimpleNamespace(text=self.text(prompt) if callable(self.text) else self.text)
@@ -3,19 +3,66 @@
 import os
 import json
 import re
+import threading
 from dotenv import load_dotenv
-from google.generativeai import configure, GenerativeModel
+from flask import current_app
+
+from backend.utils.gemini_client import GeminiClient, GeminiUnavailable
 
 # Load API key from .env
 load_dotenv()
 _API_KEY = os.getenv("GEMINI_API_KEY")
 
-# Initialize Gemini
-if _API_KEY:
-    configure(api_key=_API_KEY)
-    _MODEL = GenerativeModel("gemini-2.5-flash")
-else:
-    _MODEL = None
+# The model is built on first use: importing google.generativeai costs more than the rest of startup
+_MODEL = None
+_MODEL_LOCK = threading.Lock()
+
+
+def _get_model():
+    """The shared GenerativeModel, created on first call (None without an API key)."""
+    global _MODEL
+    if _MODEL is None and _API_KEY:
+        with _MODEL_LOCK:
+            if _MODEL is None:
+                from google.generativeai import configure, GenerativeModel
+
+                # GEMINI_TRANSPORT=rest under the gevent server (backend/serve.py)
+                configure(api_key=_API_KEY, transport=os.getenv("GEMINI_TRANSPORT") or None)
+                _MODEL = GenerativeModel("gemini-2.5-flash")
+    return _MODEL
+
+
+def _client() -> GeminiClient:
+    """
+    The app's GeminiClient, built from its config on first use. Every model
+    call goes through it: deadline, concurrency cap, retries, circuit breaker.
+    """
+    client = current_app.extensions.get('gemini_client')
+    if client is None:
+        cfg = current_app.config
+        client = current_app.extensions['gemini_client'] = GeminiClient(
+            _get_model,
+            timeout=cfg['GEMINI_TIMEOUT_SECONDS'],
+            max_concurrency=cfg['GEMINI_MAX_CONCURRENCY'],
+            retries=cfg['GEMINI_RETRIES'],
+            breaker_threshold=cfg['GEMINI_BREAKER_THRESHOLD'],
+            breaker_reset=cfg['GEMINI_BREAKER_RESET_SECONDS'],
+        )
+    return client
+
+
+def _generate_text(*args, timeout: float | None = None, **kwargs) -> str:
+    """
+    Run `generate_content` through the shared client and return its text.
+    Raises GeminiUnavailable (TimeoutError for a missed deadline) on failure.
+    """
+    return _client().generate(*args, timeout=timeout, **kwargs)
+
+
+def _parse_json(text: str):
+    """json.loads that tolerates the ```json fences Gemini likes to add."""
+    cleaned = re.sub(r"^```(?:json)?\s*|\s*```$", "", text.strip())
+    return json.loads(cleaned)
 
 
 def categorize_expense_text(description: str, context_notes: str = None):
@@ -27,10 +74,11 @@ def categorize_expense_text(description: str, context_notes: str = None):
         "recurring": "No",
         "insight": "You spent more than usual on dining out this week."
       }
-    On failure or missing API key, returns a minimal fallback.
+    On failure, an unhealthy upstream or missing API key, returns a minimal fallback.
     """
-    if not _MODEL:
-        return {"category": "Other", "recurring": "Unknown", "insight": ""}
+    fallback = {"category": "Other", "recurring": "Unknown", "insight": ""}
+    if _get_model() is None:
+        return fallback
 
     prompt = f"""
 You are an expense categorization assistant.
@@ -42,7 +90,10 @@ Please respond in JSON with:
 {{"category": "...", "recurring": "Yes/No", "insight": "..."}}
 """
     try:
-        resp = _MODEL.generate_content(prompt).text
+        resp = _generate_text(prompt)
+    except GeminiUnavailable:
+        return fallback
+    try:
         return json.loads(resp)
     except Exception:
         # if it didn't come back as JSON, return raw text
@@ -54,12 +105,16 @@ def split_expense_with_context(
     amount: float,
     participants: list[str],
     context_notes: str = "",
+    timeout: float | None = None,
 ):
     """
     Ask Gemini how to split a shared expense.
 
     `participants` is a list of usernames (e.g. ['daniel', 'ana', 'luis'])
-    Returns a dict: {username → amount_owed}
+    `timeout` bounds the model call.
+    Returns a dict: {username → amount_owed}, or None when the model was not
+    asked (no model, call timed out, circuit open) so the caller applies its
+    own fallback split.
     """
 
     # Detect exclusions like: "Exclude Daniel", "excluding ana"
@@ -77,10 +132,8 @@ def split_expense_with_context(
     if not included:
         return {"error": "All participants were excluded or none found."}
 
-    # fallback (if Gemini disabled)
-    if not _MODEL:
-        share = round(amount / len(included), 2)
-        return {p: share for p in included}
+    if _get_model() is None:
+        return None
 
     # Build prompt
     members_csv = ", ".join(included)
@@ -95,18 +148,22 @@ Please respond in JSON with a map of each participant to what they owe, e.g.:
 {{"alice": 12.5, "bob": 12.5}}
 """
 
+    response_text = ""
     try:
-        response_text = _MODEL.generate_content(prompt).text
-        return json.loads(response_text)
+        response_text = _generate_text(prompt, timeout=timeout)
+        return _parse_json(response_text)
+    except GeminiUnavailable:
+        return None
     except Exception:
         return {"raw": response_text}
 
-def extract_from_receipt(image_data_bytes: bytes, context_notes: str = ""):
+def extract_from_receipt(image_data_bytes: bytes, context_notes: str = "", mime_type: str = "image/jpeg"):
     """
     Use Gemini’s vision endpoint to parse a receipt image.
+    `mime_type` should be the detected type of `image_data_bytes`.
     Returns either a parsed dict (if valid JSON) or the raw text.
     """
-    if not _MODEL:
+    if _get_model() is None:
         return "No Gemini model configured."
 
     # Build the multi-part prompt
@@ -116,16 +173,18 @@ def extract_from_receipt(image_data_bytes: bytes, context_notes: str = ""):
             {"text": f"Extract vendor, total, and category from this receipt. {context_notes}"},
             {
                 "inline_data": {
-                    "mime_type": "image/jpeg",
+                    "mime_type": mime_type,
                     "data": image_data_bytes
                 }
             }
         ],
     }
     try:
-        resp = _MODEL.generate_content(contents=[user_part]).text
-        # try JSON parse
-        return json.loads(resp)
+        resp = _generate_text(contents=[user_part])
+    except GeminiUnavailable as exc:
+        return f"Gemini is unavailable: {exc}"
+    try:
+        return _parse_json(resp)
     except Exception:
         return resp
 
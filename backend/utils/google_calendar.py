@@ -4,8 +4,6 @@ import os
 import json
 from datetime import timedelta, datetime
 from dotenv import load_dotenv
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
 
 load_dotenv()
 
@@ -27,6 +25,10 @@ def create_calendar_reminder(
     Returns:
       The Google Calendar event ID, or None if creation failed.
     """
+    # Google API clients are imported on first use to keep app startup fast
+    from google.oauth2.credentials import Credentials
+    from googleapiclient.discovery import build
+
     try:
         # Restore credentials from the stored token
         creds_info = json.loads(user_token)
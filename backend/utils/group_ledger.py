@@ -0,0 +1,335 @@
+# backend/utils/group_ledger.py
+
+from collections import namedtuple
+from itertools import chain, groupby, repeat
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from sqlalchemy import delete, event, func, inspect, select, union_all, update
+from sqlalchemy.orm import aliased
+
+from backend.db_routing import RoutingSession
+from backend.extensions import db
+from backend.models.shared import (
+    ArchivedSharedExpense, ArchivedSplit, BalanceCheckpoint, Group, Payment, SharedExpense, Split,
+    group_members
+)
+from backend.models.user import User
+from backend.utils.fx import base_currency, fx_table, needs_conversion
+from backend.utils.split_logic import calculate_balances_from_splits, minimize_cash_flow
+
+# A split's share converted to the group's currency
+_Share = namedtuple('_Share', 'user_id amount_owed')
+
+
+def overview_etag(group_id: int, version: int, limit: int, fx_revision: str) -> str:
+    """
+    Validator for a group overview; weak because compression changes the
+    bytes, not the meaning. Balances are converted at the current rates, so
+    the FX revision is part of it.
+    """
+    return f"group-{group_id}-v{version}-l{limit}-fx{fx_revision}"
+
+
+def group_version(group_id: int):
+    """The group's version, or None if it does not exist. Touches only the groups table."""
+    return db.session.execute(select(Group.version).where(Group.id == group_id)).scalar()
+
+
+def bump_group_versions(group_ids: Iterable[int]) -> None:
+    """
+    Invalidate the overviews of `group_ids` for writes that bypass the ORM
+    unit of work (bulk inserts/deletes). Runs in the caller's transaction.
+    """
+    ids = sorted({int(gid) for gid in group_ids if gid is not None})
+    if ids:
+        db.session.execute(update(Group).where(Group.id.in_(ids)).values(version=Group.version + 1))
+
+
+def _groups_with_members(session, user_ids) -> set:
+    """Ids of the groups that contain every one of `user_ids`."""
+    ids = {int(uid) for uid in user_ids if uid is not None}
+    if not ids:
+        return set()
+    rows = session.execute(
+        select(group_members.c.group_id)
+        .where(group_members.c.user_id.in_(ids))
+        .group_by(group_members.c.group_id)
+        .having(func.count() == len(ids))
+    )
+    return set(rows.scalars())
+
+
+@event.listens_for(RoutingSession, 'before_flush')
+def _bump_touched_groups(session, _flush_context, _instances):
+    # Every ORM write that can change an overview bumps the version of the
+    # groups it belongs to, inside the same flush. Payments carry no group,
+    # so they count for every group holding both users (as /history does).
+    touched = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, SharedExpense):
+            history = inspect(obj).attrs.group_id.history
+            touched.update(chain(history.added, history.unchanged, history.deleted))
+        elif isinstance(obj, Split):
+            expense = obj.shared_expense or session.get(SharedExpense, obj.expense_id)
+            if expense is not None:
+                touched.add(expense.group_id)
+        elif isinstance(obj, Payment):
+            touched |= _groups_with_members(session, [obj.from_user, obj.to_user])
+        elif isinstance(obj, Group) and obj not in session.new:
+            touched.add(obj.id)
+        elif isinstance(obj, User) and obj not in session.new \
+                and inspect(obj).attrs.username.history.has_changes():
+            touched |= _groups_with_members(session, [obj.id])
+
+    for group_id in touched - {None}:
+        group = session.get(Group, int(group_id))
+        if group is not None and group not in session.deleted and group not in session.new:
+            group.version = Group.version + 1
+
+
+@event.listens_for(RoutingSession, 'before_flush')
+def _drop_stale_checkpoints(session, _flush_context, _instances):
+    # Editing or deleting an expense a checkpoint already covers (or its
+    # splits) makes that checkpoint wrong; drop it and the next read
+    # recomputes from hot + archive. New expenses are plain deltas.
+    oldest = {}
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, SharedExpense) and obj not in session.new:
+            state = inspect(obj)
+            if obj in session.deleted or any(
+                state.attrs[k].history.has_changes() for k in ('paid_by', 'group_id', 'currency')
+            ):
+                history = state.attrs.group_id.history
+                for group_id in chain(history.unchanged, history.deleted):
+                    oldest[group_id] = min(oldest.get(group_id, obj.id), obj.id)
+        elif isinstance(obj, Split):
+            state = inspect(obj)
+            if obj in session.dirty and not any(
+                state.attrs[k].history.has_changes() for k in ('user_id', 'amount_owed', 'expense_id')
+            ):
+                continue
+            expense = obj.shared_expense or session.get(SharedExpense, obj.expense_id)
+            if expense is not None and expense.id is not None:
+                oldest[expense.group_id] = min(oldest.get(expense.group_id, expense.id), expense.id)
+        elif isinstance(obj, Group) and obj in session.dirty and inspect(obj).attrs.currency.history.has_changes():
+            # Checkpoints hold amounts in the group's currency
+            oldest[obj.id] = 0
+
+    for group_id, expense_id in oldest.items():
+        session.execute(delete(BalanceCheckpoint).where(
+            BalanceCheckpoint.group_id == group_id,
+            BalanceCheckpoint.through_expense_id >= expense_id
+        ))
+
+
+def group_expenses(group_id: int):
+    """A group's hot and archived expenses as one subquery with the SharedExpense columns."""
+    def rows(model):
+        return select(
+            model.id, model.group_id, model.paid_by, model.amount, model.currency, model.description,
+            model.category, model.notes, model.created_at
+        ).where(model.group_id == group_id)
+    return union_all(rows(SharedExpense), rows(ArchivedSharedExpense)).subquery('group_expenses')
+
+
+def fold_expenses(
+    group_id: int,
+    after_id: int,
+    net: Dict[int, float],
+    currency: Optional[str] = None,
+    before_id: Optional[int] = None
+) -> int:
+    """
+    Add every expense of the group with id > `after_id` (and < `before_id`,
+    if given), hot or archived, into `net` (in place) with the same
+    per-expense arithmetic as `calculate_balances_from_splits`.
+
+    Amounts in other currencies are converted to the group's `currency`
+    (None = BASE_CURRENCY) at the rate of the expense's day, for all rows
+    at once; single-currency groups skip the conversion entirely.
+
+    Returns:
+      The highest expense id folded in (`after_id` if there were none).
+    """
+    def rows(expense, split):
+        stmt = (
+            select(
+                expense.id, expense.paid_by, expense.currency, expense.created_at,
+                split.user_id, split.amount_owed, split.id.label('split_id')
+            )
+            .outerjoin(split, split.expense_id == expense.id)
+            .where(expense.group_id == group_id, expense.id > after_id)
+        )
+        return stmt if before_id is None else stmt.where(expense.id < before_id)
+    both = union_all(rows(SharedExpense, Split), rows(ArchivedSharedExpense, ArchivedSplit)).subquery()
+    result = db.session.execute(select(both).order_by(both.c.id, both.c.split_id)).all()
+
+    target = currency or base_currency()
+    factors = repeat(1.0)
+    if needs_conversion((r.currency for r in result), target):
+        factors = fx_table().factors(
+            [r.currency or target for r in result],
+            np.array([r.created_at for r in result], dtype='datetime64[us]'),
+            to=target,
+        ).tolist()
+
+    last = after_id
+    for (expense_id, paid_by), rows in groupby(zip(result, factors), key=lambda rf: (rf[0].id, rf[0].paid_by)):
+        shares = [_Share(r.user_id, r.amount_owed * f) for r, f in rows if r.user_id is not None]
+        bal = calculate_balances_from_splits(shares, paid_by)
+        for uid, v in bal.items():
+            net[uid] = net.get(uid, 0) + v
+        last = expense_id
+    return last
+
+
+def foreign_currency_groups() -> List[int]:
+    """Ids of the groups with an expense (hot or archived) in another currency than their own."""
+    ids = set()
+    for model in (SharedExpense, ArchivedSharedExpense):
+        ids.update(db.session.execute(
+            select(model.group_id).distinct()
+            .join(Group, Group.id == model.group_id)
+            .where(model.currency.isnot(None), model.currency != func.coalesce(Group.currency, base_currency()))
+        ).scalars())
+    return sorted(ids)
+
+
+def load_checkpoint(group_id: int):
+    """The group's checkpoint as ({user id: balance}, through expense id); ({}, 0) if none."""
+    rows = db.session.execute(
+        select(BalanceCheckpoint.user_id, BalanceCheckpoint.amount, BalanceCheckpoint.through_expense_id)
+        .where(BalanceCheckpoint.group_id == group_id)
+    ).all()
+    return {r.user_id: r.amount for r in rows}, (rows[0].through_expense_id if rows else 0)
+
+
+def group_balances(group_id: int, currency: Optional[str] = None) -> Dict[int, float]:
+    """
+    Net balance per user (negative = owes) in the group's `currency`: the
+    latest checkpoint plus the expenses added since, so the cost follows
+    recent activity rather than the group's whole history.
+    """
+    net, through = load_checkpoint(group_id)
+    fold_expenses(group_id, through, net, currency)
+    return net
+
+
+def settle_splits(group: Group, from_user: int, to_user: int, amount: float, currency: Optional[str] = None) -> int:
+    """
+    Mark `from_user`'s open splits on expenses `to_user` paid in `group` as
+    paid, oldest first, for as many whole splits as `amount` covers. Only
+    expenses in the payment's `currency` (None = the group's) count; a
+    remainder too small for the next split leaves it open. Runs in the
+    caller's transaction.
+
+    Returns:
+      The number of splits settled.
+    """
+    group_currency = group.currency or base_currency()
+    splits = db.session.execute(
+        select(Split)
+        .join(SharedExpense, SharedExpense.id == Split.expense_id)
+        .where(
+            SharedExpense.group_id == group.id,
+            SharedExpense.paid_by == to_user,
+            func.coalesce(SharedExpense.currency, group_currency) == (currency or group_currency),
+            Split.user_id == from_user,
+            Split.is_paid.isnot(True)
+        )
+        .order_by(SharedExpense.id, Split.id)
+    ).scalars().all()
+
+    left = round(float(amount) * 100)
+    settled = 0
+    for split in splits:
+        owed = round(split.amount_owed * 100)
+        if owed > left:
+            break
+        split.is_paid = True
+        left -= owed
+        settled += 1
+    return settled
+
+
+def expense_item(row) -> Dict[str, Any]:
+    """History entry for a row of `group_expenses` joined with the payer's username."""
+    return {
+        "id":               row.id,
+        "description":      row.description,
+        "amount":           row.amount,
+        "currency":         row.currency,
+        "paid_by":          row.paid_by,
+        "paid_by_username": row.paid_by_username,
+        "notes":            row.notes,
+        "date":             row.created_at
+    }
+
+
+def group_overview(group: Group, history_limit: int) -> Dict[str, Any]:
+    """
+    Everything the group page shows, in a handful of queries: members, the
+    balances (checkpoint + newer expenses), and the newest `history_limit`
+    expenses (hot and archived) and payments.
+
+    Returns:
+      A dict with `group` (info + members), `net_balances`,
+      `simplified_transactions` and `history`.
+    """
+    members = db.session.execute(
+        select(User.id, User.username)
+        .join(group_members, group_members.c.user_id == User.id)
+        .where(group_members.c.group_id == group.id)
+    ).all()
+    usernames = {m.id: m.username for m in members}
+    member_ids = list(usernames)
+
+    net = group_balances(group.id, group.currency)
+
+    expense = group_expenses(group.id)
+    payer = aliased(User)
+    expenses = db.session.execute(
+        select(expense, payer.username.label('paid_by_username'))
+        .join(payer, payer.id == expense.c.paid_by)
+        .order_by(expense.c.created_at.desc(), expense.c.id.desc())
+        .limit(history_limit + 1)
+    ).all()
+    payments = db.session.execute(
+        select(Payment)
+        .where(Payment.from_user.in_(member_ids), Payment.to_user.in_(member_ids))
+        .order_by(Payment.created_at.desc(), Payment.id.desc())
+        .limit(history_limit + 1)
+    ).scalars().all()
+
+    creator = usernames.get(group.created_by) or db.session.get(User, group.created_by).username
+    return {
+        "group": {
+            "id": group.id,
+            "name": group.name,
+            "created_by": group.created_by,
+            "created_by_username": creator,
+            "currency": group.currency or base_currency(),
+            "version": group.version,
+            "members": [{"id": m.id, "username": m.username} for m in members],
+        },
+        "net_balances": net,
+        "simplified_transactions": minimize_cash_flow(net.copy()),
+        "history": {
+            "expenses": [expense_item(e) for e in expenses[:history_limit]],
+            "payments": [{
+                "id":            p.id,
+                "from_user":     p.from_user,
+                "from_username": usernames.get(p.from_user),
+                "to_user":       p.to_user,
+                "to_username":   usernames.get(p.to_user),
+                "amount":        p.amount,
+                "currency":      p.currency,
+                "status":        p.status,
+                "date":          p.created_at
+            } for p in payments[:history_limit]],
+            "has_more_expenses": len(expenses) > history_limit,
+            "has_more_payments": len(payments) > history_limit,
+        },
+    }
@@ -0,0 +1,111 @@
+# backend/utils/ledger_archive.py
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, select
+
+from backend.extensions import db
+from backend.models.shared import (
+    ArchivedSharedExpense, ArchivedSplit, BalanceCheckpoint, Group, SharedExpense, Split
+)
+from backend.utils.group_ledger import fold_expenses, load_checkpoint
+
+_EXPENSE_COLUMNS = ['id', 'group_id', 'paid_by', 'amount', 'currency', 'description', 'category', 'notes', 'created_at']
+_SPLIT_COLUMNS = ['id', 'expense_id', 'user_id', 'amount_owed', 'is_paid']
+
+
+def checkpoint_group(group_id: int, safety: timedelta = timedelta(minutes=5)) -> int:
+    """
+    Fold the expenses added since the group's last checkpoint into a new
+    one, in the group's currency. Expenses created meanwhile have higher
+    ids and stay deltas.
+
+    Ids are handed out before commit, so on Postgres a lower id can still be
+    uncommitted (and invisible) when a higher one is. The checkpoint stops
+    before the first expense created within `safety` of now; anything
+    still in flight lands after it and is read as a delta.
+
+    Returns:
+      The id of the last expense the checkpoint covers (0 if none).
+    """
+    net, through = load_checkpoint(group_id)
+    currency = db.session.execute(select(Group.currency).where(Group.id == group_id)).scalar()
+    first_recent = db.session.execute(
+        select(func.min(SharedExpense.id)).where(
+            SharedExpense.group_id == group_id,
+            SharedExpense.id > through,
+            SharedExpense.created_at >= datetime.utcnow() - safety
+        )
+    ).scalar()
+    last = fold_expenses(group_id, through, net, currency, before_id=first_recent)
+    if last == through:
+        return through
+
+    now = datetime.utcnow()
+    db.session.execute(delete(BalanceCheckpoint).where(BalanceCheckpoint.group_id == group_id))
+    db.session.execute(insert(BalanceCheckpoint), [
+        {"group_id": group_id, "user_id": uid, "amount": amount, "through_expense_id": last, "created_at": now}
+        for uid, amount in net.items()
+    ])
+    db.session.commit()
+    return last
+
+
+def checkpoint_groups(group_id: Optional[int] = None, safety: timedelta = timedelta(minutes=5)) -> int:
+    """Checkpoint one group, or every group. Returns how many groups were visited."""
+    ids = [group_id] if group_id is not None else db.session.execute(select(Group.id)).scalars().all()
+    for gid in ids:
+        checkpoint_group(gid, safety)
+    return len(ids)
+
+
+def archive_settled(older_than: timedelta, group_id: Optional[int] = None, batch_size: int = 1000) -> int:
+    """
+    Move expenses that are covered by a checkpoint, older than `older_than`
+    and whose splits are all paid (completed payments settle them, see
+    group_ledger.settle_splits), together with their splits, into the
+    archive tables. Ids are kept, so history reads see the same rows.
+
+    Each batch is copied and deleted in one transaction. Balances and group
+    versions are unaffected: the checkpoint already holds these expenses.
+
+    Returns:
+      The number of expenses archived.
+    """
+    cutoff = datetime.utcnow() - older_than
+    checkpoints = select(BalanceCheckpoint.group_id, BalanceCheckpoint.through_expense_id).distinct()
+    if group_id is not None:
+        checkpoints = checkpoints.where(BalanceCheckpoint.group_id == group_id)
+
+    unpaid = select(Split.id).where(Split.expense_id == SharedExpense.id, Split.is_paid.isnot(True)).exists()
+    moved = 0
+    for gid, through in db.session.execute(checkpoints).all():
+        while True:
+            ids = db.session.execute(
+                select(SharedExpense.id)
+                .where(
+                    SharedExpense.group_id == gid,
+                    SharedExpense.id <= through,
+                    SharedExpense.created_at < cutoff,
+                    ~unpaid
+                )
+                .order_by(SharedExpense.id)
+                .limit(batch_size)
+            ).scalars().all()
+            if not ids:
+                break
+
+            db.session.execute(insert(ArchivedSharedExpense).from_select(
+                _EXPENSE_COLUMNS,
+                select(*(getattr(SharedExpense, c) for c in _EXPENSE_COLUMNS)).where(SharedExpense.id.in_(ids))
+            ))
+            db.session.execute(insert(ArchivedSplit).from_select(
+                _SPLIT_COLUMNS,
+                select(*(getattr(Split, c) for c in _SPLIT_COLUMNS)).where(Split.expense_id.in_(ids))
+            ))
+            db.session.execute(delete(Split).where(Split.expense_id.in_(ids)))
+            db.session.execute(delete(SharedExpense).where(SharedExpense.id.in_(ids)))
+            db.session.commit()
+            moved += len(ids)
+    return moved
@@ -0,0 +1,113 @@
+# backend/utils/ledger_export.py
+
+import csv
+import io
+from datetime import date, datetime
+from typing import Iterator, List, Sequence, Tuple
+
+from flask import Response, stream_with_context
+from sqlalchemy import Select
+
+from backend.extensions import db
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = pq = None
+
+# (column name, kind) — kind is one of int/float/str/bool/datetime
+Columns = Sequence[Tuple[str, str]]
+
+FORMATS = {'csv': 'text/csv', 'parquet': 'application/vnd.apache.parquet'}
+
+
+def iter_chunks(stmt: Select, id_column, after_id: int, chunk_rows: int) -> Iterator[List[tuple]]:
+    """
+    Rows of `stmt` with `id_column` > `after_id`, in id order, `chunk_rows`
+    at a time.
+
+    The query runs once with a streaming (server-side where the driver has
+    one) cursor; only the current chunk is held in memory. Ordering by id is
+    what makes an export resumable: restart with the last id received.
+    """
+    stmt = stmt.where(id_column > after_id).order_by(id_column)
+    result = db.session.execute(stmt.execution_options(yield_per=chunk_rows))
+    for partition in result.partitions():
+        yield partition
+
+
+def _cell(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def stream_csv(columns: Columns, chunks: Iterator[List[tuple]]) -> Iterator[str]:
+    """CSV text: a header line, then one piece per fetched chunk."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _ in columns])
+    for rows in chunks:
+        writer.writerows([_cell(v) for v in row] for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+class _Sink(io.RawIOBase):
+    """Write-only file that hands the bytes written so far to the response."""
+
+    def __init__(self):
+        self._pending = bytearray()
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._pending += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data, self._pending = bytes(self._pending), bytearray()
+        return data
+
+
+def _arrow_schema(columns: Columns):
+    kinds = {'int': pa.int64(), 'float': pa.float64(), 'str': pa.string(),
+             'bool': pa.bool_(), 'datetime': pa.timestamp('us')}
+    return pa.schema([(name, kinds[kind]) for name, kind in columns])
+
+
+def stream_parquet(columns: Columns, chunks: Iterator[List[tuple]]) -> Iterator[bytes]:
+    """
+    A Parquet file written one row group per fetched chunk; each row group
+    is sent as soon as it is encoded, the footer last.
+    """
+    schema = _arrow_schema(columns)
+    sink = _Sink()
+    writer = pq.ParquetWriter(sink, schema, compression='zstd')
+    try:
+        for rows in chunks:
+            arrays = [pa.array(col, type=field.type) for col, field in zip(zip(*rows), schema)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def export_response(fmt: str, filename: str, columns: Columns, chunks: Iterator[List[tuple]]) -> Response:
+    """Streamed download of `chunks` as CSV or Parquet; `fmt` must be in FORMATS."""
+    body = stream_parquet(columns, chunks) if fmt == 'parquet' else stream_csv(columns, chunks)
+    return Response(
+        stream_with_context(body),
+        mimetype=FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename="{filename}.{fmt}"'},
+    )
@@ -0,0 +1,27 @@
+# backend/utils/offload.py
+
+from typing import Any, Callable, Optional
+
+# Where CPU-bound calls (Pillow, bcrypt) run when the server installs a
+# runner. Under the gevent server (backend/serve.py) this is the hub's
+# threadpool: real OS threads, waited on without blocking other greenlets.
+# None: callers use their own thread or process pools, as under a threaded
+# WSGI server.
+_RUNNER: Optional[Callable[..., Any]] = None
+
+
+def set_cpu_runner(runner: Optional[Callable[..., Any]]) -> None:
+    """Install `runner(fn, *args, **kwargs)` for CPU-bound work (None removes it)."""
+    global _RUNNER
+    _RUNNER = runner
+
+
+def has_cpu_runner() -> bool:
+    return _RUNNER is not None
+
+
+def run_cpu(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Call `fn` on the installed CPU runner, or inline when there is none."""
+    if _RUNNER is None:
+        return fn(*args, **kwargs)
+    return _RUNNER(fn, *args, **kwargs)
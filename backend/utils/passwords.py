@@ -0,0 +1,107 @@
+# backend/utils/passwords.py
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+import bcrypt
+from werkzeug.security import check_password_hash
+
+from backend.utils.offload import has_cpu_runner, run_cpu
+
+# bcrypt only looks at the first 72 bytes; newer releases raise instead of truncating
+_BCRYPT_MAX_BYTES = 72
+_BCRYPT_PREFIXES = ("$2a$", "$2b$", "$2y$")
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_SLOTS: Optional[threading.BoundedSemaphore] = None
+_POOL_LOCK = threading.Lock()
+
+
+class PasswordHasherBusy(RuntimeError):
+    """Too many hashes are queued; the caller should shed the request (503)."""
+
+
+def _encode(password: str) -> bytes:
+    return password.encode("utf-8")[:_BCRYPT_MAX_BYTES]
+
+
+def _hash(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(_encode(password), bcrypt.gensalt(rounds)).decode("ascii")
+
+
+def _verify(stored: str, password: str) -> bool:
+    if stored.startswith(_BCRYPT_PREFIXES):
+        return bcrypt.checkpw(_encode(password), stored.encode("ascii"))
+    # Accounts created before bcrypt carry werkzeug pbkdf2/scrypt hashes
+    return check_password_hash(stored, password)
+
+
+def _settings():
+    from flask import current_app
+
+    cfg = current_app.config
+    return cfg['BCRYPT_LOG_ROUNDS'], cfg['PASSWORD_HASH_WORKERS'], cfg['PASSWORD_HASH_QUEUE']
+
+
+def _pool(workers: int, queue: int):
+    global _POOL, _SLOTS
+    with _POOL_LOCK:
+        if _POOL is None:
+            # spawn: the app process runs threads (Gemini, receipt pools) that must not be forked
+            _POOL = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _SLOTS = threading.BoundedSemaphore(workers + queue)
+    return _POOL, _SLOTS
+
+
+def _run(fn, *args):
+    """Run a hashing function on the process pool (inline when it is disabled)."""
+    _, workers, queue = _settings()
+    if workers <= 0:
+        return fn(*args)
+    if has_cpu_runner():
+        # Under the gevent server: bcrypt releases the GIL, and a process pool's
+        # feeder threads and pipes do not survive monkey-patching
+        return run_cpu(fn, *args)
+
+    pool, slots = _pool(workers, queue)
+    if not slots.acquire(blocking=False):
+        raise PasswordHasherBusy("Password hashing queue is full")
+    try:
+        return pool.submit(fn, *args).result()
+    except BrokenProcessPool:
+        # A worker died (OOM kill, ...): start a fresh pool next time, answer this one inline
+        _reset_pool(pool)
+        return fn(*args)
+    finally:
+        slots.release()
+
+
+def _reset_pool(broken: ProcessPoolExecutor) -> None:
+    global _POOL, _SLOTS
+    with _POOL_LOCK:
+        if _POOL is broken:
+            _POOL, _SLOTS = None, None
+
+
+def hash_password(password: str) -> str:
+    """bcrypt hash of `password` at the configured cost (BCRYPT_LOG_ROUNDS)."""
+    rounds, _, _ = _settings()
+    return _run(_hash, password, rounds)
+
+
+def verify_password(stored: str, password: str) -> bool:
+    """Check `password` against a bcrypt or legacy werkzeug hash."""
+    if not stored or password is None:
+        return False
+    return _run(_verify, stored, password)
+
+
+def needs_rehash(stored: str) -> bool:
+    """True for legacy hashes and bcrypt hashes made with a different cost."""
+    rounds, _, _ = _settings()
+    if not stored.startswith(_BCRYPT_PREFIXES):
+        return True
+    return int(stored.split("$")[2]) != rounds
@@ -0,0 +1,151 @@
+# backend/utils/receipt_batch.py
+
+import math
+import re
+import threading
+import weakref
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+from backend.utils.gemini_utils import extract_from_receipt
+from backend.utils.offload import run_cpu
+from backend.utils.receipt_images import preprocess_receipt
+
+_POOL: Optional[ThreadPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+# One semaphore per user caps how many of their receipts are in flight,
+# across all of that user's concurrent batch requests. Entries live only
+# while a batch or an unfinished job references them, so idle users are
+# evicted and a semaphore with held slots never is.
+_USER_SLOTS: "weakref.WeakValueDictionary[Tuple[str, int], threading.BoundedSemaphore]" = (
+    weakref.WeakValueDictionary()
+)
+_USER_SLOTS_LOCK = threading.Lock()
+
+_AMOUNT = re.compile(r"-?\d[\d.,]*")
+
+
+def _pool(workers: int) -> ThreadPoolExecutor:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="receipt-batch")
+    return _POOL
+
+
+def _user_slots(user_key: str, limit: int) -> threading.BoundedSemaphore:
+    with _USER_SLOTS_LOCK:
+        key = (user_key, limit)
+        slots = _USER_SLOTS.get(key)
+        if slots is None:
+            slots = _USER_SLOTS[key] = threading.BoundedSemaphore(limit)
+        return slots
+
+
+def process_receipt(data: bytes, mime: str, context: str, **options) -> Any:
+    """Preprocess one receipt image and ask Gemini to parse it (runs on a worker)."""
+    # Inline on the batch worker thread; a greenlet under the gevent server, so there it goes to the CPU runner
+    payload, payload_mime, _ = run_cpu(preprocess_receipt, data, mime, **options)
+    return extract_from_receipt(payload, context, mime_type=payload_mime)
+
+
+def run_bounded(
+    jobs: Iterable[Tuple[Any, Callable[[], Any]]],
+    user_key: str,
+    per_user: int,
+    workers: int
+) -> Iterator[Tuple[Any, Any, Optional[BaseException]]]:
+    """
+    Run jobs on the shared pool, never holding more than `per_user` of this
+    user's slots, and yield results in completion order.
+
+    Args:
+      jobs: (tag, zero-argument callable) pairs.
+      user_key: Who the work is for (user id or client address).
+      per_user: Concurrent jobs allowed for this user.
+      workers: Size of the shared pool (fixed on first use).
+
+    Yields:
+      (tag, result, exception) — exactly one of result/exception is meaningful.
+    """
+    pool = _pool(workers)
+    slots = _user_slots(user_key, per_user)
+    pending = deque(jobs)
+    running = {}
+
+    try:
+        while pending or running:
+            # Fill free slots; block for one only when nothing of ours is running
+            while pending and slots.acquire(blocking=not running):
+                tag, fn = pending.popleft()
+                future = pool.submit(fn)
+                # Released when the job finishes or is cancelled, not when we stop waiting for it
+                future.add_done_callback(lambda _, slots=slots: slots.release())
+                running[future] = tag
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                tag = running.pop(future)
+                error = future.exception()
+                yield tag, (None if error else future.result()), error
+    finally:
+        # Client went away: drop queued work; jobs already running keep their slot until they end
+        for future in running:
+            future.cancel()
+
+
+def _parse_amount(text: str) -> float:
+    """
+    '1,234.56', '1.234,56', '12,50' and '1 234' style amounts as a float.
+    With both separators the last one is the decimal point; a lone one is a
+    thousands separator when exactly three digits follow it.
+    """
+    text = text.rstrip(".,")
+    last = max(text.rfind("."), text.rfind(","))
+    if last < 0:
+        return float(text)
+    if "." in text and "," in text:
+        decimal = text[last]
+    elif text.count(text[last]) == 1 and len(text) - last - 1 != 3:
+        decimal = text[last]
+    else:
+        decimal = None
+    whole, frac = (text[:last], text[last + 1:]) if decimal else (text, "")
+    whole = whole.replace(".", "").replace(",", "")
+    return float(f"{whole}.{frac}" if frac else whole)
+
+
+def parse_total(result: Any) -> Optional[float]:
+    """
+    Pull a numeric total out of Gemini's receipt output ({"total": "$12.50"},
+    {"total": "12,50 €"} etc.). Totals that are not positive and finite are
+    None, so they never become expenses.
+    """
+    if not isinstance(result, dict):
+        return None
+    for key, value in result.items():
+        if key.lower() in ("total", "amount", "total_amount"):
+            total = None
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                total = float(value)
+            else:
+                match = _AMOUNT.search(str(value).replace(" ", "").replace("\u00a0", ""))
+                if match:
+                    try:
+                        total = _parse_amount(match.group())
+                    except ValueError:
+                        total = None
+            if total is not None and math.isfinite(total) and total > 0:
+                return total
+            return None
+    return None
+
+
+def parse_vendor(result: Any) -> Optional[str]:
+    if isinstance(result, dict):
+        for key, value in result.items():
+            if key.lower() in ("vendor", "merchant", "store") and value:
+                return str(value)[:200]
+    return None
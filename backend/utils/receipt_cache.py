@@ -0,0 +1,83 @@
+# backend/utils/receipt_cache.py
+
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Optional
+
+from flask import current_app
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+
+from backend.extensions import db
+from backend.models.cache import ReceiptCache
+
+
+def receipt_cache_key(image_bytes: bytes, context: str = "") -> str:
+    """Content address for a receipt: sha256 over the image bytes and the normalized context."""
+    digest = hashlib.sha256(image_bytes)
+    digest.update(b"\0")
+    digest.update(" ".join((context or "").split()).lower().encode("utf-8"))
+    return digest.hexdigest()
+
+
+def get_cached_receipt(key: str) -> Optional[Any]:
+    """Return the cached result for `key` (and mark it as recently used), or None."""
+    entry = db.session.get(ReceiptCache, key)
+    if entry is None:
+        return None
+    entry.hits += 1
+    entry.last_used_at = datetime.utcnow()
+    db.session.commit()
+    return json.loads(entry.result)
+
+
+def store_receipt(key: str, result: Any) -> bool:
+    """
+    Cache a parsed receipt result. Only structured (dict) results are kept,
+    so "no model configured" or error strings are retried next time.
+
+    Returns:
+      True if the result was stored.
+    """
+    if not isinstance(result, dict):
+        return False
+
+    payload = json.dumps(result)
+    db.session.add(ReceiptCache(key=key, result=payload, size_bytes=len(payload)))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent upload of the same receipt stored it first
+        db.session.rollback()
+        return False
+
+    evict_receipts(current_app.config['RECEIPT_CACHE_MAX_BYTES'])
+    return True
+
+
+def evict_receipts(max_bytes: int) -> int:
+    """
+    Drop least-recently-used entries until the cache fits in `max_bytes`.
+
+    Returns:
+      The number of entries removed.
+    """
+    total = db.session.scalar(select(func.coalesce(func.sum(ReceiptCache.size_bytes), 0)))
+    excess = total - max_bytes
+    if excess <= 0:
+        return 0
+
+    victims = []
+    rows = db.session.execute(
+        select(ReceiptCache.key, ReceiptCache.size_bytes).order_by(ReceiptCache.last_used_at)
+    )
+    for key, size in rows:
+        victims.append(key)
+        excess -= size
+        if excess <= 0:
+            break
+
+    ReceiptCache.query.filter(ReceiptCache.key.in_(victims)).delete(synchronize_session=False)
+    db.session.commit()
+    return len(victims)
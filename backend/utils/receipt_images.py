@@ -0,0 +1,132 @@
+# backend/utils/receipt_images.py
+
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from backend.utils.offload import has_cpu_runner, run_cpu
+
+CHUNK_SIZE = 64 * 1024
+# Pixel cap for decoding: far above any phone photo, far below a decompression bomb
+MAX_PIXELS = 40_000_000
+
+# Leading bytes → MIME type for the formats phones and scanners produce
+_SIGNATURES = [
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"%PDF-", "application/pdf"),
+]
+_HEIF_BRANDS = {b"heic", b"heix", b"hevc", b"heim", b"heis", b"mif1", b"msf1"}
+
+# Formats the preprocessing stage can decode and re-encode
+_RASTER_TYPES = {"image/jpeg", "image/png", "image/gif", "image/webp"}
+
+_POOL: Optional[ThreadPoolExecutor] = None
+
+
+class ReceiptTooLarge(ValueError):
+    """The upload exceeded the configured size or pixel cap."""
+
+
+def read_upload(stream, max_bytes: int) -> bytes:
+    """
+    Copy an uploaded file in chunks, aborting as soon as it passes `max_bytes`.
+
+    Werkzeug has already spooled the whole multipart body by then (bounded
+    by MAX_CONTENT_LENGTH); this caps what each receipt may hold in memory.
+    """
+    buf = io.BytesIO()
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            return buf.getvalue()
+        if buf.tell() + len(chunk) > max_bytes:
+            raise ReceiptTooLarge(f"Receipt is larger than {max_bytes // (1024 * 1024)} MB")
+        buf.write(chunk)
+
+
+def sniff_mime(data: bytes) -> Optional[str]:
+    """Detect the real file type from its magic bytes (the upload's declared type is not trusted)."""
+    for magic, mime in _SIGNATURES:
+        if data.startswith(magic):
+            return mime
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data[4:8] == b"ftyp" and data[8:12] in _HEIF_BRANDS:
+        return "image/heic"
+    return None
+
+
+def preprocess_receipt(
+    data: bytes,
+    mime: str,
+    max_side: int = 1600,
+    quality: int = 70,
+    grayscale: bool = True,
+    max_pixels: int = MAX_PIXELS
+) -> Tuple[bytes, str, dict]:
+    """
+    Shrink a receipt image to what OCR needs: upright, at most `max_side`
+    pixels on the long edge, grayscale, recompressed as JPEG.
+
+    Formats Pillow cannot re-encode here (HEIC, PDF), or a missing Pillow,
+    pass through untouched. The smaller of original and processed wins.
+    Images over `max_pixels` raise ReceiptTooLarge before being decoded.
+
+    Returns:
+      (payload bytes, payload MIME type, stats dict)
+    """
+    start = time.perf_counter()
+    stats = {"original_bytes": len(data), "sent_bytes": len(data), "processed": False}
+
+    if mime not in _RASTER_TYPES:
+        return data, mime, stats
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        return data, mime, stats
+
+    # The header gives the size before anything is decoded. Pillow's own
+    # bomb limit is process-wide, so it is left alone and only caught here
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            if img.width * img.height > max_pixels:
+                raise ReceiptTooLarge(f"Receipt image has more than {max_pixels} pixels")
+            img.draft("L" if grayscale else "RGB", (max_side, max_side))  # cheap JPEG DCT downscale
+            img = ImageOps.exif_transpose(img)
+            img = img.convert("L" if grayscale else "RGB")
+            img.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+            out = io.BytesIO()
+            img.save(out, format="JPEG", quality=quality, optimize=True)
+    except Image.DecompressionBombError:
+        raise ReceiptTooLarge(f"Receipt image has more than {max_pixels} pixels")
+    except ReceiptTooLarge:
+        raise
+    except (OSError, ValueError):
+        # Truncated or corrupt image: let the model try the original bytes
+        return data, mime, stats
+
+    stats["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    if out.tell() >= len(data):
+        return data, mime, stats
+
+    stats.update(sent_bytes=out.tell(), processed=True)
+    return out.getvalue(), "image/jpeg", stats
+
+
+def _pool(workers: int) -> ThreadPoolExecutor:
+    # Pillow releases the GIL while decoding, resizing and encoding, so threads scale
+    global _POOL
+    if _POOL is None:
+        _POOL = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="receipt-img")
+    return _POOL
+
+
+def preprocess_in_pool(data: bytes, mime: str, workers: int = 4, **options) -> Tuple[bytes, str, dict]:
+    """Run `preprocess_receipt` on the shared worker pool (or the server's CPU runner) and wait for it."""
+    if has_cpu_runner():
+        return run_cpu(preprocess_receipt, data, mime, **options)
+    return _pool(workers).submit(preprocess_receipt, data, mime, **options).result()
@@ -0,0 +1,242 @@
+# backend/utils/recurring_detection.py
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func, select, update
+
+from backend.extensions import db
+from backend.models.personal import PersonalExpense, RecurringRule, RecurringScanState
+from backend.utils.analytics import description_tokens, normalize_merchant
+
+# Billing cadences we recognise: name → (period in days, tolerance in days)
+CADENCES = {
+    "weekly":    (7.0, 1.5),
+    "biweekly":  (14.0, 2.0),
+    "monthly":   (30.44, 3.5),
+    "quarterly": (91.31, 7.0),
+    "yearly":    (365.25, 15.0),
+}
+_PERIODS = np.array([p for p, _ in CADENCES.values()])
+_TOLERANCES = np.array([t for _, t in CADENCES.values()])
+_NAMES = list(CADENCES)
+
+# Descriptions that are subscriptions even before a billing pattern is visible
+SUBSCRIPTION_HINTS = {"subscription", "premium", "membership", "netflix", "spotify", "icloud", "hulu"}
+
+MIN_OCCURRENCES = 3          # charges needed to trust an interval pattern
+MIN_HINTED_OCCURRENCES = 2   # the same, for descriptions with a subscription hint
+MAX_AMOUNT_CV = 0.10         # amount std / mean
+MAX_INTERVAL_CV = 0.20       # interval std / mean
+
+
+def _has_hint(description: str) -> bool:
+    return not SUBSCRIPTION_HINTS.isdisjoint(description_tokens(description))
+
+
+def classify_series(
+    merchant_codes: np.ndarray,
+    days: np.ndarray,
+    amounts: np.ndarray,
+    n_merchants: int,
+    min_occurrences: int = MIN_OCCURRENCES
+) -> List[Optional[str]]:
+    """
+    Decide which merchants bill on a regular cadence.
+
+    All statistics are computed for every merchant at once: rows are sorted by
+    (merchant, day), inter-arrival gaps come from one `np.diff`, and per-merchant
+    means/variances from `np.bincount`.
+
+    Args:
+      merchant_codes: Dense merchant index per row.
+      days: Day number per row (any integer epoch).
+      amounts: Charge amount per row.
+      n_merchants: Number of distinct merchant codes.
+      min_occurrences: Charges a merchant needs before a cadence is assigned.
+
+    Returns:
+      A list indexed by merchant code: cadence name, or None if not recurring.
+    """
+    order = np.lexsort((days, merchant_codes))
+    codes, days, amounts = merchant_codes[order], days[order], amounts[order]
+
+    # Amount stability
+    n = np.bincount(codes, minlength=n_merchants)
+    amt_mean = np.bincount(codes, weights=amounts, minlength=n_merchants) / np.maximum(n, 1)
+    amt_sq = np.bincount(codes, weights=amounts ** 2, minlength=n_merchants) / np.maximum(n, 1)
+    amt_std = np.sqrt(np.maximum(amt_sq - amt_mean ** 2, 0))
+
+    # Inter-arrival intervals within each merchant
+    same = codes[1:] == codes[:-1]
+    gaps = np.diff(days).astype(np.float64)[same]
+    gap_codes = codes[1:][same]
+    n_gaps = np.bincount(gap_codes, minlength=n_merchants)
+    gap_mean = np.bincount(gap_codes, weights=gaps, minlength=n_merchants) / np.maximum(n_gaps, 1)
+    gap_sq = np.bincount(gap_codes, weights=gaps ** 2, minlength=n_merchants) / np.maximum(n_gaps, 1)
+    gap_std = np.sqrt(np.maximum(gap_sq - gap_mean ** 2, 0))
+
+    # Nearest known cadence for each merchant's mean interval
+    fits = np.abs(gap_mean[:, None] - _PERIODS[None, :]) <= _TOLERANCES[None, :]
+    cadence = np.where(fits.any(axis=1), fits.argmax(axis=1), -1)
+
+    recurring = (
+        (n >= min_occurrences)
+        & (cadence >= 0)
+        & (gap_std <= MAX_INTERVAL_CV * gap_mean)
+        & (amt_std <= MAX_AMOUNT_CV * amt_mean)
+    )
+    return [_NAMES[c] if ok else None for c, ok in zip(cadence.tolist(), recurring.tolist())]
+
+
+def _near_median(codes: np.ndarray, amounts: np.ndarray, n_merchants: int) -> np.ndarray:
+    """
+    Mask of the charges within MAX_AMOUNT_CV of their merchant's median
+    amount: the candidate series, without one-off purchases at the same merchant.
+
+    Medians for every merchant come from one sort by (merchant, amount): each
+    merchant's rows are contiguous, so its middle rows sit at fixed offsets
+    from the start of its run.
+    """
+    ordered = amounts[np.lexsort((amounts, codes))]
+    n = np.bincount(codes, minlength=n_merchants)
+    start = np.cumsum(n) - n
+    last = max(len(ordered) - 1, 0)
+    low = np.minimum(start + (n - 1) // 2, last)
+    high = np.minimum(start + n // 2, last)
+    medians = np.where(n > 0, (ordered[low] + ordered[high]) / 2, 0.0)
+    # Refunds have negative medians; the tolerance is on the size of the charge
+    return np.abs(amounts - medians[codes]) <= MAX_AMOUNT_CV * np.abs(medians[codes])
+
+
+def _scan_user(user_id: int, since_id: int, until_id: int) -> Tuple[Dict[str, str], List[int]]:
+    """
+    Re-evaluate only the merchants that received rows in (`since_id`, `until_id`].
+
+    Returns:
+      ({merchant_key: cadence} for the merchants flagged as recurring,
+       ids of the expenses forming their periodic series)
+    """
+    new_rows = db.session.execute(
+        select(PersonalExpense.id, PersonalExpense.description, PersonalExpense.merchant_key)
+        .where(
+            PersonalExpense.user_id == user_id,
+            PersonalExpense.id > since_id,
+            PersonalExpense.id <= until_id,
+        )
+    ).all()
+    if not new_rows:
+        return {}, []
+
+    # Rows written before merchant_key existed get their key now
+    missing = [
+        {"id": eid, "merchant_key": normalize_merchant(desc)}
+        for eid, desc, key in new_rows if key is None
+    ]
+    if missing:
+        db.session.execute(update(PersonalExpense), missing)
+
+    touched = {key or normalize_merchant(desc) for _, desc, key in new_rows}
+    history = db.session.execute(
+        select(
+            PersonalExpense.id,
+            PersonalExpense.merchant_key,
+            PersonalExpense.transaction_date,
+            PersonalExpense.amount,
+            PersonalExpense.description,
+        ).where(
+            PersonalExpense.user_id == user_id,
+            PersonalExpense.merchant_key.in_(touched),
+        )
+    ).all()
+
+    ids, keys, stamps, amounts, descriptions = zip(*history)
+    ids = np.array(ids, dtype=np.int64)
+    merchants, codes = np.unique(np.array(keys, dtype=object), return_inverse=True)
+    days = np.array(stamps, dtype="datetime64[us]").astype("datetime64[D]").astype(np.int64)
+    amounts = np.array(amounts, dtype=np.float64)
+    series = _near_median(codes, amounts, len(merchants))
+    cadences = classify_series(codes[series], days[series], amounts[series], len(merchants))
+
+    # A subscription hint lowers the bar to two spaced charges, counting hinted charges only
+    hinted = np.fromiter((_has_hint(d) for d in descriptions), dtype=bool, count=len(descriptions))
+    undetected = np.array([c is None for c in cadences], dtype=bool)
+    hinted &= series & undetected[codes]
+    if hinted.any():
+        from_hints = classify_series(
+            codes[hinted], days[hinted], amounts[hinted], len(merchants), MIN_HINTED_OCCURRENCES
+        )
+        cadences = [c or h for c, h in zip(cadences, from_hints)]
+        # For those merchants the series is the hinted charges
+        series &= hinted | ~np.isin(codes, np.unique(codes[hinted]))
+
+    detected = np.array([c is not None for c in cadences], dtype=bool)
+    series &= detected[codes]
+
+    found = {m: c for m, c in zip(merchants.tolist(), cadences) if c is not None}
+    return found, ids[series].tolist()
+
+
+def detect_recurring(user_id: Optional[int] = None) -> Dict[int, Dict[str, str]]:
+    """
+    Flag recurring expenses (`is_recurring`) for one user or all users,
+    looking only at rows added since each user's last run. No model calls.
+    Detections are suggestions only: a scheduler rule is created once the
+    user confirms one (POST /api/personal/recurring/rules).
+
+    Returns:
+      {user_id: {merchant_key: cadence}} for merchants flagged in this run.
+    """
+    watermarks = dict(db.session.execute(
+        select(RecurringScanState.user_id, RecurringScanState.last_expense_id)
+    ).all())
+
+    latest = select(PersonalExpense.user_id, func.max(PersonalExpense.id)).group_by(PersonalExpense.user_id)
+    if user_id is not None:
+        latest = latest.where(PersonalExpense.user_id == user_id)
+
+    flagged: Dict[int, Dict[str, str]] = {}
+    for uid, max_id in db.session.execute(latest).all():
+        since = watermarks.get(uid, 0)
+        if max_id <= since:
+            continue
+
+        found, series_ids = _scan_user(uid, since, max_id)
+        if found:
+            # Only the charges of each detected series, not every row sharing its merchant key
+            db.session.execute(update(PersonalExpense), [{"id": eid, "is_recurring": True} for eid in series_ids])
+            flagged[uid] = found
+
+        state = db.session.get(RecurringScanState, uid) or RecurringScanState(user_id=uid)
+        state.last_expense_id = max_id
+        db.session.add(state)
+
+    db.session.commit()
+    return flagged
+
+
+def rebuild_merchant_keys(user_id: Optional[int] = None, batch_size: int = 5000) -> int:
+    """
+    Recompute `merchant_key` of existing expenses and scheduler rules with
+    the current `normalize_merchant`, for one user or everyone.
+
+    Returns:
+      The number of expenses whose key changed.
+    """
+    changed = 0
+    for model in (PersonalExpense, RecurringRule):
+        source = select(model.id, model.description, model.merchant_key)
+        if user_id is not None:
+            source = source.where(model.user_id == user_id)
+        updates = []
+        for rows in db.session.execute(source.execution_options(yield_per=batch_size)).partitions():
+            for eid, desc, old in rows:
+                key = normalize_merchant(desc)
+                if key != old:
+                    updates.append({"id": eid, "merchant_key": key})
+        for start in range(0, len(updates), batch_size):
+            db.session.execute(update(model), updates[start:start + batch_size])
+        if model is PersonalExpense:
+            changed = len(updates)
+    db.session.commit()
+    return changed
@@ -0,0 +1,261 @@
+# backend/utils/recurring_scheduler.py
+
+import os
+import socket
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import bindparam, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from backend.extensions import db
+from backend.models.personal import PersonalExpense, RecurringRule, SchedulerLease
+from backend.utils.budget_rollups import record_expenses
+
+LEASE_NAME = 'recurring-scheduler'
+
+# cadence → (months, days) to advance per occurrence
+CADENCE_STEPS = {
+    "weekly":    (0, 7),
+    "biweekly":  (0, 14),
+    "monthly":   (1, 0),
+    "quarterly": (3, 0),
+    "yearly":    (12, 0),
+}
+
+
+def _add_months(when: datetime, months: int) -> datetime:
+    """Shift by calendar months, clamping the day (Jan 31 + 1 month → Feb 28/29)."""
+    month_index = when.month - 1 + months
+    year, month = when.year + month_index // 12, month_index % 12 + 1
+    next_month = datetime(year + month // 12, month % 12 + 1, 1)
+    last_day = (next_month - timedelta(days=1)).day
+    return when.replace(year=year, month=month, day=min(when.day, last_day))
+
+
+def next_occurrence(when: datetime, cadence: str) -> datetime:
+    """The occurrence after `when` for the given cadence."""
+    months, days = CADENCE_STEPS[cadence]
+    return _add_months(when, months) if months else when + timedelta(days=days)
+
+
+def first_due_after(anchor: datetime, cadence: str, not_before: datetime) -> datetime:
+    """First occurrence after `anchor` that is not earlier than `not_before`."""
+    due = next_occurrence(anchor, cadence)
+    while due < not_before:
+        due = next_occurrence(due, cadence)
+    return due
+
+
+def create_rule(expense: PersonalExpense, cadence: str = 'monthly') -> RecurringRule:
+    """
+    Turn a recurring expense into a scheduler rule.
+    Past periods are not back-filled: the first due date is never before today.
+    """
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    rule = RecurringRule(
+        user_id=expense.user_id,
+        source_expense_id=expense.id,
+        amount=expense.amount,
+        currency=expense.currency,
+        description=expense.description,
+        category=expense.category,
+        merchant_key=expense.merchant_key,
+        cadence=cadence,
+        next_due_at=first_due_after(expense.transaction_date, cadence, today),
+    )
+    db.session.add(rule)
+    return rule
+
+
+def create_rules_for_merchants(user_id: int, cadences: Dict[str, str]) -> int:
+    """
+    Create a rule per confirmed merchant that does not already have an
+    active one, anchored on the merchant's latest (non-generated) charge.
+
+    Returns:
+      The number of rules created.
+    """
+    existing = set(db.session.execute(
+        select(RecurringRule.merchant_key).where(
+            RecurringRule.user_id == user_id,
+            RecurringRule.merchant_key.in_(cadences),
+            RecurringRule.active.is_(True),
+        )
+    ).scalars())
+
+    latest_ids = select(func.max(PersonalExpense.id)).where(
+        PersonalExpense.user_id == user_id,
+        PersonalExpense.merchant_key.in_(set(cadences) - existing),
+        PersonalExpense.recurring_rule_id.is_(None),
+    ).group_by(PersonalExpense.merchant_key)
+
+    created = 0
+    for exp in PersonalExpense.query.filter(PersonalExpense.id.in_(latest_ids)):
+        create_rule(exp, cadences[exp.merchant_key])
+        created += 1
+    return created
+
+
+def deactivate_rules(user_id: int, rule_ids: Iterable[int] = (), source_expense_ids: Iterable[int] = ()) -> int:
+    """
+    Stop the given rules, and the rules created from the given expenses,
+    so the scheduler no longer materializes them. Runs inside the caller's
+    transaction; the caller commits.
+
+    Returns:
+      The number of rules deactivated.
+    """
+    res = db.session.execute(
+        update(RecurringRule)
+        .where(
+            RecurringRule.user_id == user_id,
+            RecurringRule.active.is_(True),
+            or_(RecurringRule.id.in_(list(rule_ids)), RecurringRule.source_expense_id.in_(list(source_expense_ids))),
+        )
+        .values(active=False)
+    )
+    return res.rowcount
+
+
+def default_holder() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def acquire_lease(holder: str, ttl: timedelta, now: Optional[datetime] = None) -> bool:
+    """
+    Take or renew the scheduler lease. Only one holder wins while it is
+    unexpired, so several app processes can all call `tick` safely.
+    """
+    now = now or datetime.utcnow()
+    res = db.session.execute(
+        update(SchedulerLease)
+        .where(
+            SchedulerLease.name == LEASE_NAME,
+            (SchedulerLease.expires_at < now) | (SchedulerLease.holder == holder),
+        )
+        .values(holder=holder, expires_at=now + ttl)
+    )
+    if res.rowcount == 1:
+        db.session.commit()
+        return True
+
+    try:
+        db.session.add(SchedulerLease(name=LEASE_NAME, holder=holder, expires_at=now + ttl))
+        db.session.commit()
+        return True
+    except IntegrityError:
+        # Someone else holds an unexpired lease
+        db.session.rollback()
+        return False
+
+
+def release_lease(holder: str) -> None:
+    db.session.execute(
+        update(SchedulerLease)
+        .where(SchedulerLease.name == LEASE_NAME, SchedulerLease.holder == holder)
+        .values(expires_at=datetime.utcnow())
+    )
+    db.session.commit()
+
+
+def _due_occurrences(rules: Iterable, now: datetime):
+    """
+    Expand each due rule into its occurrences up to `now`.
+
+    Returns:
+      (expense rows to insert, watermark updates)
+    """
+    rows: List[dict] = []
+    watermarks: List[dict] = []
+    for rule in rules:
+        due = rule.next_due_at
+        while due <= now:
+            rows.append({
+                "user_id": rule.user_id,
+                "amount": rule.amount,
+                "currency": rule.currency,
+                "description": rule.description,
+                "category": rule.category,
+                "merchant_key": rule.merchant_key,
+                "is_recurring": True,
+                "recurring_rule_id": rule.id,
+                "transaction_date": due,
+                "created_at": now,
+            })
+            due = next_occurrence(due, rule.cadence)
+        watermarks.append({"rid": rule.id, "old_due": rule.next_due_at, "new_due": due, "now": now})
+    return rows, watermarks
+
+
+def tick(
+    now: Optional[datetime] = None,
+    batch_size: int = 5000,
+    holder: Optional[str] = None,
+    lease_ttl: timedelta = timedelta(minutes=5)
+) -> int:
+    """
+    Materialize every due occurrence across all users.
+
+    Each batch is one indexed range query on (active, next_due_at), one bulk
+    INSERT of the generated expenses and one executemany watermark UPDATE,
+    committed together. Watermark updates are conditional on the value read,
+    so a batch that raced with another process is rolled back, never doubled.
+
+    Returns:
+      The number of expenses created (0 if another process holds the lease).
+    """
+    now = now or datetime.utcnow()
+    holder = holder or default_holder()
+    if not acquire_lease(holder, lease_ttl, now):
+        return 0
+
+    due_query = (
+        select(
+            RecurringRule.id,
+            RecurringRule.user_id,
+            RecurringRule.amount,
+            RecurringRule.currency,
+            RecurringRule.description,
+            RecurringRule.category,
+            RecurringRule.merchant_key,
+            RecurringRule.cadence,
+            RecurringRule.next_due_at,
+        )
+        .where(RecurringRule.active.is_(True), RecurringRule.next_due_at <= now)
+        .order_by(RecurringRule.next_due_at)
+        .limit(batch_size)
+    )
+    advance = (
+        update(RecurringRule.__table__)
+        .where(
+            RecurringRule.__table__.c.id == bindparam('rid'),
+            RecurringRule.__table__.c.next_due_at == bindparam('old_due'),
+        )
+        .values(next_due_at=bindparam('new_due'), last_materialized_at=bindparam('now'))
+    )
+
+    created = 0
+    try:
+        while True:
+            rules = db.session.execute(due_query).all()
+            if not rules:
+                break
+
+            rows, watermarks = _due_occurrences(rules, now)
+            res = db.session.execute(advance, watermarks)
+            if db.engine.dialect.supports_sane_multi_rowcount and res.rowcount != len(watermarks):
+                db.session.rollback()
+                break
+
+            db.session.execute(insert(PersonalExpense), rows)
+            record_expenses(SimpleNamespace(**r) for r in rows)
+            db.session.commit()
+            created += len(rows)
+
+            if len(rules) < batch_size or not acquire_lease(holder, lease_ttl):
+                break
+    finally:
+        release_lease(holder)
+    return created
@@ -1,6 +1,9 @@
 # backend/utils/split_logic.py
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Sequence
+
+import numpy as np
+
 from backend.models.shared import Split
 
 def filter_members(members: List[int], excluded_members: List[int]) -> List[int]:
@@ -90,3 +93,171 @@ def minimize_cash_flow(balances: Dict[Any, float]) -> List[Dict[str, Any]]:
         })
 
     return settlements
+
+
+#
+# Split engine
+#
+
+SPLIT_METHODS = ("equal", "shares", "percent", "exact", "itemized")
+
+
+class SplitError(ValueError):
+    """Raised when a split spec is malformed or does not add up."""
+
+
+def to_cents(amounts) -> np.ndarray:
+    return np.rint(np.asarray(amounts, dtype=np.float64) * 100).astype(np.int64)
+
+
+def allocate_cents(totals: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """
+    Split integer cent totals proportionally to weights, many rows at once.
+
+    Uses the largest-remainder method: everyone gets the floor of their exact
+    share, then the leftover cents go to the largest fractional parts, ties
+    broken by column order. Each row sums exactly to its total.
+
+    Args:
+      totals: int64 array (E,) of cents to distribute (may be negative).
+      weights: float array (E, P) of non-negative weights; all-zero rows get nothing.
+
+    Returns:
+      An int64 array (E, P) of cents.
+    """
+    totals = np.asarray(totals, dtype=np.int64)
+    weights = np.asarray(weights, dtype=np.float64)
+    sign = np.where(totals < 0, -1, 1)
+    magnitude = np.abs(totals)
+
+    wsum = weights.sum(axis=1)
+    safe = np.where(wsum > 0, wsum, 1.0)
+    exact = magnitude[:, None] * (weights / safe[:, None])
+    base = np.floor(exact + 1e-9).astype(np.int64)
+    leftover = np.where(wsum > 0, magnitude - base.sum(axis=1), 0)
+
+    # rank of each column by fractional part (0 = largest); stable sort keeps column order on ties
+    order = np.argsort(-(exact - base), axis=1, kind="stable")
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.broadcast_to(np.arange(weights.shape[1]), order.shape), axis=1)
+    base += (ranks < leftover[:, None]) & (weights > 0)
+
+    return base * sign[:, None]
+
+
+def _column_weights(mapping: Dict[Any, float], index: Dict[int, int], width: int, field: str) -> np.ndarray:
+    """Turn a {user_id: value} mapping from JSON into a dense row."""
+    row = np.zeros(width)
+    for uid, value in mapping.items():
+        try:
+            col = index[int(uid)]
+            row[col] = float(value)
+        except (KeyError, ValueError, TypeError):
+            raise SplitError(f"`{field}` has an entry for a non-participant or a non-number: {uid!r}")
+    if (row < 0).any():
+        raise SplitError(f"`{field}` values must be non-negative")
+    return row
+
+
+def _itemized_weights(spec: dict, total_cents: int, index: Dict[int, int], width: int) -> np.ndarray:
+    """
+    Cents each participant owes for an itemized bill. Every item is split
+    equally among its participants; whatever the items do not cover (tax, tip)
+    is spread in proportion to each person's item subtotal.
+    """
+    items = spec.get("items") or []
+    if not items:
+        raise SplitError("`items` is required for an itemized split")
+
+    masks = np.zeros((len(items), width))
+    for i, item in enumerate(items):
+        eaters = item.get("participants") or list(index)
+        masks[i] = _column_weights({uid: 1 for uid in eaters}, index, width, "items.participants")
+    item_cents = to_cents([item.get("amount", 0) for item in items])
+    subtotals = allocate_cents(item_cents, masks).sum(axis=0)
+
+    extra = total_cents - int(item_cents.sum())
+    if extra < 0:
+        raise SplitError("Items add up to more than the expense amount")
+    if extra and not subtotals.any():
+        raise SplitError("Items must have a positive amount")
+    return subtotals + allocate_cents(np.array([extra]), subtotals[None, :])[0]
+
+
+def split_expenses(
+    amounts: Sequence[float],
+    participants: Sequence[int],
+    specs: Optional[Sequence[Optional[dict]]] = None
+) -> np.ndarray:
+    """
+    Compute what each participant owes for many expenses in one pass.
+
+    Every spec is reduced to a row of weights (or exact cents), and all
+    weighted rows are allocated by a single `allocate_cents` call.
+
+    Spec formats (None means equal):
+      {"method": "equal", "participants": [uid, ...]}        # optional subset
+      {"method": "shares", "shares": {uid: weight}}
+      {"method": "percent", "percentages": {uid: pct}}       # must total 100
+      {"method": "exact", "amounts": {uid: amount}}          # must total the amount
+      {"method": "itemized", "items": [{"amount": x, "participants": [uid, ...]}]}
+
+    Args:
+      amounts: Expense totals.
+      participants: User IDs forming the columns of the result.
+      specs: One spec per expense (or None for all-equal).
+
+    Returns:
+      An int64 array (len(amounts), len(participants)) of cents owed.
+    """
+    width = len(participants)
+    if width == 0:
+        raise SplitError("A split needs at least one participant")
+
+    index = {int(uid): col for col, uid in enumerate(participants)}
+    totals = to_cents(amounts)
+    specs = specs if specs is not None else [None] * len(totals)
+    weights = np.ones((len(totals), width))
+    fixed = np.zeros((len(totals), width), dtype=np.int64)
+    is_fixed = np.zeros(len(totals), dtype=bool)
+
+    for row, spec in enumerate(specs):
+        if not spec:
+            continue  # plain equal split: the default weights
+        method = spec.get("method", "equal")
+        if method == "equal":
+            subset = spec.get("participants")
+            if subset is not None:
+                weights[row] = _column_weights({uid: 1 for uid in subset}, index, width, "participants")
+        elif method == "shares":
+            weights[row] = _column_weights(spec.get("shares") or {}, index, width, "shares")
+        elif method == "percent":
+            weights[row] = _column_weights(spec.get("percentages") or {}, index, width, "percentages")
+            if abs(weights[row].sum() - 100) > 0.01:
+                raise SplitError("`percentages` must add up to 100")
+        elif method == "exact":
+            fixed[row] = to_cents(_column_weights(spec.get("amounts") or {}, index, width, "amounts"))
+            if fixed[row].sum() != totals[row]:
+                raise SplitError("`amounts` must add up to the expense amount")
+            is_fixed[row] = True
+        elif method == "itemized":
+            fixed[row] = _itemized_weights(spec, int(totals[row]), index, width)
+            is_fixed[row] = True
+        else:
+            raise SplitError(f"Unknown split method {method!r}; expected one of {', '.join(SPLIT_METHODS)}")
+
+        if not is_fixed[row] and weights[row].sum() <= 0:
+            raise SplitError("A split must give at least one participant a positive weight")
+
+    return np.where(is_fixed[:, None], fixed, allocate_cents(totals, weights))
+
+
+def split_expense(amount: float, participants: Sequence[int], spec: Optional[dict] = None) -> Dict[int, float]:
+    """
+    Split a single expense.
+
+    Returns:
+      A dict mapping user_id → amount owed (only participants who owe something).
+    """
+    cents = split_expenses([amount], participants, [spec])[0]
+    return {int(uid): c / 100 for uid, c in zip(participants, cents.tolist()) if c}
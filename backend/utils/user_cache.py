@@ -0,0 +1,68 @@
+# backend/utils/user_cache.py
+
+from copy import deepcopy
+from typing import Optional
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import make_transient_to_detached
+
+from backend.extensions import db
+from backend.models.user import User
+from backend.utils.caching import TTLCache
+
+_COLUMNS = [c.key for c in User.__table__.columns]
+
+
+def _cache() -> TTLCache:
+    # One cache per app (and so per database): user id → column values of the
+    # User row. Only plain values are kept, never an ORM instance, and mutable
+    # ones (the calendar token dict) are copied in and out, so nothing is
+    # shared between sessions, requests or threads.
+    cache = current_app.extensions.get('user_cache')
+    if cache is None:
+        cfg = current_app.config
+        cache = current_app.extensions['user_cache'] = TTLCache(cfg['USER_CACHE_SIZE'], cfg['USER_CACHE_TTL_SECONDS'])
+    return cache
+
+
+def load_user(user_id: int) -> Optional[User]:
+    """
+    The User with `user_id`, attached to the current session.
+
+    A cache hit is merged in with `load=False`, so it costs no query; lazy
+    relationships (groups, splits, ...) still load on access.
+    """
+    values = _cache().get(user_id)
+    if values is None:
+        # Filled from the primary: a lagging replica's row would be served
+        # for the whole TTL, even to clients reading their own writes
+        user = db.session.get(User, user_id, bind_arguments={'bind': db.engine})
+        if user is not None:
+            _cache().set(user_id, deepcopy({key: getattr(user, key) for key in _COLUMNS}))
+        return user
+
+    user = User(**deepcopy(values))
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+
+def invalidate_user(user_id: int) -> None:
+    if has_app_context():
+        _cache().pop(user_id)
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _drop_cached_user(_mapper, _connection, target):
+    # Profile, password or calendar token changed in this process; other
+    # processes pick it up when the TTL runs out
+    invalidate_user(target.id)
+
+
+def register_user_loader(jwt) -> None:
+    """Expose the token's user as `flask_jwt_extended.current_user` (loaded once per request)."""
+
+    @jwt.user_lookup_loader
+    def _lookup(_jwt_header, jwt_data):
+        return load_user(int(jwt_data['sub']))
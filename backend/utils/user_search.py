@@ -0,0 +1,80 @@
+# backend/utils/user_search.py
+
+from typing import Dict, List, Optional
+
+from flask import current_app
+from sqlalchemy import func, select
+
+from backend.extensions import db
+from backend.models.user import User
+from backend.utils.caching import TTLCache
+
+
+def _cache() -> TTLCache:
+    # (prefix, limit) → results, per app; new sign-ups show up within the TTL
+    cache = current_app.extensions.get('user_search_cache')
+    if cache is None:
+        cfg = current_app.config
+        cache = current_app.extensions['user_search_cache'] = TTLCache(
+            cfg['USER_SEARCH_CACHE_SIZE'], cfg['USER_SEARCH_CACHE_TTL_SECONDS']
+        )
+    return cache
+
+
+def prefix_bounds(prefix: str) -> tuple[str, Optional[str]]:
+    """
+    Half-open range [low, high) holding exactly the strings that start with
+    `prefix`, so a plain B-tree index answers the search. `high` is None
+    when no upper bound exists.
+    """
+    last = ord(prefix[-1])
+    if last == 0x10FFFF:
+        return prefix, None
+    return prefix, prefix[:-1] + chr(last + 1)
+
+
+def search_key(column, dialect: str):
+    """
+    lower(column) compared in code point order, the order `prefix_bounds`
+    assumes. Postgres would otherwise use the database collation (en_US and
+    friends ignore punctuation and case on the first pass), and the range
+    would miss or add rows.
+    """
+    key = func.lower(column)
+    return key.collate('C') if dialect == 'postgresql' else key
+
+
+def search_users(query: str, limit: int) -> List[Dict]:
+    """
+    Users whose username or email starts with `query`, ignoring case.
+
+    Each column is read with an index range scan on `lower(column)` (byte
+    collated on Postgres) that stops after `limit` rows, so the cost does
+    not grow with the user count.
+
+    Returns:
+      Up to `limit` dicts with `id` and `username`, ordered by username.
+    """
+    prefix = query.strip().lower()
+    if not prefix:
+        return []
+
+    key = (prefix, limit)
+    cached = _cache().get(key)
+    if cached is not None:
+        return cached
+
+    low, high = prefix_bounds(prefix)
+    dialect = db.session.get_bind(mapper=User).dialect.name
+    found = {}
+    for column in (User.username, User.email):
+        key_expr = search_key(column, dialect)
+        stmt = select(User.id, User.username).where(key_expr >= low)
+        if high is not None:
+            stmt = stmt.where(key_expr < high)
+        for row in db.session.execute(stmt.order_by(key_expr).limit(limit)):
+            found[row.id] = {"id": row.id, "username": row.username}
+
+    result = sorted(found.values(), key=lambda u: u["username"].lower())[:limit]
+    _cache().set(key, result)
+    return result
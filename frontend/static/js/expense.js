@@ -75,6 +75,7 @@ function toggleTypeFields() {
     const description = document.getElementById('description').value;
     const date        = document.getElementById('date').value;
     const notes       = document.getElementById('notes').value;
+    const currency    = document.getElementById('currency').value.trim().toUpperCase() || undefined;
 
     if (type === 'shared') {
       if (isNaN(amount)) {
@@ -85,6 +86,7 @@ function toggleTypeFields() {
       const payload = {
         description,
         amount,
+        currency,
         date,
         group_id: groupSelect.value,
         paid_by: paidBySelect.value,
@@ -112,7 +114,7 @@ function toggleTypeFields() {
             ?.members.find(u => u.id == uid);
           const label = user?.username || `User ${uid}`;
           const dir = amount > 0 ? 'owes' : 'is owed';
-          output += `<li>${label} ${dir} $${Math.abs(amount).toFixed(2)}</li>`;
+          output += `<li>${label} ${dir} ${Math.abs(amount).toFixed(2)} ${data.currency}</li>`;
         });
         output += '</ul>';
         document.getElementById('resultMessage').innerHTML = output;
@@ -125,6 +127,7 @@ function toggleTypeFields() {
     } else {
       const payload = {
         amount,
+        currency,
         description,
         transaction_date: date,
         notes
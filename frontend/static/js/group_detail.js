@@ -14,14 +14,18 @@ document.addEventListener('DOMContentLoaded', () => {
 
   let groupMembers = [];
 
-  async function loadGroup() {
-    const res = await fetch(`/api/shared/group/${groupId}`);
-    const g   = await res.json();
+  // One request for info, balances and history; the browser revalidates it with the ETag
+  async function loadOverview() {
+    const res = await fetch(`/api/shared/group/${groupId}/overview`);
+    const { group: g, net_balances, history } = await res.json();
 
     groupNameEl.textContent = g.name;
-    groupCreatorEl.textContent = g.members.find(u => u.id === g.created_by)?.username || '—';
+    groupCreatorEl.textContent = g.created_by_username || '—';
     groupMembers = g.members;
 
+    memberList.innerHTML = '';
+    fromUserSelect.innerHTML = '';
+    toUserSelect.innerHTML = '';
     g.members.forEach(m => {
       const li = document.createElement('li');
       li.textContent = m.username;
@@ -30,12 +34,12 @@ document.addEventListener('DOMContentLoaded', () => {
       fromUserSelect.add(new Option(m.username, m.id));
       toUserSelect.add(new Option(m.username, m.id));
     });
-  }
 
-  async function loadBalances() {
-    const res = await fetch(`/api/shared/group/${groupId}/balances`);
-    const { net_balances } = await res.json();
+    renderBalances(net_balances);
+    renderPayments(history.payments);
+  }
 
+  function renderBalances(net_balances) {
     balancesBody.innerHTML = '';
     for (const [uid, amount] of Object.entries(net_balances)) {
       const user = groupMembers.find(u => u.id == uid);
@@ -54,10 +58,7 @@ document.addEventListener('DOMContentLoaded', () => {
     }
   }
 
-  async function loadPayments() {
-    const res = await fetch(`/api/shared/group/${groupId}/history`);
-    const { payments } = await res.json();
-
+  function renderPayments(payments) {
     paymentsBody.innerHTML = payments.map(p => `
       <tr>
         <td>${p.from_username || p.from_user}</td>
@@ -96,15 +97,11 @@ document.addEventListener('DOMContentLoaded', () => {
     });
     if (res.ok) {
       paymentModal.style.display = 'none';
-      loadPayments();
-      loadBalances();
+      loadOverview();
     } else {
       alert((await res.json()).error || 'Payment failed');
     }
   });
 
-  loadGroup().then(() => {
-    loadBalances();
-    loadPayments();
-  });
+  loadOverview();
 });
@@ -2,7 +2,6 @@ document.addEventListener('DOMContentLoaded', () => {
   const addMemberBtn = document.getElementById('addMemberBtn');
   const memberFields = document.getElementById('memberFields');
   const modal = document.getElementById('createGroupModal');
-  let allUsers = [];  // will hold fetched users
 
   // 
   document.getElementById('createGroupBtn').addEventListener('click', () => {
@@ -14,13 +13,14 @@ document.addEventListener('DOMContentLoaded', () => {
     modal.style.display = 'none';
   });
 
-  // 
-  async function loadMembers() {
+  // Typeahead: matching users come from the indexed search endpoint as you type
+  async function searchUsers(q) {
     try {
-      const res = await fetch('/api/shared/users');
-      allUsers = await res.json();
+      const res = await fetch(`/api/shared/users/search?q=${encodeURIComponent(q)}`);
+      return res.ok ? await res.json() : [];
     } catch (err) {
-      console.error('Could not load users', err);
+      console.error('Could not search users', err);
+      return [];
     }
   }
 
@@ -29,14 +29,28 @@ document.addEventListener('DOMContentLoaded', () => {
     const wrapper = document.createElement('div');
     wrapper.className = 'member-row';
 
+    const search = document.createElement('input');
+    search.type = 'search';
+    search.placeholder = 'Search by username or email';
+    search.autocomplete = 'off';
+
     const sel = document.createElement('select');
     sel.name = 'members';
     sel.required = true;
 
-    allUsers.forEach(u => {
-      if (u.id === CURRENT_USER_ID) return; // 
-      const opt = new Option(u.username, u.id);
-      sel.add(opt);
+    let timer;
+    search.addEventListener('input', () => {
+      clearTimeout(timer);
+      timer = setTimeout(async () => {
+        const q = search.value.trim();
+        const users = q ? await searchUsers(q) : [];
+        if (search.value.trim() !== q) return;  // a newer query is on its way
+        sel.innerHTML = '';
+        users.forEach(u => {
+          if (u.id === CURRENT_USER_ID) return; // 
+          sel.add(new Option(u.username, u.id));
+        });
+      }, 200);
     });
 
     const removeBtn = document.createElement('button');
@@ -44,6 +58,7 @@ document.addEventListener('DOMContentLoaded', () => {
     removeBtn.textContent = '×';
     removeBtn.addEventListener('click', () => wrapper.remove());
 
+    wrapper.appendChild(search);
     wrapper.appendChild(sel);
     wrapper.appendChild(removeBtn);
     return wrapper;
@@ -84,9 +99,7 @@ document.addEventListener('DOMContentLoaded', () => {
   });
 
   //
-  loadMembers().then(() => {
-    addMemberBtn.click();  //
-  });
+  addMemberBtn.click();  //
   loadGroups(); // 
 });
 